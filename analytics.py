@@ -1,25 +1,191 @@
+import os
+from datetime import date, datetime, timedelta
+from db_connector import DatabaseManager
+from reference_cache import get_reference_cache
+from records import Order
+
+# Рабочих часов в рабочем дне - для расчета загрузки сотрудников
+WORKDAY_HOURS = float(os.getenv('WORKDAY_HOURS', 8))
+
+# Показатели сотрудника: (ключ, заголовок) - для вывода в CLI и GUI
+EMPLOYEE_STATS_COLUMNS = [
+    ('employee_id', "ID"), ('name', "Сотрудник"), ('work_count', "Работ"),
+    ('total_income', "Доход"), ('work_hours', "Часов"), ('utilization', "Загрузка, %"),
+]
+
+
+def _as_date(value):
+    """Дата из строки ГГГГ-ММ-ДД, date или datetime"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def workdays_between(start, end):
+    """Количество будних дней с start по end включительно"""
+    if start > end:
+        return 0
+    days = (end - start).days + 1
+    weeks, rest = divmod(days, 7)
+    extra = sum(1 for offset in range(rest) if (start + timedelta(days=offset)).weekday() < 5)
+    return weeks * 5 + extra
+
+
+def build_employee_stats_query(employee_ids=None, start_date=None, end_date=None, today=None):
+    """
+    Запрос показателей сотрудников с фильтрами: (запрос, параметры).
+    Прошедшие дни читаются из daily_employee_stats. Текущий день, если он входит
+    в период, считается по works напрямую: работы пишутся без пересчета агрегатов,
+    и периодический пересчет (rollups.py) догоняет их только на следующем запуске
+    :param today: Текущий день (по умолчанию - date.today())
+    """
+    today = today or date.today()
+    include_today = (_as_date(start_date) or today) <= today <= (_as_date(end_date) or today)
+    employee_filter = f"IN ({', '.join(['%s'] * len(employee_ids))})" if employee_ids is not None else None
+
+    query = """
+    SELECT employee_id, SUM(work_count) as work_count,
+           SUM(income) as total_income, SUM(work_hours) as work_hours
+    FROM daily_employee_stats
+    """
+    conditions, params = [], []
+    if employee_filter:
+        conditions.append(f"employee_id {employee_filter}")
+        params.extend(employee_ids)
+    if start_date:
+        conditions.append("stat_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("stat_date <= %s")
+        params.append(end_date)
+    if include_today:
+        conditions.append("stat_date <> %s")
+        params.append(today)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " GROUP BY employee_id"
+    if not include_today:
+        return query, params
+
+    live_query = """
+    SELECT w.employee_id, COUNT(*) as work_count, SUM(s.price) as total_income,
+           COALESCE(SUM(TIMESTAMPDIFF(SECOND, w.start_date, w.end_date)) / 3600, 0) as work_hours
+    FROM works w
+    JOIN services s ON w.service_id = s.service_id
+    WHERE w.start_date >= %s AND w.start_date < %s + INTERVAL 1 DAY
+      AND w.employee_id IS NOT NULL
+    """
+    params.extend([today, today])
+    if employee_filter:
+        live_query += f" AND w.employee_id {employee_filter}"
+        params.extend(employee_ids)
+    live_query += " GROUP BY w.employee_id"
+    query = f"""
+    SELECT employee_id, SUM(work_count) as work_count,
+           SUM(total_income) as total_income, SUM(work_hours) as work_hours
+    FROM ({query} UNION ALL {live_query}) days
+    GROUP BY employee_id
+    """
+    return query, params
+
+
 # Аналитические запросы
 class analytical_requests:
-    def get_orders_by_period(self, start_date, end_date):
-        query = """
-        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
-               c.name as client_name, car.brand, car.model
-        FROM orders o
-        JOIN clients c ON o.client_id = c.client_id
-        JOIN cars car ON o.car_id = car.car_id
-        WHERE o.creation_date BETWEEN %s AND %s
-        ORDER BY o.creation_date
-        """
-        return self.db.execute_query(query, (start_date, end_date), fetch=True)
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def get_orders_by_period(self, start_date, end_date, stream=False, chunk_size=None):
+        """Заказы периода (записи Order); stream=True - генератор порций"""
+        return self.db.execute_named('analytics.orders_by_period', (start_date, end_date),
+                                     fetch=True, stream=stream, chunk_size=chunk_size, record=Order)
     
-    def get_employee_stats(self, employee_id):
-        query = """
-        SELECT e.name, COUNT(w.work_id) as work_count, 
-               SUM(s.price) as total_income
-        FROM works w
-        JOIN employees e ON w.employee_id = e.employee_id
-        JOIN services s ON w.service_id = s.service_id
-        WHERE w.employee_id = %s
-        GROUP BY e.name
-        """
-        return self.db.execute_query(query, (employee_id,), fetch=True)
\ No newline at end of file
+    def get_employee_stats(self, employee_id, start_date=None, end_date=None):
+        """Статистика одного сотрудника (см. get_employee_stats_bulk)"""
+        stats = self.get_employee_stats_bulk([int(employee_id)], start_date, end_date)
+        if not stats or not stats[0]['work_count']:
+            return []
+        return [{
+            'name': stats[0]['name'],
+            'work_count': stats[0]['work_count'],
+            'total_income': stats[0]['total_income']
+        }]
+
+    def get_employee_stats_bulk(self, employee_ids=None, start_date=None, end_date=None):
+        """
+        Статистика сотрудников одним сгруппированным запросом к дневным агрегатам (rollups.py);
+        текущий день считается по works (см. build_employee_stats_query)
+        :param employee_ids: ID сотрудников; None - все сотрудники
+        :param start_date: Начало периода (включительно)
+        :param end_date: Конец периода (включительно, по умолчанию - сегодня)
+        :return: Список словарей employee_id, name, work_count, total_income, work_hours,
+                 utilization (доля рабочего времени периода, %, с даты приема на работу)
+        """
+        if employee_ids is not None and not employee_ids:
+            return []
+        query, params = build_employee_stats_query(employee_ids, start_date, end_date)
+        totals = {row['employee_id']: row for row in self.db.execute_query(query, params, fetch=True) or []}
+
+        # Сотрудники без работ за период тоже попадают в результат - с нулями
+        employees = get_reference_cache(self.db).get_table('employees')
+        ids = employee_ids if employee_ids is not None else sorted(set(employees) | set(totals))
+        period_start, period_end = _as_date(start_date), _as_date(end_date) or date.today()
+        stats = []
+        for employee_id in ids:
+            employee = employees.get(employee_id)
+            row = totals.get(employee_id, {})
+            work_hours = row.get('work_hours') or 0
+            hire_date = _as_date(employee['hire_date']) if employee else None
+            first_day = max(filter(None, (period_start, hire_date)), default=None)
+            available = workdays_between(first_day, period_end) * WORKDAY_HOURS if first_day else 0
+            stats.append({
+                'employee_id': employee_id,
+                'name': employee['name'] if employee else None,
+                'work_count': row.get('work_count') or 0,
+                'total_income': row.get('total_income') or 0,
+                'work_hours': work_hours,
+                'utilization': round(float(work_hours) / available * 100, 1) if available else None,
+            })
+        return stats
+
+    def get_employee_leaderboard(self, start_date=None, end_date=None, top=10, order_by='total_income'):
+        """
+        Рейтинг сотрудников для панели персонала
+        :param top: Сколько сотрудников вернуть (None - всех)
+        :param order_by: 'total_income', 'work_count', 'work_hours' или 'utilization'
+        """
+        if order_by not in ('total_income', 'work_count', 'work_hours', 'utilization'):
+            raise ValueError(f"Недопустимый показатель рейтинга: {order_by}")
+        stats = self.get_employee_stats_bulk(None, start_date, end_date)
+        stats.sort(key=lambda row: row[order_by] or 0, reverse=True)
+        return stats[:top] if top else stats
+
+    def get_daily_summary(self, start_date, end_date):
+        """
+        Заказы, их стоимость и оплаты по дням периода из дневных агрегатов
+        :return: Список словарей stat_date, order_count, total_cost, paid_amount
+        """
+        orders = self.db.execute_named('analytics.daily_orders', (start_date, end_date), fetch=True) or []
+        revenue = self.db.execute_named('analytics.daily_revenue', (start_date, end_date), fetch=True) or []
+
+        days = {}
+        for row in orders:
+            days[row['stat_date']] = {'stat_date': row['stat_date'], 'order_count': row['order_count'],
+                                      'total_cost': row['total_cost'], 'paid_amount': 0}
+        for row in revenue:
+            day = days.setdefault(row['stat_date'], {'stat_date': row['stat_date'], 'order_count': 0,
+                                                     'total_cost': 0, 'paid_amount': 0})
+            day['paid_amount'] = row['paid_amount']
+        return [days[day] for day in sorted(days)]
+
+    def get_status_summary(self, start_date, end_date):
+        """
+        Количество и стоимость заказов периода по статусам из дневных агрегатов
+        :return: Словарь {статус: {'order_count': ..., 'total_cost': ...}}
+        """
+        rows = self.db.execute_named('analytics.status_summary', (start_date, end_date), fetch=True) or []
+        return {row['status']: {'order_count': row['order_count'], 'total_cost': row['total_cost']}
+                for row in rows}
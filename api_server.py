@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import hashlib
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from aiohttp import web
+from async_crud import AsyncClientCRUD, AsyncCarCRUD, AsyncOrderCRUD
+from pagination import DEFAULT_PAGE_SIZE
+from instrumentation import metrics_json, metrics_text
+
+# Максимальный размер страницы, который может запросить клиент
+MAX_PAGE_SIZE = 500
+
+# Ответы меньше этого размера не сжимаются: gzip не окупается
+GZIP_MIN_SIZE = 1024
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def json_response(data, status=200, headers=None):
+    body = json.dumps(data, ensure_ascii=False, default=_json_default)
+    return web.Response(text=body, status=status, headers=headers, content_type='application/json')
+
+
+def json_error(status, message):
+    return json_response({'error': message}, status=status)
+
+
+def page_response(page):
+    return json_response({'items': page.rows, 'next_cursor': page.next_cursor,
+                          'prev_cursor': page.prev_cursor})
+
+
+def _int_param(request, name, default=None, maximum=None):
+    value = request.query.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise web.HTTPBadRequest(text=f"Параметр {name} должен быть числом")
+    return min(number, maximum) if maximum else number
+
+
+def _path_id(request, name):
+    try:
+        return int(request.match_info[name])
+    except ValueError:
+        raise web.HTTPNotFound()
+
+
+@web.middleware
+async def errors_middleware(request, handler):
+    """Ошибки разбора параметров и курсоров -> 400 с JSON вместо трассировки"""
+    try:
+        return await handler(request)
+    except web.HTTPException as e:
+        if e.status >= 400 and e.content_type != 'application/json':
+            return json_error(e.status, e.text or e.reason)
+        raise
+    except ValueError as e:
+        return json_error(400, str(e))
+
+
+@web.middleware
+async def gzip_middleware(request, handler):
+    """Сжатие gzip для клиентов, которые его принимают"""
+    response = await handler(request)
+    if (isinstance(response, web.Response) and 'gzip' in request.headers.get('Accept-Encoding', '')
+            and response.body is not None and len(response.body) >= GZIP_MIN_SIZE):
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
+
+
+class AutoServiceAPI:
+    """
+    HTTP/JSON API над асинхронным CRUD (async_crud) и аналитикой.
+    Запросы к БД выполняются через пул соединений; синхронная аналитика
+    вызывается в отдельном потоке, чтобы не останавливать цикл событий.
+    """
+
+    def __init__(self, db, analytics=None, reference_cache=None):
+        """
+        :param db: AsyncDatabaseManager или AsyncSQLiteDatabase
+        :param analytics: analytical_requests (None - аналитика недоступна)
+        :param reference_cache: ReferenceCache для названий в агрегате заказа
+        """
+        self.db = db
+        self.analytics = analytics
+        self.clients = AsyncClientCRUD(db)
+        self.cars = AsyncCarCRUD(db)
+        self.orders = AsyncOrderCRUD(db, reference_cache)
+
+    def routes(self):
+        return [
+            web.get('/health', self.health),
+            web.get('/metrics', self.metrics),
+            web.get('/metrics.json', self.metrics_json),
+            web.get('/clients', self.list_clients),
+            web.post('/clients', self.create_client),
+            web.get('/clients/{client_id}/cars', self.client_cars),
+            web.post('/clients/{client_id}/cars', self.create_car),
+            web.get('/clients/{client_id}/orders', self.client_orders),
+            web.get('/cars/history', self.car_history),
+            web.get('/orders', self.list_orders),
+            web.post('/orders', self.create_order),
+            web.get('/orders/search', self.search_orders),
+            web.get('/orders/by-phone', self.orders_by_phone),
+            web.get('/orders/stats', self.order_stats),
+            web.get('/orders/{order_id}', self.order_details),
+            web.patch('/orders/{order_id}', self.update_order),
+            web.delete('/orders/{order_id}', self.delete_order),
+            web.get('/analytics/daily', self.daily_summary),
+            web.get('/analytics/employees', self.employee_leaderboard),
+        ]
+
+    async def health(self, request):
+        return json_response({'status': 'ok', 'pool': self.db.pool_stats()})
+
+    async def metrics(self, request):
+        """Метрики запросов к БД в формате Prometheus"""
+        return web.Response(text=metrics_text(), content_type='text/plain', charset='utf-8')
+
+    async def metrics_json(self, request):
+        return web.Response(text=metrics_json(), content_type='application/json')
+
+    # Клиенты и автомобили ----------------------------------------------------------------------
+    async def list_clients(self, request):
+        page = await self.clients.get_clients_page(
+            request.query.get('cursor'),
+            _int_param(request, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        )
+        return page_response(page)
+
+    async def create_client(self, request):
+        data = await request.json()
+        if not data.get('name') or not data.get('phone'):
+            return json_error(400, "Нужны поля name и phone")
+        client_id = await self.clients.add_client(data['name'], data['phone'],
+                                                  data.get('email'), data.get('address'))
+        if client_id is None:
+            return json_error(409, "Не удалось добавить клиента (возможно, телефон уже есть)")
+        return json_response({'client_id': client_id}, status=201)
+
+    async def client_cars(self, request):
+        return json_response(await self.cars.get_client_cars(_path_id(request, 'client_id')) or [])
+
+    async def create_car(self, request):
+        data = await request.json()
+        if not data.get('brand') or not data.get('model'):
+            return json_error(400, "Нужны поля brand и model")
+        car_id = await self.cars.add_car(_path_id(request, 'client_id'), data['brand'], data['model'],
+                                         data.get('license_plate'), data.get('year'), data.get('vin'))
+        if car_id is None:
+            return json_error(409, "Не удалось добавить автомобиль")
+        return json_response({'car_id': car_id}, status=201)
+
+    async def client_orders(self, request):
+        return json_response(await self.orders.get_orders_by_client(_path_id(request, 'client_id')))
+
+    async def car_history(self, request):
+        plate = request.query.get('plate')
+        if not plate:
+            return json_error(400, "Нужен параметр plate")
+        return json_response(await self.orders.get_car_history(plate))
+
+    # Заказы ------------------------------------------------------------------------------------
+    async def list_orders(self, request):
+        page = await self.orders.read_orders_page(
+            request.query.get('cursor'),
+            _int_param(request, 'limit', DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        )
+        return page_response(page)
+
+    async def create_order(self, request):
+        data = await request.json()
+        order_id = await self.orders.create_order(data.get('client_id'), data.get('car_id'),
+                                                  data.get('status', 'new'))
+        if order_id is None:
+            return json_error(400, "Не удалось создать заказ")
+        return json_response({'order_id': order_id}, status=201)
+
+    async def search_orders(self, request):
+        term = request.query.get('q', '').strip()
+        if not term:
+            return json_error(400, "Нужен параметр q")
+        return json_response(await self.orders.search_orders(term, _int_param(request, 'limit', 20, 100)))
+
+    async def orders_by_phone(self, request):
+        phone = request.query.get('phone')
+        if not phone:
+            return json_error(400, "Нужен параметр phone")
+        return json_response(await self.orders.get_orders_by_phone(phone, _int_param(request, 'limit', 20, 100)))
+
+    async def order_stats(self, request):
+        stats = await self.orders.get_order_stats(
+            request.query.get('from'), request.query.get('to'), _int_param(request, 'client_id')
+        )
+        if stats is None:
+            return json_error(500, "Не удалось получить статистику заказов")
+        return json_response(stats)
+
+    async def order_details(self, request):
+        """Агрегат заказа с ETag: повторный запрос с If-None-Match получает 304 без тела"""
+        aggregate = await self.orders.load_order_aggregate(_path_id(request, 'order_id'))
+        if aggregate is None:
+            return json_error(404, "Заказ не найден")
+        body = json.dumps(aggregate, ensure_ascii=False, default=_json_default)
+        etag = '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag in request.headers.get('If-None-Match', ''):
+            return web.Response(status=304, headers=headers)
+        return web.Response(text=body, headers=headers, content_type='application/json')
+
+    async def update_order(self, request):
+        data = await request.json()
+        if 'status' not in data:
+            return json_error(400, "Нужно поле status")
+        if not await self.orders.update_order_status(_path_id(request, 'order_id'), data['status']):
+            return json_error(400, "Не удалось обновить статус заказа")
+        return json_response({'order_id': _path_id(request, 'order_id'), 'status': data['status']})
+
+    async def delete_order(self, request):
+        if not await self.orders.delete_order(_path_id(request, 'order_id')):
+            return json_error(409, "Не удалось удалить заказ")
+        return web.Response(status=204)
+
+    # Аналитика ---------------------------------------------------------------------------------
+    def _require_analytics(self):
+        if self.analytics is None:
+            raise web.HTTPNotImplemented(text="Аналитика недоступна для этой базы данных")
+
+    async def daily_summary(self, request):
+        self._require_analytics()
+        start_date, end_date = request.query.get('from'), request.query.get('to')
+        if not start_date or not end_date:
+            return json_error(400, "Нужны параметры from и to")
+        return json_response(await asyncio.to_thread(self.analytics.get_daily_summary, start_date, end_date))
+
+    async def employee_leaderboard(self, request):
+        self._require_analytics()
+        return json_response(await asyncio.to_thread(
+            self.analytics.get_employee_leaderboard,
+            request.query.get('from'), request.query.get('to'),
+            _int_param(request, 'top', 10), request.query.get('order_by', 'total_income')
+        ))
+
+
+def create_app(db, analytics=None, reference_cache=None):
+    """
+    Приложение aiohttp
+    :param db: Асинхронный менеджер БД; закрывается при остановке приложения
+    """
+    app = web.Application(middlewares=[errors_middleware, gzip_middleware])
+    app.add_routes(AutoServiceAPI(db, analytics, reference_cache).routes())
+
+    async def close_db(app):
+        await db.close()
+
+    app.on_cleanup.append(close_db)
+    return app
+
+
+async def create_mysql_app():
+    """Приложение над MySQL: асинхронный пул для CRUD, синхронный - для аналитики"""
+    from async_db import AsyncDatabaseManager
+    from analytics import analytical_requests
+    db = AsyncDatabaseManager()
+    await db.connect()
+    return create_app(db, analytical_requests())
+
+
+def create_sqlite_app(path):
+    """Приложение над локальной SQLite (для проверки API без MySQL; аналитика недоступна)"""
+    from sqlite_standin import SQLiteDatabase, AsyncSQLiteDatabase
+    from reference_cache import ReferenceCache
+    database = SQLiteDatabase(path)
+    return create_app(AsyncSQLiteDatabase(database), reference_cache=ReferenceCache(database))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP/JSON API автосервиса")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--sqlite', metavar='PATH',
+                        help="Использовать SQLite-файл вместо MySQL (для проверки)")
+    args = parser.parse_args()
+
+    app = create_sqlite_app(args.sqlite) if args.sqlite else create_mysql_app()
+    web.run_app(app, host=args.host, port=args.port)
@@ -0,0 +1,243 @@
+import asyncio
+from datetime import datetime
+from crud_operations import (ORDER_STATUSES, assemble_order_aggregate, build_order_search, build_status_update,
+                             build_order_stats_query, order_stats_from_rows)
+from normalization import normalize_phone, normalize_plate
+from queries import sql
+from pagination import build_keyset_query, make_page, DEFAULT_PAGE_SIZE
+from reference_cache import ReferenceCache
+from rollups import (day_ranges, mark_dirty, order_days_query, refresh_statements, restore_dirty,
+                     take_dirty)
+
+
+async def fetch_keyset_page_async(db, select, key_columns, row_key, cursor=None,
+                                  limit=DEFAULT_PAGE_SIZE, descending=False, where=None, params=()):
+    """Асинхронный вариант pagination.fetch_keyset_page"""
+    query, args, after, backwards = build_keyset_query(
+        select, key_columns, cursor, limit, descending, where, params
+    )
+    rows = await db.execute_query(query, args, fetch=True) or []
+    return make_page(rows, row_key, limit, after, backwards)
+
+
+# Асинхронные CRUD операции для клиентов
+class AsyncClientCRUD:
+    def __init__(self, db):
+        """:param db: AsyncDatabaseManager"""
+        self.db = db
+
+    async def add_client(self, name, phone, email=None, address=None):
+        """:return: ID нового клиента или None при ошибке"""
+        return await self.db.execute_insert(sql('clients.insert'), (name, phone, email, address))
+
+    async def get_clients_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Страница списка клиентов (keyset по client_id)"""
+        return await fetch_keyset_page_async(
+            self.db, sql('clients.list'), ['client_id'],
+            lambda client: (client['client_id'],),
+            cursor=cursor, limit=limit
+        )
+
+    async def update_client(self, client_id, **kwargs):
+        if not kwargs:
+            return False
+        updates = ", ".join(f"{field} = %s" for field in kwargs)
+        query = f"UPDATE clients SET {updates} WHERE client_id = %s"
+        return await self.db.execute_query(query, list(kwargs.values()) + [client_id])
+
+    async def delete_client(self, client_id):
+        return await self.db.execute_query(sql('clients.delete'), (client_id,))
+
+
+# Асинхронные CRUD операции для автомобилей
+class AsyncCarCRUD:
+    def __init__(self, db):
+        self.db = db
+
+    async def add_car(self, client_id, brand, model, license_plate, year=None, vin=None):
+        """:return: ID нового автомобиля или None при ошибке"""
+        return await self.db.execute_insert(sql('cars.insert'), (client_id, brand, model, license_plate, year, vin))
+
+    async def get_client_cars(self, client_id):
+        return await self.db.execute_query(sql('cars.by_client'), (client_id,), fetch=True)
+
+
+# Асинхронные CRUD операции для заказов
+class AsyncOrderCRUD:
+    """
+    Операции OrderCRUD в виде корутин. Независимые чтения (например, части
+    агрегата заказа) выполняются одновременно на разных соединениях пула.
+    """
+
+    def __init__(self, db, reference_cache=None):
+        """
+        :param db: AsyncDatabaseManager
+        :param reference_cache: ReferenceCache; справочники загружаются через db
+            (по умолчанию - свой кэш, без синхронного пула соединений)
+        """
+        self.db = db
+        self.reference_cache = reference_cache or ReferenceCache(db)
+
+    async def create_order(self, client_id, car_id, status='new'):
+        """
+        Создание заказа с проверкой принадлежности автомобиля клиенту
+        :return: ID нового заказа или None при ошибке
+        """
+        if not isinstance(client_id, int) or not isinstance(car_id, int):
+            print("Ошибка при создании заказа: ID клиента и автомобиля должны быть числами")
+            return None
+        if status not in ORDER_STATUSES:
+            print(f"Недопустимый статус. Допустимые значения: {', '.join(ORDER_STATUSES)}")
+            return None
+
+        owner = await self.db.execute_query(
+            "SELECT client_id FROM cars WHERE car_id = %s", (car_id,), fetch=True
+        )
+        if not owner or owner[0]['client_id'] != client_id:
+            print("Ошибка: Автомобиль не существует или не принадлежит клиенту")
+            return None
+
+        try:
+            async with self.db.transaction() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(sql('orders.insert'), (client_id, car_id, status, datetime.now()))
+                    order_id = cursor.lastrowid
+                    days = await self._order_days(cursor, [order_id])
+            await self._refresh_after_commit(days)
+            return order_id
+        except Exception as e:
+            print(f"Ошибка при создании заказа: {e}")
+            return None
+
+    async def read_order(self, order_id):
+        result = await self.db.execute_query(sql('orders.read'), (order_id,), fetch=True)
+        return result[0] if result else None
+
+    async def load_order_aggregate(self, order_id):
+        """
+        Заказ целиком: заказ с клиентом и автомобилем, работы с запчастями и платежи
+        читаются тремя одновременными запросами (asyncio.gather) вместе со справочниками
+        :return: Словарь с ключами order, client, car, works, payments или None
+        """
+        head, work_rows, payment_rows, services, employees = await asyncio.gather(
+            self.db.execute_named('orders.aggregate_order', (order_id,), fetch=True),
+            self.db.execute_named('orders.aggregate_works', (order_id,), fetch=True),
+            self.db.execute_named('orders.aggregate_payments', (order_id,), fetch=True),
+            self.reference_cache.get_table_async('services', self.db),
+            self.reference_cache.get_table_async('employees', self.db)
+        )
+        if not head:
+            return None
+        return assemble_order_aggregate(head[0], work_rows or [], payment_rows or [], services, employees)
+
+    async def search_orders(self, term, limit=20):
+        """Поиск заказов по номеру, телефону, началу ФИО или госномера (см. OrderCRUD.search_orders)"""
+        name, params = build_order_search(term, limit)
+        return await self.db.execute_named(name, params, fetch=True) or []
+
+    async def read_orders_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Страница списка заказов, от новых к старым"""
+        return await fetch_keyset_page_async(
+            self.db, sql('orders.list'), ['o.creation_date', 'o.order_id'],
+            lambda order: (order['creation_date'], order['order_id']),
+            cursor=cursor, limit=limit, descending=True
+        )
+
+    async def get_order_stats(self, start_date=None, end_date=None, client_id=None):
+        """Статистика заказов по статусам или None при ошибке запроса (см. OrderCRUD.get_order_stats)"""
+        query, params = build_order_stats_query(start_date, end_date, client_id)
+        return order_stats_from_rows(await self.db.execute_query(query, params, fetch=True))
+
+    async def update_order_status(self, order_id, new_status):
+        """:return: True при успехе, False при ошибке"""
+        if new_status not in ORDER_STATUSES:
+            print(f"Недопустимый статус. Допустимые значения: {', '.join(ORDER_STATUSES)}")
+            return False
+        try:
+            async with self.db.transaction() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(*build_status_update(order_id, new_status))
+                    days = await self._order_days(cursor, [order_id])
+            await self._refresh_after_commit(days)
+            return True
+        except Exception as e:
+            print(f"Ошибка при обновлении статуса заказа: {e}")
+            return False
+
+    async def delete_order(self, order_id):
+        """:return: True если удаление успешно, False при ошибке"""
+        try:
+            async with self.db.transaction() as connection:
+                async with connection.cursor() as cursor:
+                    days = await self._order_days(cursor, [order_id])
+                    if not days:
+                        print(f"Ошибка: Заказ с ID {order_id} не найден")
+                        return False
+                    await cursor.execute(sql('orders.delete'), (order_id,))
+            await self._refresh_after_commit(days)
+            return True
+        except Exception as e:
+            print(f"Ошибка при удалении заказа: {e}")
+            return False
+
+    async def get_orders_by_client(self, client_id):
+        return await self.db.execute_query(sql('orders.by_client'), (client_id,), fetch=True) or []
+
+    async def get_orders_by_phone(self, phone, limit=20):
+        """Последние заказы клиента по номеру телефона (см. OrderCRUD.get_orders_by_phone)"""
+        phone = str(phone).strip()
+        return await self.db.execute_query(sql('orders.by_phone'), (phone, normalize_phone(phone) or phone, limit),
+                                           fetch=True) or []
+
+    async def get_car_history(self, license_plate):
+        """История заказов автомобиля по госномеру (см. OrderCRUD.get_car_history)"""
+        plate = str(license_plate).strip()
+        return await self.db.execute_query(sql('orders.car_history'), (plate, normalize_plate(plate) or plate),
+                                           fetch=True) or []
+
+    # Дневные агрегаты (см. rollups.RollupRefresher) ------------------------------------------------
+    @staticmethod
+    async def _order_days(cursor, order_ids):
+        """Дни создания заказов (см. RollupRefresher.order_days)"""
+        await cursor.execute(*order_days_query(order_ids))
+        return {row[0] for row in await cursor.fetchall()}
+
+    async def _refresh_after_commit(self, days):
+        """
+        Пересчет дней после фиксации записи, по таблице в отдельной транзакции
+        (см. RollupRefresher.refresh_after_commit). Ошибка не влияет на запись:
+        дни остаются отмеченными для следующего пересчета
+        """
+        mark_dirty(days)
+        dirty = take_dirty()
+        for position, (table, table_days) in enumerate(dirty.items()):
+            try:
+                async with self.db.transaction() as connection:
+                    async with connection.cursor() as cursor:
+                        for start, end in day_ranges(table_days):
+                            for query, params in refresh_statements(start, end, (table,)):
+                                await cursor.execute(query, params)
+            except Exception as e:
+                print(f"Ошибка пересчета дневных агрегатов {table}: {e}")
+                restore_dirty(dict(list(dirty.items())[position:]))
+                return False
+        return True
+
+
+async def main():
+    """Проверка: агрегат последнего заказа через асинхронный слой"""
+    from async_db import AsyncDatabaseManager
+    db = AsyncDatabaseManager()
+    await db.connect()
+    try:
+        orders = AsyncOrderCRUD(db)
+        page = await orders.read_orders_page(limit=1)
+        if page.rows:
+            aggregate = await orders.load_order_aggregate(page.rows[0]['order_id'])
+            print(aggregate['order'], aggregate['client'], len(aggregate['works']), len(aggregate['payments']))
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+import os
+import time
+from contextlib import asynccontextmanager
+import aiomysql
+from dotenv import load_dotenv
+from db_connector import DEFAULT_CHUNK_SIZE
+from instrumentation import instrumentation
+from queries import sql
+
+# Загрузка переменных окружения
+load_dotenv()
+
+
+async def create_pool(max_size=None, **connect_args):
+    """
+    Асинхронный пул соединений с MySQL (aiomysql) с теми же настройками, что и get_pool()
+    :param max_size: Максимальное число соединений (по умолчанию DB_POOL_SIZE)
+    """
+    params = dict(
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        db=os.getenv('DB_NAME'),
+        charset='utf8mb4',
+        # Одиночные запросы фиксируются сразу; транзакции открываются явно в transaction().
+        # Иначе чтение оставляло бы открытую транзакцию, и пул закрывал бы соединение
+        autocommit=True,
+        minsize=1,
+        maxsize=max_size or int(os.getenv('DB_POOL_SIZE', 5)),
+        pool_recycle=int(os.getenv('DB_POOL_RECYCLE', 3600)),
+    )
+    params.update(connect_args)
+    return await aiomysql.create_pool(**params)
+
+
+class AsyncDatabaseManager:
+    """
+    Асинхронный аналог DatabaseManager для веб-интерфейса и интеграций:
+    пока один запрос ждет MySQL, цикл событий обслуживает другие.
+    Одновременно выполняется не больше запросов, чем соединений в пуле.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool
+
+    @classmethod
+    async def create(cls, max_size=None):
+        """Менеджер с новым пулом соединений"""
+        return cls(await create_pool(max_size))
+
+    async def connect(self):
+        """Создание пула (если он не передан) и проверка доступности базы данных"""
+        try:
+            if self.pool is None:
+                self.pool = await create_pool()
+            async with self.pool.acquire() as connection:
+                await connection.ping()
+            print("Успешное подключение к базе данных!")
+        except aiomysql.Error as e:
+            print(f"Ошибка подключения к MySQL: {e}")
+            raise
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Соединение из пула для нескольких запросов в одной транзакции.
+        Фиксация при успешном выходе, откат при исключении.
+        """
+        async with self.pool.acquire() as connection:
+            await connection.begin()
+            try:
+                yield connection
+                await connection.commit()
+            except BaseException:
+                await self._rollback(connection)
+                raise
+
+    async def execute_query(self, query, params=None, fetch=False, name=None):
+        """
+        Выполнение SQL запроса
+        :param fetch: Вернуть все строки результата списком
+        :param name: Имя запроса для метрик
+        :return: Список словарей при fetch=True, иначе True; False при ошибке
+        """
+        started = time.perf_counter()
+        rows = error = None
+        async with self.pool.acquire() as connection:
+            try:
+                async with connection.cursor(aiomysql.DictCursor) as cursor:
+                    await cursor.execute(query, params or ())
+                    if fetch:
+                        rows = await cursor.fetchall()
+                        return rows
+                    rows = max(cursor.rowcount, 0)
+                return True
+            except aiomysql.Error as e:
+                error = e
+                print(f"Ошибка выполнения запроса: {e}")
+                return False
+            finally:
+                instrumentation.record(self, query, params, time.perf_counter() - started, rows, error, name)
+
+    async def execute_named(self, name, params=None, fetch=False):
+        """Выполнение запроса из реестра queries.QUERIES по имени"""
+        return await self.execute_query(sql(name), params, fetch, name=name)
+
+    async def execute_insert(self, query, params=None, name=None):
+        """
+        Вставка одной строки
+        :param name: Имя запроса для метрик
+        :return: ID новой строки (lastrowid) или None при ошибке
+        """
+        started = time.perf_counter()
+        error = None
+        try:
+            async with self.transaction() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute(query, params or ())
+                    return cursor.lastrowid
+        except aiomysql.Error as e:
+            error = e
+            print(f"Ошибка выполнения запроса: {e}")
+            return None
+        finally:
+            instrumentation.record(self, query, params, time.perf_counter() - started,
+                                   1 - (error is not None), error, name)
+
+    async def iter_query(self, query, params=None, chunk_size=None, name=None):
+        """
+        Потоковое чтение результата небуферизованным курсором
+        :param name: Имя запроса для метрик
+        :return: Асинхронный генератор списков строк длиной не более chunk_size
+        """
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        # В метрики идет время ожидания базы, без обработки порций потребителем
+        elapsed = 0.0
+        row_count = 0
+        error = None
+        try:
+            async with self.pool.acquire() as connection:
+                started = time.perf_counter()
+                async with connection.cursor(aiomysql.SSDictCursor) as cursor:
+                    await cursor.execute(query, params or ())
+                    while True:
+                        rows = await cursor.fetchmany(chunk_size)
+                        elapsed += time.perf_counter() - started
+                        if not rows:
+                            break
+                        row_count += len(rows)
+                        yield rows
+                        started = time.perf_counter()
+        except aiomysql.Error as e:
+            error = e
+            print(f"Ошибка выполнения запроса: {e}")
+            raise
+        finally:
+            instrumentation.record(self, query, params, elapsed, row_count, error, name)
+
+    @staticmethod
+    async def _rollback(connection):
+        try:
+            await connection.rollback()
+        except aiomysql.Error:
+            pass
+
+    def pool_stats(self):
+        """Заполненность пула: всего соединений, свободных, максимум"""
+        return {'size': self.pool.size, 'idle': self.pool.freesize, 'max_size': self.pool.maxsize}
+
+    async def close(self):
+        """Закрытие всех соединений пула"""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            print("Соединение с базой данных закрыто")
+
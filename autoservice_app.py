@@ -1,13 +1,21 @@
+import time
 from tabulate import tabulate
 from db_connector import DatabaseManager
-from analytics import analytical_requests
+from analytics import analytical_requests, EMPLOYEE_STATS_COLUMNS
 from crud_operations import clientCRUD 
-from crud_operations import OrderCRUD
+from crud_operations import OrderCRUD, ORDER_STATUSES, ORDER_TABLE_COLUMNS
+from vectorized_analytics import VectorizedAnalytics, REPORTS
+from search_index import get_search_index
+from instrumentation import metrics, slow_query_log, metrics_json, metrics_text
 
 class AutoServiceApp:
     def __init__(self):
         self.db = DatabaseManager()
-        self.order_crud = OrderCRUD()
+        self.client_crud = clientCRUD(self.db)
+        self.order_crud = OrderCRUD(self.db)
+        self.analytics = analytical_requests(self.db)
+        self.reports = None  # VectorizedAnalytics создается при первом отчете (нужен pandas)
+        self.search_index = get_search_index(self.db)
     
     def display_menu(self):
         """Отображение главного меню с новыми пунктами"""
@@ -16,6 +24,7 @@ class AutoServiceApp:
             print("1. Управление клиентами")
             print("2. Управление заказами")
             print("3. Аналитические запросы")
+            print("4. Метрики запросов к БД")
             print("0. Выход")
             
             choice = input("Выберите раздел: ")
@@ -26,6 +35,8 @@ class AutoServiceApp:
                 self.order_management_menu()
             elif choice == "3":
                 self.analytics_menu()
+            elif choice == "4":
+                self.metrics_menu()
             elif choice == "0":
                 print("Выход из программы...")
                 self.db.close()
@@ -41,6 +52,7 @@ class AutoServiceApp:
             print("2. Просмотреть всех клиентов")
             print("3. Обновить данные клиента")
             print("4. Удалить клиента")
+            print("5. Найти клиента")
             print("0. Назад")
             
             choice = input("Выберите действие: ")
@@ -53,6 +65,8 @@ class AutoServiceApp:
                 self.update_client_menu()
             elif choice == "4":
                 self.delete_client_menu()
+            elif choice == "5":
+                self.search_clients_menu()
             elif choice == "0":
                 break
             else:
@@ -91,6 +105,8 @@ class AutoServiceApp:
             print("\n--- Аналитические запросы ---")
             print("1. Посмотреть заказы за период")
             print("2. Просмотреть статистику о сотруднике")
+            print("3. Управленческие отчеты за период")
+            print("4. Рейтинг сотрудников")
             print("0. Назад")
             
             choice = input("Выберите действие: ")
@@ -99,11 +115,50 @@ class AutoServiceApp:
                 self.orders_by_period_menu()
             elif choice == "2":
                 self.employee_stats_menu()
+            elif choice == "3":
+                self.management_reports_menu()
+            elif choice == "4":
+                self.employee_leaderboard_menu()
             elif choice == "0":
                 break
             else:
                 print("Неверный ввод, попробуйте снова")
     
+    def metrics_menu(self):
+        """Самые затратные запросы и методы, последние медленные запросы, экспорт метрик"""
+        snapshot = metrics.snapshot()
+        if not snapshot['queries']:
+            print("\nЗапросов еще не было")
+            return
+        print("\nЗапросы (по суммарному времени):")
+        print(tabulate([{
+            'Запрос': stats['query'],
+            'Вызовов': stats['calls'],
+            'Ошибок': stats['errors'],
+            'Всего, мс': round(stats['seconds'] * 1000, 1),
+            'Среднее, мс': stats['avg_ms'],
+            'Макс., мс': round(stats['max_seconds'] * 1000, 1),
+            'Строк': stats['rows'],
+            'КБ': round(stats['bytes'] / 1024, 1),
+        } for stats in snapshot['queries'][:15]], headers="keys", tablefmt="grid"))
+        print("\nМетоды приложения (медленные запросы и ошибки; все запросы - DB_METRICS_CALLERS=1):")
+        print(tabulate([{'Метод': stats['caller'], 'Вызовов': stats['calls'],
+                         'Всего, мс': round(stats['seconds'] * 1000, 1)}
+                        for stats in snapshot['callers'][:10]], headers="keys", tablefmt="grid"))
+
+        slow = slow_query_log.recent(10)
+        print(f"\nМедленных запросов (> {slow_query_log.threshold * 1000:.0f} мс): {slow_query_log.total}")
+        for entry in slow:
+            print(f"  {entry['time']} {entry['ms']} мс {entry['query']} ({entry['caller']})")
+            for step in entry['plan'] or []:
+                print(f"      table={step['table']} type={step['type']} key={step['key']} rows={step['rows']}")
+
+        choice = input("\np - формат Prometheus, j - JSON, Enter - назад: ").strip().lower()
+        if choice == 'p':
+            print(metrics_text())
+        elif choice == 'j':
+            print(metrics_json())
+
     # МЕТОДЫ МЕНЮ ДЛЯ КИЕНТОВ-----------------------------------------------------------------------------------
     def add_client_menu(self):
         print("\nДобавление нового клиента")
@@ -112,22 +167,78 @@ class AutoServiceApp:
         email = input("Email (необязательно): ") or None
         address = input("Адрес (необязательно): ") or None
         
-        if clientCRUD.add_client(self,name, phone, email, address):
-            print("Клиент успешно добавлен!")
+        # Автомобили регистрируются вместе с клиентом в одной транзакции
+        cars = []
+        while input("Добавить автомобиль клиента? (y/n): ").strip().lower() == 'y':
+            year = input("Год выпуска (необязательно): ")
+            cars.append({
+                'brand': input("Марка: "),
+                'model': input("Модель: "),
+                'license_plate': input("Гос. номер: ") or None,
+                'year': int(year) if year.isdigit() else None,
+                'vin': input("VIN (необязательно): ") or None,
+            })
+        
+        registered = self.client_crud.register_client_with_cars(
+            {'name': name, 'phone': phone, 'email': email, 'address': address}, cars
+        )
+        if registered:
+            client_id, car_ids = registered
+            print(f"Клиент успешно добавлен! ID: {client_id}, автомобилей: {len(car_ids)}")
         else:
             print("Ошибка при добавлении клиента")
     
     def show_clients(self):
-        clients = clientCRUD.get_clients(self)
-        if clients:
-            print("\nСписок клиентов:")
-            print(tabulate(clients, headers="keys", tablefmt="grid"))
-        else:
+        print("\nСписок клиентов:")
+        if not self._browse_pages(self.client_crud.get_clients_page):
             print("Нет данных о клиентах")
     
+    def _search_clients(self, query):
+        """Поиск по индексу с выводом найденных клиентов и времени поиска"""
+        started = time.perf_counter()
+        clients = self.search_index.search(query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if not clients:
+            print(f"Ничего не найдено ({elapsed_ms:.1f} мс)")
+            return clients
+        print(tabulate([{
+            'ID': client['client_id'],
+            'ФИО': client['name'],
+            'Телефон': client['phone'],
+            'Автомобили': ", ".join(f"{car['brand']} {car['model']} {car['license_plate'] or ''}".strip()
+                                    for car in client['cars'])
+        } for client in clients], headers="keys", tablefmt="grid"))
+        print(f"Найдено: {len(clients)} ({elapsed_ms:.1f} мс)")
+        return clients
+
+    def _pick_client(self, action):
+        """
+        Выбор клиента через поиск вместо вывода всего списка
+        :return: ID клиента или None, если поиск прерван
+        """
+        while True:
+            query = input("Поиск клиента (ФИО, телефон, госномер, VIN; Enter - отмена): ").strip()
+            if not query:
+                return None
+            clients = self._search_clients(query)
+            if not clients:
+                continue
+            choice = input(f"Введите ID клиента для {action} (Enter - новый поиск): ").strip()
+            if choice.isdigit():
+                return int(choice)
+
+    def search_clients_menu(self):
+        print("\nПоиск клиентов")
+        while True:
+            query = input("Запрос (ФИО, телефон, госномер, VIN; Enter - выход): ").strip()
+            if not query:
+                break
+            self._search_clients(query)
+
     def update_client_menu(self):
-        self.show_clients()
-        client_id = input("Введите ID клиента для обновления: ")
+        client_id = self._pick_client("обновления")
+        if client_id is None:
+            return
         
         print("Введите новые данные (оставьте пустым, чтобы не изменять):")
         name = input("ФИО: ") or None
@@ -141,16 +252,17 @@ class AutoServiceApp:
         if email: updates['email'] = email
         if address: updates['address'] = address
         
-        if updates and clientCRUD.update_client(self, client_id, **updates):
+        if updates and self.client_crud.update_client(client_id, **updates):
             print("Данные клиента обновлены!")
         else:
             print("Ошибка при обновлении или не введены новые данные")
     
     def delete_client_menu(self):
-        self.show_clients()
-        client_id = input("Введите ID клиента для удаления: ")
+        client_id = self._pick_client("удаления")
+        if client_id is None:
+            return
         
-        if clientCRUD.delete_client(self, client_id):
+        if self.client_crud.delete_client(client_id):
             print("Клиент удален!")
         else:
             print("Ошибка при удалении клиента")
@@ -160,18 +272,13 @@ class AutoServiceApp:
         """Меню добавления нового заказа"""
         print("\nДобавление нового заказа")
         
-        # Показываем список клиентов для выбора
-        clients = self.db.execute_query("SELECT client_id, name FROM clients", fetch=True)
-        print("\nСписок клиентов:")
-        print(tabulate(clients, headers="keys", tablefmt="grid"))
-        client_id = int(input("Введите ID клиента: "))
+        # Клиент выбирается поиском по индексу, а не из полного списка
+        client_id = self._pick_client("заказа")
+        if client_id is None:
+            return
         
         # Показываем список автомобилей клиента
-        cars = self.db.execute_query(
-            "SELECT car_id, brand, model, license_plate FROM cars WHERE client_id = %s",
-            (client_id,),
-            fetch=True
-        )
+        cars = self.db.execute_named('cars.by_client', (client_id,), fetch=True)
         if not cars:
             print("У клиента нет зарегистрированных автомобилей!")
             return
@@ -191,37 +298,16 @@ class AutoServiceApp:
             print("Ошибка при создании заказа")
 
     def show_orders(self):
-        """Отображение списка всех заказов с детализацией"""
+        """Отображение списка заказов постранично, с навигацией вперед/назад"""
         try:
-            # Создаем экземпляр OrderCRUD для работы с заказами
-            order_crud = OrderCRUD()
-            
-            # Получаем все заказы с JOIN-данными
-            orders = order_crud.read_all_orders()
-            
-            if not orders:
+            print("\nСписок заказов:")
+            if not self._browse_pages(self.order_crud.read_orders_page, self._format_order_row,
+                                      [header for _, header in ORDER_TABLE_COLUMNS]):
                 print("\nНет доступных заказов")
                 return
             
-            print("\nСписок всех заказов:")
-            
-            # Форматируем данные для лучшего отображения
-            formatted_orders = []
-            for order in orders:
-                formatted_order = {
-                    'ID': order['order_id'],
-                    'Дата создания': order['creation_date'].strftime('%Y-%m-%d %H:%M'),
-                    'Статус': self._translate_status(order['status']),
-                    'Клиент': order['client_name'],
-                    'Автомобиль': f"{order['brand']} {order['model']}"
-                }
-                formatted_orders.append(formatted_order)
-            
-            # Выводим красиво оформленную таблицу
-            print(tabulate(formatted_orders, headers="keys", tablefmt="grid"))
-            
             # Дополнительная статистика
-            self._show_orders_stats(orders)
+            self._show_orders_stats(self.order_crud.get_order_stats())
             
         except Exception as e:
             print(f"\nОшибка при получении списка заказов: {e}")
@@ -236,44 +322,127 @@ class AutoServiceApp:
         }
         return status_map.get(status, status)
 
-    def _show_orders_stats(self, orders):
-        """Вывод статистики по заказам"""
-        stats = {
-            'Всего заказов': len(orders),
-            'Новых': sum(1 for o in orders if o['status'] == 'new'),
-            'В работе': sum(1 for o in orders if o['status'] == 'in_progress'),
-            'Завершенных': sum(1 for o in orders if o['status'] == 'completed')
-        }
-        
+    def _format_order_row(self, order):
+        """Значения столбцов ORDER_TABLE_COLUMNS для вывода (статус - по-русски)"""
+        return [order.order_id, order.created, self._translate_status(order.status),
+                order.client_name, order.car]
+
+    def _browse_pages(self, fetch_page, format_row=None, headers="keys"):
+        """
+        Постраничный просмотр с навигацией по курсорам
+        :param fetch_page: Функция cursor -> Page
+        :param format_row: Функция форматирования строки перед выводом
+        :param headers: Заголовки столбцов (для format_row) или "keys" - имена столбцов строки
+        :return: True, если была показана хотя бы одна строка
+        """
+        cursor = None
+        while True:
+            page = fetch_page(cursor)
+            if not page.rows:
+                return cursor is not None
+            rows = (format_row(row) for row in page.rows) if format_row else page.rows
+            print(tabulate(rows, headers=headers, tablefmt="grid"))
+
+            options = []
+            if page.prev_cursor:
+                options.append("p - предыдущая")
+            if page.next_cursor:
+                options.append("n - следующая")
+            if not options:
+                return True
+
+            choice = input(f"{', '.join(options)}, Enter - продолжить: ").strip().lower()
+            if choice == 'n' and page.next_cursor:
+                cursor = page.next_cursor
+            elif choice == 'p' and page.prev_cursor:
+                cursor = page.prev_cursor
+            else:
+                return True
+
+    def _print_pages(self, pages, format_row=None, headers="keys"):
+        """
+        Вывод результата потокового запроса по мере получения порций
+        :param pages: Генератор списков строк
+        :param format_row: Функция форматирования строки перед выводом
+        :param headers: Заголовки столбцов (для format_row) или "keys"
+        :return: Количество выведенных строк
+        """
+        shown = 0
+        try:
+            for page in pages:
+                rows = (format_row(row) for row in page) if format_row else page
+                print(tabulate(rows, headers=headers, tablefmt="grid"))
+                shown += len(page)
+        finally:
+            pages.close()
+        return shown
+
+    def _show_orders_stats(self, order_stats):
+        """Вывод статистики по заказам (см. OrderCRUD.get_order_stats)"""
+        if order_stats is None:
+            print("\nНе удалось получить статистику по заказам")
+            return
+        rows = []
+        for status in ORDER_STATUSES + ['total']:
+            stats = order_stats.get(status)
+            if not stats or not stats['order_count']:
+                continue
+            rows.append([
+                'Всего' if status == 'total' else self._translate_status(status),
+                stats['order_count'],
+                stats['total_cost'],
+                f"{stats['avg_cost']:.2f}" if stats['avg_cost'] is not None else '-'
+            ])
+
         print("\nСтатистика по заказам:")
-        print(tabulate(stats.items(), headers=['Тип', 'Количество'], tablefmt="grid"))
+        print(tabulate(rows, headers=['Статус', 'Количество', 'Сумма', 'Средняя стоимость'], tablefmt="grid"))
 
-    def update_order_menu(self):
-        """Меню обновления заказа"""
-        orders = OrderCRUD.read_all_orders(self)
+    def _pick_order(self, action, verify=True):
+        """
+        Выбор заказа через поиск вместо вывода всей таблицы заказов
+        :param action: Действие для подсказки ("обновления", "удаления"...)
+        :param verify: Проверить существование заказа, если его ID нет среди найденных
+        :return: Строка заказа (order_id, status, ...) или None
+        """
+        term = input("Поиск заказа (номер, телефон, ФИО или госномер; Enter - последние заказы): ")
+        if term.strip():
+            orders = self.order_crud.search_orders(term)
+        else:
+            orders = self.order_crud.read_orders_page(limit=20).rows
         if not orders:
-            print("Нет доступных заказов")
-            return
-        
-        print("\nСписок заказов:")
-        print(tabulate(orders, headers="keys", tablefmt="grid"))
-        order_id = input("Введите ID заказа для обновления: ")
-        
-        # Получаем текущий статус
-        current_status = self.db.execute_query(
-            "SELECT status FROM orders WHERE order_id = %s",
-            (order_id,),
-            fetch=True
-        )
-        if not current_status:
+            print("Заказы не найдены")
+            return None
+
+        print("\nНайденные заказы:")
+        columns = ORDER_TABLE_COLUMNS + [('license_plate', "Госномер")] if term.strip() else ORDER_TABLE_COLUMNS
+        self.order_crud.display_orders_table(orders, columns)
+        try:
+            order_id = int(input(f"Введите ID заказа для {action}: "))
+        except ValueError:
+            print("Ошибка: ID заказа должен быть числом")
+            return None
+
+        for order in orders:
+            if order['order_id'] == order_id:
+                return order
+        if not verify:
+            return {'order_id': order_id}
+        order = self.order_crud.read_order(order_id)
+        if not order:
             print("Заказ не найден!")
+        return order
+
+    def update_order_menu(self):
+        """Меню обновления заказа"""
+        order = self._pick_order("обновления")
+        if not order:
             return
         
-        print(f"\nТекущий статус: {current_status[0]['status']}")
+        print(f"\nТекущий статус: {order['status']}")
         print("Доступные статусы: new, in_progress, completed, cancelled")
         new_status = input("Новый статус: ")
         
-        if OrderCRUD.update_order_status(self, order_id, new_status):
+        if self.order_crud.update_order_status(order['order_id'], new_status):
             print("Статус заказа обновлен!")
         else:
             print("Ошибка при обновлении заказа")
@@ -281,17 +450,10 @@ class AutoServiceApp:
     def delete_order_menu(self):
         """Меню удаления заказа"""
         try:
-            # Получаем список заказов для отображения
-            orders = self.order_crud.read_all_orders()
-            if not orders:
-                print("Нет доступных заказов для удаления")
+            order = self._pick_order("удаления")
+            if not order:
                 return
-
-            print("\nСписок заказов:")
-            self.order_crud.display_orders_table(orders)
-
-            # Запрос ID заказа для удаления
-            order_id = int(input("\nВведите ID заказа для удаления: "))
+            order_id = order['order_id']
             
             # Подтверждение
             confirm = input(f"Вы уверены, что хотите удалить заказ {order_id}? (y/n): ")
@@ -305,55 +467,44 @@ class AutoServiceApp:
             else:
                 print("Не удалось удалить заказ")
 
-        except ValueError:
-            print("Ошибка: ID заказа должен быть числом")
         except Exception as e:
             print(f"Ошибка при удалении заказа: {e}")
 
     def show_order_details(self):
         """Просмотр деталей конкретного заказа"""
-        orders = OrderCRUD.read_all_orders(self)
-        if not orders:
-            print("Нет доступных заказов")
+        order = self._pick_order("просмотра деталей", verify=False)
+        if not order:
             return
         
-        print("\nСписок заказов:")
-        print(tabulate(orders, headers="keys", tablefmt="grid"))
-        order_id = input("Введите ID заказа для просмотра деталей: ")
-        
-        # Получаем полную информацию о заказе
-        order_info = self.db.execute_query("""
-            SELECT o.order_id, o.creation_date, o.status, o.total_cost,
-                c.name as client_name, c.phone as client_phone,
-                car.brand, car.model, car.year, car.license_plate
-            FROM orders o
-            JOIN clients c ON o.client_id = c.client_id
-            JOIN cars car ON o.car_id = car.car_id
-            WHERE o.order_id = %s
-        """, (order_id,), fetch=True)
-        
-        if not order_info:
+        # Заказ, клиент, автомобиль, работы с запчастями и платежи - двумя запросами
+        aggregate = self.order_crud.load_order_aggregate(order['order_id'])
+        if not aggregate:
             print("Заказ не найден!")
             return
         
         print("\nДетали заказа:")
-        print(tabulate(order_info, headers="keys", tablefmt="grid"))
-        
-        # Показываем связанные работы
-        works = self.db.execute_query("""
-            SELECT w.work_id, s.name as service, e.name as employee,
-                w.start_date, w.end_date, w.status
-            FROM works w
-            JOIN services s ON w.service_id = s.service_id
-            JOIN employees e ON w.employee_id = e.employee_id
-            WHERE w.order_id = %s
-        """, (order_id,), fetch=True)
+        print(tabulate([aggregate['order']], headers="keys", tablefmt="grid"))
+        print("\nКлиент и автомобиль:")
+        print(tabulate([dict(aggregate['client'], **aggregate['car'])], headers="keys", tablefmt="grid"))
         
-        if works:
+        if aggregate['works']:
             print("\nРаботы по заказу:")
+            works = [{key: value for key, value in work.items() if key != 'parts'}
+                     for work in aggregate['works']]
             print(tabulate(works, headers="keys", tablefmt="grid"))
+            parts = [dict(part, work_id=work['work_id'])
+                     for work in aggregate['works'] for part in work['parts']]
+            if parts:
+                print("\nИспользованные запчасти:")
+                print(tabulate(parts, headers="keys", tablefmt="grid"))
         else:
             print("По этому заказу нет работ")
+        
+        if aggregate['payments']:
+            print("\nПлатежи:")
+            print(tabulate(aggregate['payments'], headers="keys", tablefmt="grid"))
+        else:
+            print("По этому заказу нет платежей")
 
     #аналитические запросы
     def orders_by_period_menu(self):
@@ -361,24 +512,69 @@ class AutoServiceApp:
         start_date = input("Начальная дата (ГГГГ-ММ-ДД): ")
         end_date = input("Конечная дата (ГГГГ-ММ-ДД): ")
         
-        orders = analytical_requests.get_orders_by_period(self,start_date, end_date)
-        if orders:
-            print(f"\nЗаказы с {start_date} по {end_date}:")
-            print(tabulate(orders, headers="keys", tablefmt="grid"))
-        else:
+        orders = self.analytics.get_orders_by_period(start_date, end_date, stream=True)
+        print(f"\nЗаказы с {start_date} по {end_date}:")
+        headers = [header for _, header in ORDER_TABLE_COLUMNS] + ["Стоимость"]
+        if not self._print_pages(orders, lambda order: self._format_order_row(order) + [order.total_cost], headers):
             print("Нет заказов за указанный период")
+            return
+
+        self._show_orders_stats(self.order_crud.get_order_stats(start_date, end_date))
     
     def employee_stats_menu(self):
         print("\nАналитика: статистика по сотруднику")
-        employee_id = input("Введите ID сотрудника: ")
+        employee_id = input("Введите ID сотрудника: ").strip()
+        if not employee_id.isdigit():
+            print("ID сотрудника должен быть числом")
+            return
         
-        stats = analytical_requests.get_employee_stats(self,employee_id)
+        stats = self.analytics.get_employee_stats(int(employee_id))
         if stats:
             print("\nСтатистика по сотруднику:")
             print(tabulate(stats, headers="keys", tablefmt="grid"))
         else:
             print("Нет данных по указанному сотруднику")
 
+    def employee_leaderboard_menu(self):
+        print("\nАналитика: рейтинг сотрудников")
+        start_date = input("Начальная дата (ГГГГ-ММ-ДД, Enter - за все время): ").strip() or None
+        end_date = input("Конечная дата (ГГГГ-ММ-ДД, Enter - по сегодня): ").strip() or None
+        top = input("Сколько сотрудников показать (Enter - 10): ").strip()
+        print("Показатель: 1 - доход, 2 - количество работ, 3 - загрузка")
+        order_by = {'2': 'work_count', '3': 'utilization'}.get(input("Выберите показатель: ").strip(), 'total_income')
+
+        try:
+            stats = self.analytics.get_employee_leaderboard(start_date, end_date, int(top) if top else 10, order_by)
+        except ValueError as e:
+            print(f"Ошибка: {e}")
+            return
+        if stats:
+            print(tabulate([[row[column] for column, _ in EMPLOYEE_STATS_COLUMNS] for row in stats],
+                           headers=[header for _, header in EMPLOYEE_STATS_COLUMNS], tablefmt="grid"))
+        else:
+            print("Нет данных по сотрудникам")
+
+    def management_reports_menu(self):
+        print("\nАналитика: управленческие отчеты")
+        if self.reports is None:
+            try:
+                self.reports = VectorizedAnalytics(self.db)
+            except ImportError as e:
+                print(e)
+                return
+        start_date = input("Начальная дата (ГГГГ-ММ-ДД): ")
+        end_date = input("Конечная дата (ГГГГ-ММ-ДД): ")
+
+        # Все отчеты считаются по одному снимку периода
+        for name, (title, columns) in REPORTS.items():
+            rows = self.reports.get_report(name, start_date, end_date)
+            print(f"\n{title}:")
+            if rows:
+                print(tabulate([[row[column] for column, _ in columns] for row in rows],
+                               headers=[header for _, header in columns], tablefmt="grid"))
+            else:
+                print("Нет данных")
+
 if __name__ == "__main__":
     try:
         app = AutoServiceApp()
@@ -1,81 +1,175 @@
 import sys
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QPushButton, QTableWidget, QTableWidgetItem, QDialog, QFormLayout,
-                             QLineEdit, QComboBox, QDateEdit, QMessageBox, QLabel, QDialogButtonBox, QToolBar)
-from PyQt6.QtCore import Qt, QDate
+                             QPushButton, QTableView, QAbstractItemView, QDialog, QFormLayout,
+                             QLineEdit, QComboBox, QDateEdit, QMessageBox, QLabel, QDialogButtonBox, QToolBar,
+                             QProgressBar, QCompleter, QPlainTextEdit)
+from PyQt6.QtCore import Qt, QDate, QStringListModel, QModelIndex, QTimer, pyqtSignal
+from PyQt6.QtGui import QAction, QKeySequence
 from db_connector import DatabaseManager
+from gui_models import LazyTableModel
+from gui_workers import QueryRunner
+from pagination import fetch_keyset_page, Page, DEFAULT_PAGE_SIZE
+from crud_operations import clientCRUD, OrderCRUD, ORDER_STATUSES
+from vectorized_analytics import VectorizedAnalytics, REPORTS
+from analytics import analytical_requests, EMPLOYEE_STATS_COLUMNS
+from queries import sql
+from records import Order, Client, Car
+from instrumentation import metrics, slow_query_log, metrics_json, metrics_text
+from search_index import get_search_index, describe_client, query_fragments, DEFAULT_SEARCH_LIMIT
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
+# Пауза после последнего нажатия клавиши перед поиском клиента в диалоге заказа
+PICKER_DEBOUNCE_MS = int(os.getenv('PICKER_DEBOUNCE_MS', 250))
+
+# Сколько клиентов показывать в подсказках диалога заказа
+PICKER_LIMIT = int(os.getenv('PICKER_LIMIT', 15))
+
 class DatabaseManagerGUI:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+        self.client_crud = clientCRUD(self.db)
+        self.order_crud = OrderCRUD(self.db)
+        self.search_index = get_search_index(self.db)
     
-    def get_clients(self):
-        return self.db.execute_query("SELECT * FROM clients", fetch=True)
+    def get_clients(self, stream=False, chunk_size=None):
+        return self.db.execute_named('clients.list', fetch=True, stream=stream, chunk_size=chunk_size)
+    
+    def get_clients_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Страница клиентов (keyset по client_id), строки - Client"""
+        return fetch_keyset_page(
+            self.db, sql('clients.list'), ['client_id'],
+            lambda client: (client.client_id,),
+            cursor=cursor, limit=limit, record=Client
+        )
     
     def add_client(self, name, phone, email=None, address=None):
-        query = "INSERT INTO clients (name, phone, email, address) VALUES (%s, %s, %s, %s)"
-        return self.db.execute_query(query, (name, phone, email, address))
+        """Добавление клиента: ID нового клиента или None при ошибке"""
+        client_id = self.db.execute_insert(sql('clients.insert'), (name, phone, email, address),
+                                           name='clients.insert')
+        if client_id is not None:
+            self.search_index.add_client(client_id, name, phone, email)
+        return client_id
     
     def add_car(self, client_id, brand, model, license_plate, year=None):
-        """Добавление автомобиля для клиента"""
-        query = """
-        INSERT INTO cars (client_id, brand, model, license_plate, year)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        return self.db.execute_query(query, (client_id, brand, model, license_plate, year))
+        """Добавление автомобиля для клиента: ID автомобиля или None при ошибке"""
+        car_id = self.db.execute_insert(sql('cars.insert'), (client_id, brand, model, license_plate, year, None),
+                                        name='cars.insert')
+        if car_id is not None:
+            self.search_index.add_car(car_id, client_id, brand, model, license_plate)
+        return car_id
+    
+    def register_client_with_cars(self, client, cars):
+        """Клиент и автомобили в одной транзакции (см. clientCRUD.register_client_with_cars)"""
+        return self.client_crud.register_client_with_cars(client, cars)
+    
+    def get_orders_with_details(self, stream=False, chunk_size=None):
+        return self.db.execute_named('orders.list', fetch=True, stream=stream, chunk_size=chunk_size)
+    
+    def get_orders_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Страница заказов от новых к старым (keyset по creation_date, order_id), строки - Order"""
+        return fetch_keyset_page(
+            self.db, sql('orders.list'), ['o.creation_date', 'o.order_id'],
+            lambda order: (order.creation_date, order.order_id),
+            cursor=cursor, limit=limit, descending=True, record=Order
+        )
     
-    def get_orders_with_details(self):
+    def get_orders_by_date(self, start_date, end_date, stream=False, chunk_size=None):
         query = """
-        SELECT o.order_id, o.creation_date, o.status, 
-               c.name as client_name, car.brand, car.model
+        SELECT o.order_id, o.creation_date, o.status,
+               c.name as client_name, car.brand
         FROM orders o
         JOIN clients c ON o.client_id = c.client_id
         JOIN cars car ON o.car_id = car.car_id
+        WHERE o.creation_date BETWEEN %s AND %s
         """
-        return self.db.execute_query(query, fetch=True)
+        if stream:
+            return self.db.iter_query(query, (start_date, end_date), chunk_size)
+        return self.db.execute_query(query, (start_date, end_date), fetch=True)
     
-    def get_orders_by_date(self, start_date, end_date):
+    def get_orders_by_date_page(self, start_date, end_date, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """Страница заказов за период в хронологическом порядке"""
         query = """
         SELECT o.order_id, o.creation_date, o.status,
                c.name as client_name, car.brand
         FROM orders o
         JOIN clients c ON o.client_id = c.client_id
         JOIN cars car ON o.car_id = car.car_id
-        WHERE o.creation_date BETWEEN %s AND %s
         """
-        return self.db.execute_query(query, (start_date, end_date), fetch=True)
+        return fetch_keyset_page(
+            self.db, query, ['o.creation_date', 'o.order_id'],
+            lambda order: (order.creation_date, order.order_id),
+            cursor=cursor, limit=limit,
+            where="o.creation_date BETWEEN %s AND %s", params=(start_date, end_date), record=Order
+        )
     
     def delete_client(self, client_id):
-        query = "DELETE FROM clients WHERE client_id = %s"
-        return self.db.execute_query(query, (client_id,))
+        return self.client_crud.delete_client(client_id)
+    
+    def search_clients(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        """Поиск клиентов по ФИО, телефону, госномеру или VIN (см. ClientSearchIndex.search)"""
+        return self.search_index.search(query, limit)
     
     def delete_order(self, order_id):
-        query = "DELETE FROM orders WHERE order_id = %s"
-        return self.db.execute_query(query, (order_id,))
+        """Удаление заказа (см. OrderCRUD.delete_order)"""
+        return self.order_crud.delete_order(order_id)
     
     def add_order(self, client_id, car_id, status='new'):
-        """Добавление нового заказа в БД"""
-        query = """
-        INSERT INTO orders (client_id, car_id, status)
-        VALUES (%s, %s, %s)
-        """
-        return self.db.execute_query(query, (client_id, car_id, status))
+        """Добавление нового заказа: ID заказа или None (см. OrderCRUD.create_order)"""
+        return self.order_crud.create_order(client_id, car_id, status)
+    
+    def get_order_stats(self, start_date=None, end_date=None, client_id=None):
+        """Статистика заказов по статусам (см. OrderCRUD.get_order_stats)"""
+        return self.order_crud.get_order_stats(start_date, end_date, client_id)
     
+    def find_clients_with_cars(self, text, limit=PICKER_LIMIT):
+        """
+        Клиенты для подсказок вместе с их автомобилями.
+        Пока индекс поиска строится - запрос к БД с той же нормализацией ввода, что и в индексе:
+        начала слов ФИО, фрагмент телефона без кода страны, госномера или VIN
+        :return: Список словарей client_id, name, phone, cars
+        """
+        if self.search_index.is_built:
+            return self.search_index.search(text, limit)
+
+        words = text.split()
+        if not words:
+            return []
+        # Все слова - начала слов ФИО (как совпадение по префиксам в индексе)
+        conditions = [" AND ".join(["(c.name LIKE %s OR c.name LIKE %s)"] * len(words))]
+        params = [pattern for word in words for pattern in (word + '%', '% ' + word + '%')]
+        for fragment in query_fragments(text):
+            conditions.append("c.phone LIKE %s OR car.license_plate LIKE %s OR car.vin LIKE %s")
+            params.extend(['%' + fragment + '%'] * 3)
+        clients = self.db.execute_query(
+            "SELECT DISTINCT c.client_id, c.name, c.phone, c.email FROM clients c "
+            "LEFT JOIN cars car ON car.client_id = c.client_id "
+            f"WHERE ({') OR ('.join(conditions)}) ORDER BY c.name LIMIT %s",
+            tuple(params) + (limit,), fetch=True
+        ) or []
+        by_id = {client['client_id']: dict(client, cars=[]) for client in clients}
+        if by_id:
+            placeholders = ", ".join(["%s"] * len(by_id))
+            cars = self.db.execute_query(
+                f"SELECT car_id, client_id, brand, model, license_plate, vin FROM cars "
+                f"WHERE client_id IN ({placeholders})",
+                tuple(by_id), fetch=True, record=Car
+            ) or []
+            for car in cars:
+                by_id[car.client_id]['cars'].append(car)
+        return list(by_id.values())
+
     def get_client_cars(self, client_id):
         """Получение автомобилей клиента"""
-        query = """
-        SELECT car_id, brand, model, license_plate 
-        FROM cars 
-        WHERE client_id = %s
-        """
-        return self.db.execute_query(query, (client_id,), fetch=True)
+        return self.db.execute_named('cars.by_client', (client_id,), fetch=True)
 
 #класс MainWindow -------------------------------------------------------------------------------------------------------------------
 class MainWindow(QMainWindow):
+    # Индекс поиска сброшен (сигнал из любого потока доставляется в UI-поток)
+    search_index_invalidated = pyqtSignal()
+
     def __init__(self):
         super().__init__()
         self.db = DatabaseManagerGUI()
@@ -95,8 +189,24 @@ class MainWindow(QMainWindow):
         self.btn_add_order.clicked.connect(self.add_order_dialog)
         self.toolbar.addWidget(self.btn_add_order)
         
+        # Поиск клиента с подсказками по мере ввода (индекс в памяти, без запросов к БД)
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Поиск: ФИО, телефон, госномер, VIN")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setMaximumWidth(300)
+        self.search_results = []
+        self.search_model = QStringListModel(self)
+        self.search_completer = QCompleter(self.search_model, self)
+        # Список уже отобран индексом: completer не должен фильтровать его повторно
+        self.search_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.search_completer.activated[QModelIndex].connect(self.on_search_activated)
+        self.search_input.setCompleter(self.search_completer)
+        self.search_input.textEdited.connect(self.update_search_completions)
+        self.search_input.returnPressed.connect(self.show_search_results)
+        self.toolbar.addWidget(self.search_input)
+        
         # Основная таблица
-        self.table = QTableWidget()
+        self.table = QTableView()
         self.setCentralWidget(self.table)
         
         # Главный виджет
@@ -122,38 +232,139 @@ class MainWindow(QMainWindow):
         self.btn_analytics.clicked.connect(self.show_analytics)
         btn_layout.addWidget(self.btn_analytics)
         
+        self.btn_metrics = QPushButton("Метрики БД")
+        self.btn_metrics.clicked.connect(self.show_metrics)
+        btn_layout.addWidget(self.btn_metrics)
+        
         layout.addLayout(btn_layout)
         
-        # Таблица для отображения данных
-        self.table = QTableWidget()
-        self.table.setColumnCount(0)
+        # Таблица для отображения данных: строки подгружаются моделью по мере прокрутки
+        self.table = QTableView()
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setContextMenuPolicy(Qt.ContextMenuPolicy.ActionsContextMenu)
         layout.addWidget(self.table)
         
-        # Статус бар
+        # Статистика по заказам под таблицей заказов
+        self.stats_label = QLabel()
+        self.stats_label.hide()
+        layout.addWidget(self.stats_label)
+        
+        # Действия над строкой: контекстное меню и клавиша Delete вместо кнопки в каждой строке
+        self.delete_row = None
+        self.action_delete = QAction("Удалить", self.table)
+        self.action_delete.setShortcut(QKeySequence.StandardKey.Delete)
+        self.action_delete.triggered.connect(self.delete_selected_row)
+        self.table.addAction(self.action_delete)
+        
+        # Фоновое выполнение запросов: потоков не больше, чем соединений в пуле
+        self.runner = QueryRunner(self, max_threads=self.db.db.pool.max_size)
+        self.runner.busy_changed.connect(self.on_busy_changed)
+        self.runner.error.connect(self.on_query_error)
+        
+        # Управленческие отчеты (numpy/pandas): снимок периода кэшируется между запросами отчетов
+        try:
+            self.reports = VectorizedAnalytics(self.db.db)
+        except ImportError:
+            self.reports = None
+        self.analytics = self.reports or analytical_requests(self.db.db)
+        
+        # Статус бар с индикатором загрузки
+        self.progress = QProgressBar()
+        self.progress.setRange(0, 0)
+        self.progress.setMaximumWidth(150)
+        self.progress.hide()
+        self.statusBar().addPermanentWidget(self.progress)
         self.statusBar().showMessage("Готово")
+        
+        # Индекс поиска строится в фоне при запуске и заново - после каждого сброса
+        self.search_index_invalidated.connect(self.build_search_index)
+        self.db.search_index.on_invalidate(self.search_index_invalidated.emit)
+        self.build_search_index()
+
+    def build_search_index(self):
+        """Фоновое построение индекса поиска; еще не начатое построение заменяется новым"""
+        self.runner.submit('search_index', self.db.search_index.build)
+
+    def on_busy_changed(self, busy):
+        self.progress.setVisible(busy)
+        self.statusBar().showMessage("Загрузка..." if busy else "Готово")
+
+    def on_query_error(self, message):
+        self.statusBar().showMessage(f"Ошибка запроса: {message}")
 
     def clear_table(self):
         """Очищает таблицу и сбрасывает заголовки"""
-        self.table.clear()
-        self.table.setRowCount(0)
-        self.table.setColumnCount(0)
+        self.runner.cancel('table')
+        self.runner.cancel('stats')
+        self.stats_label.hide()
+        self.table.setModel(None)
+        self.delete_row = None
+
+    def show_table(self, model, delete_row):
+        """
+        Подключение модели к основной таблице
+        :param model: LazyTableModel
+        :param delete_row: Функция удаления записи по ее ID
+        """
+        self.runner.cancel('table')
+        self.runner.cancel('stats')
+        self.stats_label.hide()
+        model.load_failed.connect(self.on_query_error)
+        self.table.setModel(model)
+        self.delete_row = delete_row
+
+    def delete_selected_row(self):
+        """Удаление записи в выделенной строке"""
+        index = self.table.currentIndex()
+        if self.delete_row is None or not index.isValid():
+            return
+        self.delete_row(self.table.model().row_id(index.row()))
 
     def show_clients(self):
-        self.clear_table()  # Очищаем перед загрузкой новых данных
-        clients = self.db.get_clients()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["ID", "ФИО", "Телефон", "Email", "Действия"])
-        self.table.setRowCount(len(clients))
-        
-        for row, client in enumerate(clients):
-            self.table.setItem(row, 0, QTableWidgetItem(str(client["client_id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(client["name"]))
-            self.table.setItem(row, 2, QTableWidgetItem(client["phone"]))
-            self.table.setItem(row, 3, QTableWidgetItem(client["email"] or ""))
-            
-            btn_delete = QPushButton("Удалить")
-            btn_delete.clicked.connect(lambda _, id=client["client_id"]: self.delete_client(id))
-            self.table.setCellWidget(row, 4, btn_delete)
+        model = LazyTableModel(
+            ["ID", "ФИО", "Телефон", "Email"],
+            self.db.get_clients_page,
+            lambda client: (client.client_id, client.name, client.phone, client.email),
+            self, runner=self.runner
+        )
+        self.show_table(model, self.delete_client)
+
+    def update_search_completions(self, text):
+        """Подсказки поиска по мере ввода"""
+        if not self.db.search_index.is_built:
+            self.statusBar().showMessage("Индекс поиска еще строится...")
+            return
+        self.search_results = self.db.search_clients(text) if text.strip() else []
+        self.search_model.setStringList([describe_client(client) for client in self.search_results])
+
+    def on_search_activated(self, index):
+        """Выбор подсказки: в таблице показывается только этот клиент"""
+        if 0 <= index.row() < len(self.search_results):
+            self.show_client_rows([self.search_results[index.row()]])
+
+    def show_search_results(self):
+        """Enter в строке поиска: все найденные клиенты в основной таблице"""
+        text = self.search_input.text().strip()
+        if not text:
+            self.show_clients()
+            return
+        if not self.db.search_index.is_built:
+            self.statusBar().showMessage("Индекс поиска еще строится...")
+            return
+        self.show_client_rows(self.db.search_clients(text, limit=DEFAULT_PAGE_SIZE))
+
+    def show_client_rows(self, clients):
+        """Вывод найденных клиентов с их автомобилями в основную таблицу"""
+        model = LazyTableModel(
+            ["ID", "ФИО", "Телефон", "Email", "Автомобили"],
+            lambda cursor: Page(clients, None, None),
+            lambda client: (client["client_id"], client["name"], client["phone"], client["email"],
+                            ", ".join(f"{car['brand']} {car['model']} {car['license_plate'] or ''}".strip()
+                                      for car in client["cars"])),
+            self
+        )
+        self.show_table(model, self.delete_client)
+        self.statusBar().showMessage(f"Найдено клиентов: {len(clients)}")
 
     def delete_client(self, client_id):
         reply = QMessageBox.question(
@@ -164,29 +375,43 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            if self.db.delete_client(client_id):
-                QMessageBox.information(self, "Успех", "Клиент удален!")
-                self.show_clients()
-            else:
-                QMessageBox.critical(self, "Ошибка", "Не удалось удалить клиента")
+            self.runner.submit('delete_client', self.db.delete_client, client_id,
+                               on_result=self.on_client_deleted)
+
+    def on_client_deleted(self, deleted):
+        if deleted:
+            QMessageBox.information(self, "Успех", "Клиент удален!")
+            self.show_clients()
+        else:
+            QMessageBox.critical(self, "Ошибка", "Не удалось удалить клиента")
 
     def show_orders(self):
-        self.clear_table()  # Очищаем перед загрузкой новых данных
-        orders = self.db.get_orders_with_details()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "Дата", "Статус", "Клиент", "Автомобиль", "Действия"])
-        self.table.setRowCount(len(orders))
-        
-        for row, order in enumerate(orders):
-            self.table.setItem(row, 0, QTableWidgetItem(str(order["order_id"])))
-            self.table.setItem(row, 1, QTableWidgetItem(str(order["creation_date"])))
-            self.table.setItem(row, 2, QTableWidgetItem(order["status"]))
-            self.table.setItem(row, 3, QTableWidgetItem(order["client_name"]))
-            self.table.setItem(row, 4, QTableWidgetItem(f"{order['brand']} {order['model']}"))
-            
-            btn_delete = QPushButton("Удалить")
-            btn_delete.clicked.connect(lambda _, id=order["order_id"]: self.delete_order(id))
-            self.table.setCellWidget(row, 5, btn_delete)
+        model = LazyTableModel(
+            ["ID", "Дата", "Статус", "Клиент", "Автомобиль"],
+            self.db.get_orders_page,
+            lambda order: (order.order_id, order.created, order.status, order.client_name, order.car),
+            self, runner=self.runner
+        )
+        self.show_table(model, self.delete_order)
+        self.runner.submit('stats', self.db.get_order_stats,
+                           on_result=lambda stats: self.show_order_stats(self.stats_label, stats))
+    
+    def show_order_stats(self, label, order_stats):
+        """Вывод статистики по заказам в строку под таблицей"""
+        if order_stats is None:
+            label.setText("Не удалось получить статистику по заказам")
+            label.show()
+            return
+        parts = []
+        for status in ORDER_STATUSES + ['total']:
+            stats = order_stats.get(status)
+            if not stats or not stats['order_count']:
+                continue
+            title = "Всего" if status == 'total' else status
+            avg_cost = f"{stats['avg_cost']:.2f}" if stats['avg_cost'] is not None else "-"
+            parts.append(f"{title}: {stats['order_count']} (сумма {stats['total_cost']}, средняя {avg_cost})")
+        label.setText("   ".join(parts) if parts else "Нет заказов")
+        label.show()
     
     def delete_order(self, order_id):
         reply = QMessageBox.question(
@@ -197,11 +422,15 @@ class MainWindow(QMainWindow):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            if self.db.delete_order(order_id):
-                QMessageBox.information(self, "Успех", "Заказ удален!")
-                self.show_orders()
-            else:
-                QMessageBox.critical(self, "Ошибка", "Не удалось удалить заказ")
+            self.runner.submit('delete_order', self.db.delete_order, order_id,
+                               on_result=self.on_order_deleted)
+
+    def on_order_deleted(self, deleted):
+        if deleted:
+            QMessageBox.information(self, "Успех", "Заказ удален!")
+            self.show_orders()
+        else:
+            QMessageBox.critical(self, "Ошибка", "Не удалось удалить заказ")
     
     def add_client_dialog(self):
         dialog = QDialog(self)
@@ -267,25 +496,21 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Ошибка", "Марка, модель и гос. номер автомобиля обязательны!")
             return
 
-       # Добавляем клиента
-        if self.db.add_client(name, phone, email, address):
-            # Получаем ID последнего добавленного клиента
-            clients = self.db.get_clients()
-            last_client = clients[-1] if clients else None
-            
-            if last_client:
-                client_id = last_client["client_id"]
-                # Добавляем автомобиль
-                if self.db.add_car(client_id, brand, model, license_plate, year):
-                    QMessageBox.information(self, "Успех", "Клиент и автомобиль добавлены!")
-                    dialog.close()
-                    self.show_clients()
-                else:
-                    QMessageBox.critical(self, "Ошибка", "Клиент добавлен, но не удалось добавить автомобиль")
-            else:
-                QMessageBox.critical(self, "Ошибка", "Не удалось получить ID нового клиента")
+        # Клиент и автомобиль добавляются одной транзакцией: либо оба, либо ничего
+        self.runner.submit(
+            'save_client', self.db.register_client_with_cars,
+            {'name': name, 'phone': phone, 'email': email, 'address': address},
+            [{'brand': brand, 'model': model, 'license_plate': license_plate, 'year': year}],
+            on_result=lambda registered: self.on_client_saved(dialog, registered)
+        )
+
+    def on_client_saved(self, dialog, registered):
+        if registered:
+            QMessageBox.information(self, "Успех", "Клиент и автомобиль добавлены!")
+            dialog.close()
+            self.show_clients()
         else:
-            QMessageBox.critical(self, "Ошибка", "Не удалось добавить клиента")
+            QMessageBox.critical(self, "Ошибка", "Не удалось добавить клиента и автомобиль")
             
     def add_order_dialog(self):
         """Диалоговое окно для добавления нового заказа"""
@@ -295,10 +520,24 @@ class MainWindow(QMainWindow):
         
         layout = QFormLayout(dialog)
         
-        # Выбор клиента
-        self.client_combo = QComboBox()
-        self.load_clients_to_combo()
-        layout.addRow("Клиент:", self.client_combo)
+        # Выбор клиента: поиск по мере ввода, автомобили приходят вместе с найденным клиентом
+        self.order_client = None
+        self.picker_results = []
+        self.client_input = QLineEdit()
+        self.client_input.setPlaceholderText("ФИО, телефон, госномер или VIN")
+        self.picker_model = QStringListModel(dialog)
+        picker = QCompleter(self.picker_model, dialog)
+        picker.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        picker.activated[QModelIndex].connect(self.select_order_client)
+        self.client_input.setCompleter(picker)
+        layout.addRow("Клиент:", self.client_input)
+        
+        # Запрос уходит после паузы в наборе, а не на каждую клавишу
+        self.picker_timer = QTimer(dialog)
+        self.picker_timer.setSingleShot(True)
+        self.picker_timer.setInterval(PICKER_DEBOUNCE_MS)
+        self.picker_timer.timeout.connect(self.search_order_clients)
+        self.client_input.textEdited.connect(self.on_client_input_edited)
         
         # Выбор автомобиля
         self.car_combo = QComboBox()
@@ -315,30 +554,38 @@ class MainWindow(QMainWindow):
         btn_box.rejected.connect(dialog.reject)
         layout.addRow(btn_box)
         
-        # Обновляем список автомобилей при выборе клиента
-        self.client_combo.currentIndexChanged.connect(self.update_car_combo)
-        
         dialog.exec()
+        self.picker_timer.stop()
+        self.runner.cancel('picker')
     
-    def load_clients_to_combo(self):
-        """Загрузка клиентов в выпадающий список"""
-        clients = self.db.get_clients()
-        self.client_combo.clear()
-        for client in clients:
-            self.client_combo.addItem(
-                f"{client['name']} ({client['phone']})", 
-                client['client_id']
-            )
+    def on_client_input_edited(self, text):
+        """Изменение текста сбрасывает выбранного клиента и перезапускает отсчет паузы"""
+        self.order_client = None
+        self.car_combo.clear()
+        self.runner.cancel('picker')
+        if text.strip():
+            self.picker_timer.start()
+        else:
+            self.picker_timer.stop()
+    
+    def search_order_clients(self):
+        """Фоновый поиск клиентов для подсказок (устаревший запрос отменяется новым)"""
+        self.runner.submit('picker', self.db.find_clients_with_cars, self.client_input.text().strip(),
+                           on_result=self.fill_client_completions)
+    
+    def fill_client_completions(self, clients):
+        self.picker_results = clients or []
+        self.picker_model.setStringList([describe_client(client) for client in self.picker_results])
+        if self.picker_results:
+            self.client_input.completer().complete()
     
-    def update_car_combo(self):
-        """Обновление списка автомобилей при выборе клиента"""
-        client_id = self.client_combo.currentData()
-        if not client_id:
+    def select_order_client(self, index):
+        """Выбор клиента из подсказок: автомобили берутся из найденной записи без запроса к БД"""
+        if not 0 <= index.row() < len(self.picker_results):
             return
-            
+        self.order_client = self.picker_results[index.row()]
         self.car_combo.clear()
-        cars = self.db.get_client_cars(client_id)
-        for car in cars:
+        for car in self.order_client['cars']:
             self.car_combo.addItem(
                 f"{car['brand']} {car['model']} ({car['license_plate']})", 
                 car['car_id']
@@ -346,7 +593,7 @@ class MainWindow(QMainWindow):
     
     def save_order(self, dialog):
         """Сохранение нового заказа"""
-        client_id = self.client_combo.currentData()
+        client_id = self.order_client['client_id'] if self.order_client else None
         car_id = self.car_combo.currentData()
         status = self.status_combo.currentText()
         
@@ -354,7 +601,11 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Ошибка", "Необходимо выбрать клиента и автомобиль!")
             return
             
-        if self.db.add_order(client_id, car_id, status):
+        self.runner.submit('save_order', self.db.add_order, client_id, car_id, status,
+                           on_result=lambda order_id: self.on_order_saved(dialog, order_id))
+
+    def on_order_saved(self, dialog, order_id):
+        if order_id:
             QMessageBox.information(self, "Успех", "Заказ успешно добавлен!")
             dialog.accept()
             self.show_orders()  # Обновляем список заказов
@@ -380,34 +631,113 @@ class MainWindow(QMainWindow):
         
         layout.addLayout(date_layout)
         
+        # Выбор отчета
+        self.report_combo = QComboBox()
+        self.report_combo.addItem("Заказы за период", None)
+        self.report_combo.addItem("Рейтинг сотрудников", 'employees')
+        if self.reports is not None:
+            for name, (title, _) in REPORTS.items():
+                self.report_combo.addItem(title, name)
+        self.report_combo.currentIndexChanged.connect(self.show_orders_report)
+        layout.addWidget(self.report_combo)
+        
         # Кнопка запроса
         btn_query = QPushButton("Получить отчет")
         btn_query.clicked.connect(self.show_orders_report)
         layout.addWidget(btn_query)
         
         # Таблица результатов
-        self.report_table = QTableWidget()
+        self.report_table = QTableView()
         layout.addWidget(self.report_table)
         
+        self.report_stats = QLabel()
+        self.report_stats.hide()
+        layout.addWidget(self.report_stats)
+        
         dialog.setLayout(layout)
         dialog.resize(600, 400)
         dialog.exec()
+        self.runner.cancel('report')
+        self.runner.cancel('report_stats')
     
     def show_orders_report(self):
         start_date = self.start_date.date().toString("yyyy-MM-dd")
         end_date = self.end_date.date().toString("yyyy-MM-dd")
         
-        orders = self.db.get_orders_by_date(start_date, end_date)
-        
-        self.report_table.setColumnCount(4)
-        self.report_table.setHorizontalHeaderLabels(["ID", "Дата", "Клиент", "Автомобиль"])
-        self.report_table.setRowCount(len(orders))
+        report = self.report_combo.currentData()
+        if report is not None:
+            self.runner.cancel('report_stats')
+            self.report_stats.hide()
+            if report == 'employees':
+                self.runner.submit('report', self.analytics.get_employee_leaderboard, start_date, end_date, None,
+                                   on_result=lambda rows: self.show_report_rows(EMPLOYEE_STATS_COLUMNS, rows))
+            else:
+                self.runner.submit('report', self.reports.get_report, report, start_date, end_date,
+                                   on_result=lambda rows: self.show_report_rows(REPORTS[report][1], rows))
+            return
         
-        for row, order in enumerate(orders):
-            self.report_table.setItem(row, 0, QTableWidgetItem(str(order["order_id"])))
-            self.report_table.setItem(row, 1, QTableWidgetItem(str(order["creation_date"])))
-            self.report_table.setItem(row, 2, QTableWidgetItem(order["client_name"]))
-            self.report_table.setItem(row, 3, QTableWidgetItem(order["brand"]))
+        model = LazyTableModel(
+            ["ID", "Дата", "Клиент", "Автомобиль"],
+            lambda cursor: self.db.get_orders_by_date_page(start_date, end_date, cursor),
+            lambda order: (order.order_id, order.created, order.client_name, order.brand),
+            self.report_table, runner=self.runner, channel='report'
+        )
+        model.load_failed.connect(self.on_query_error)
+        self.report_table.setModel(model)
+        self.runner.submit('report_stats', self.db.get_order_stats, start_date, end_date,
+                           on_result=lambda stats: self.show_order_stats(self.report_stats, stats))
+    
+    def show_report_rows(self, columns, rows):
+        """
+        Вывод готового отчета в таблицу диалога аналитики
+        :param columns: Список (ключ, заголовок) столбцов
+        """
+        model = LazyTableModel(
+            [header for _, header in columns],
+            lambda cursor: Page(rows, None, None),
+            lambda row: tuple(row[column] for column, _ in columns),
+            self.report_table
+        )
+        self.report_table.setModel(model)
+
+    def show_metrics(self):
+        """Метрики запросов к БД: таблица по запросам, медленные запросы, экспорт текстом"""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Метрики запросов к БД")
+        layout = QVBoxLayout(dialog)
+        
+        queries = metrics.snapshot()['queries']
+        table = QTableView()
+        table.setModel(LazyTableModel(
+            ["Запрос", "Вызовов", "Ошибок", "Всего, мс", "Среднее, мс", "Макс., мс", "Строк", "КБ"],
+            lambda cursor: Page(queries, None, None),
+            lambda stats: (stats['query'], stats['calls'], stats['errors'], round(stats['seconds'] * 1000, 1),
+                           stats['avg_ms'], round(stats['max_seconds'] * 1000, 1), stats['rows'],
+                           round(stats['bytes'] / 1024, 1)),
+            table
+        ))
+        layout.addWidget(table)
+        
+        slow = slow_query_log.recent(5)
+        summary = f"Медленных запросов (> {slow_query_log.threshold * 1000:.0f} мс): {slow_query_log.total}"
+        for entry in slow:
+            summary += f"\n{entry['time']}  {entry['ms']} мс  {entry['query']}  ({entry['caller']})"
+        layout.addWidget(QLabel(summary))
+        
+        # Экспорт: текст можно скопировать в мониторинг или приложить к обращению
+        export_combo = QComboBox()
+        export_combo.addItem("Prometheus", metrics_text)
+        export_combo.addItem("JSON", metrics_json)
+        layout.addWidget(export_combo)
+        export_text = QPlainTextEdit()
+        export_text.setReadOnly(True)
+        layout.addWidget(export_text)
+        export_combo.currentIndexChanged.connect(
+            lambda: export_text.setPlainText(export_combo.currentData()()))
+        export_text.setPlainText(metrics_text())
+        
+        dialog.resize(800, 600)
+        dialog.exec()
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,79 @@
+"""
+Сравнение синхронного и асинхронного чтения агрегата заказа.
+Запуск из корня проекта: python -m benchmarks.bench_async --orders 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from async_crud import AsyncOrderCRUD
+from async_db import AsyncDatabaseManager
+from crud_operations import OrderCRUD
+from db_connector import DatabaseManager
+
+
+def report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    print(f"{name:<28} {len(latencies) / elapsed:8.1f} оп/с   "
+          f"медиана {statistics.median(latencies) * 1000:7.2f} мс   p95 {p95 * 1000:7.2f} мс")
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def bench_sync(order_ids, workers):
+    crud = OrderCRUD(DatabaseManager())
+    crud.load_order_aggregate(order_ids[0])  # прогрев пула и кэша справочников
+
+    started = time.perf_counter()
+    latencies = [timed(crud.load_order_aggregate, order_id) for order_id in order_ids]
+    report("sync, последовательно", latencies, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        latencies = list(executor.map(lambda order_id: timed(crud.load_order_aggregate, order_id), order_ids))
+    report(f"sync, {workers} потоков", latencies, time.perf_counter() - started)
+
+
+async def bench_async(order_ids, concurrency):
+    db = await AsyncDatabaseManager.create(concurrency)
+    try:
+        crud = AsyncOrderCRUD(db)
+        await crud.load_order_aggregate(order_ids[0])
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(order_id):
+            async with semaphore:
+                started = time.perf_counter()
+                await crud.load_order_aggregate(order_id)
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(load(order_id) for order_id in order_ids))
+        report(f"async, {concurrency} одновременно", latencies, time.perf_counter() - started)
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Агрегат заказа: синхронный и асинхронный слой")
+    parser.add_argument('--orders', type=int, default=200, help="Сколько последних заказов читать")
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help="Одновременных запросов (потоков для sync, соединений для async)")
+    args = parser.parse_args()
+
+    rows = DatabaseManager().execute_query(
+        "SELECT order_id FROM orders ORDER BY creation_date DESC, order_id DESC LIMIT %s",
+        (args.orders,), fetch=True
+    ) or []
+    ids = [row['order_id'] for row in rows]
+    if not ids:
+        raise SystemExit("Нет заказов для измерения")
+
+    bench_sync(ids, args.concurrency)
+    asyncio.run(bench_async(ids, args.concurrency))
@@ -0,0 +1,264 @@
+"""
+Бенчмарк горячих путей CRUD и аналитики: список заказов, заполнение таблицы GUI,
+отчеты за период, статистика сотрудников, создание заказа.
+Данные - benchmarks/datagen.py; результаты сохраняются по коммитам
+и сравниваются с базовым прогоном (регрессия - рост медианы больше порога).
+Запуск из корня проекта:
+    python -m benchmarks.bench_hot_paths                          # MySQL из .env
+    python -m benchmarks.bench_hot_paths --sqlite bench.db        # SQLite-заглушка
+    python -m benchmarks.bench_hot_paths --baseline 4785581       # сравнение с прогоном коммита
+Сравнивать имеет смысл прогоны на одной машине и одних данных (--orders/--seed генератора).
+Код возврата 1 - найдены регрессии.
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from analytics import analytical_requests
+from crud_operations import OrderCRUD
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Таблицы, объем которых сохраняется вместе с результатами
+TABLES = ('clients', 'cars', 'orders', 'works', 'payments', 'workparts')
+
+# Сценарий: имя, функция без аргументов -> обработано строк, тяжелый (полный проход по заказам),
+# пишет в базу
+Case = namedtuple('Case', ['name', 'run', 'heavy', 'writes'])
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def git_commit():
+    """(короткий хеш текущего коммита, есть ли незафиксированные изменения)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def _day(value):
+    """Дата из DATETIME MySQL или строки SQLite"""
+    return value.date() if isinstance(value, datetime) else date.fromisoformat(str(value)[:10])
+
+
+def build_cases(db, rnd, period_days=30, pages=10):
+    """
+    Сценарии над данными базы. Периоды, сотрудники и автомобили выбираются
+    генератором rnd, поэтому при одном seed прогоны выполняют одинаковые запросы.
+    """
+    orders = OrderCRUD(db)
+    analytics = analytical_requests(db)
+
+    bounds = db.execute_query("SELECT MIN(creation_date) as first, MAX(creation_date) as last FROM orders",
+                              fetch=True)
+    if not bounds or bounds[0]['first'] is None:
+        raise SystemExit("В базе нет заказов: сначала запустите python -m benchmarks.datagen")
+    first, last = _day(bounds[0]['first']), _day(bounds[0]['last'])
+    employee_ids = [row['employee_id'] for row in
+                    db.execute_query("SELECT employee_id FROM employees", fetch=True) or []]
+    cars = db.execute_query("SELECT car_id, client_id FROM cars WHERE client_id IS NOT NULL "
+                            "ORDER BY car_id DESC LIMIT 1000", fetch=True) or []
+
+    def period():
+        span = max(0, (last - first).days - period_days)
+        start = first + timedelta(days=rnd.randint(0, span))
+        return start.isoformat(), (start + timedelta(days=period_days)).isoformat()
+
+    def read_all():
+        return sum(len(chunk) for chunk in orders.read_all_orders(stream=True))
+
+    def gui_fill():
+        # Как LazyTableModel в окне заказов: первая страница и прокрутка на pages - 1 страниц
+        cursor, count = None, 0
+        for _ in range(pages):
+            page = orders.read_orders_page(cursor)
+            count += len([(order.order_id, order.created, order.status, order.client_name, order.car)
+                          for order in page.rows])
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        return count
+
+    def orders_by_period():
+        return len(analytics.get_orders_by_period(*period()) or [])
+
+    def employee_stats():
+        return len(analytics.get_employee_stats(rnd.choice(employee_ids), *period()))
+
+    def leaderboard():
+        return len(analytics.get_employee_leaderboard(*period()))
+
+    def daily_summary():
+        return len(analytics.get_daily_summary(*period()))
+
+    def create_order():
+        car = rnd.choice(cars)
+        return 1 if orders.create_order(car['client_id'], car['car_id']) else 0
+
+    return [
+        Case('orders.read_all (поток)', read_all, True, False),
+        Case(f'orders.gui_fill ({pages} стр.)', gui_fill, False, False),
+        Case(f'analytics.orders_by_period ({period_days} дн.)', orders_by_period, False, False),
+        Case('analytics.employee_stats', employee_stats, False, False),
+        Case('analytics.employee_leaderboard', leaderboard, False, False),
+        Case('analytics.daily_summary', daily_summary, False, False),
+        Case('orders.create', create_order, False, True),
+    ]
+
+
+def measure(case, repeat, warmup):
+    """Прогон сценария: warmup раз без замера, затем repeat замеров"""
+    for _ in range(warmup):
+        case.run()
+    latencies, rows = [], 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        run_started = time.perf_counter()
+        rows += case.run()
+        latencies.append(time.perf_counter() - run_started)
+    elapsed = time.perf_counter() - started
+    return {
+        'runs': repeat,
+        'rows': rows,
+        'ops_per_sec': round(repeat / elapsed, 3),
+        'rows_per_sec': round(rows / elapsed, 1),
+        'median_ms': round(statistics.median(latencies) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'max_ms': round(max(latencies) * 1000, 3),
+    }
+
+
+def report(name, stats):
+    print(f"{name:<40} {stats['ops_per_sec']:9.1f} оп/с   медиана {stats['median_ms']:9.2f} мс   "
+          f"p95 {stats['p95_ms']:9.2f} мс   {stats['rows_per_sec']:11.0f} строк/с")
+
+
+def table_sizes(db):
+    return {table: db.execute_query(f"SELECT COUNT(*) as count FROM {table}", fetch=True)[0]['count']
+            for table in TABLES}
+
+
+def results_path(commit, dirty, backend):
+    return os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}-{backend}.json")
+
+
+def load_baseline(baseline, backend):
+    """Базовый прогон: путь к файлу или начало хеша коммита (файл в RESULTS_DIR)"""
+    if os.path.isfile(baseline):
+        path = baseline
+    else:
+        matches = sorted(glob.glob(os.path.join(RESULTS_DIR, f"{baseline}*-{backend}.json")))
+        matches = [match for match in matches if '-dirty-' not in os.path.basename(match)] or matches
+        if not matches:
+            raise SystemExit(f"Нет сохраненного прогона {baseline} для {backend} в {RESULTS_DIR}")
+        path = matches[0]
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def compare(current, baseline, threshold):
+    """
+    Сравнение медиан с базовым прогоном
+    :param threshold: Допустимый рост медианы (0.1 - на 10%)
+    :return: Имена сценариев с регрессией
+    """
+    print(f"\nСравнение с {baseline['commit']} ({baseline['time']}), порог {threshold:.0%}")
+    if baseline.get('tables') != current['tables']:
+        print("Внимание: объем данных отличается от базового прогона, сравнение неточное")
+    regressions = []
+    for name, stats in current['cases'].items():
+        base = baseline['cases'].get(name)
+        if base is None:
+            print(f"{name:<40} нет в базовом прогоне")
+            continue
+        change = (stats['median_ms'] - base['median_ms']) / base['median_ms'] if base['median_ms'] else 0
+        verdict = ''
+        if change > threshold:
+            verdict = 'РЕГРЕССИЯ'
+            regressions.append(name)
+        elif change < -threshold:
+            verdict = 'ускорение'
+        print(f"{name:<40} {base['median_ms']:9.2f} -> {stats['median_ms']:9.2f} мс  {change:+7.1%}  "
+              f"p95 {base['p95_ms']:9.2f} -> {stats['p95_ms']:9.2f} мс  {verdict}")
+    return regressions
+
+
+def open_database(sqlite_path=None):
+    if sqlite_path:
+        from sqlite_standin import SQLiteDatabase
+        return SQLiteDatabase(sqlite_path), 'sqlite'
+    from db_connector import DatabaseManager
+    return DatabaseManager(), 'mysql'
+
+
+def main(args):
+    db, backend = open_database(args.sqlite)
+    rnd = random.Random(args.seed)
+    commit, dirty = git_commit()
+    results = {
+        'commit': commit,
+        'dirty': dirty,
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'backend': backend,
+        'python': platform.python_version(),
+        'tables': table_sizes(db),
+        'cases': {},
+    }
+    print(f"Коммит {commit}{' (есть изменения)' if dirty else ''}, база {backend}: "
+          + ", ".join(f"{table} {count}" for table, count in results['tables'].items()))
+
+    for case in build_cases(db, rnd, args.period_days, args.pages):
+        if args.cases and not any(pattern in case.name for pattern in args.cases):
+            continue
+        if case.writes and (args.no_writes or backend == 'sqlite'):
+            # Пути записи заказа выполняют запросы на курсоре соединения в синтаксисе MySQL
+            print(f"{case.name:<40} пропущен (запись{' в SQLite не поддерживается' if backend == 'sqlite' else ''})")
+            continue
+        repeat = args.heavy_repeat if case.heavy else args.repeat
+        results['cases'][case.name] = stats = measure(case, repeat, 0 if case.heavy else args.warmup)
+        report(case.name, stats)
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = results_path(commit, dirty, backend)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"Результаты сохранены: {path}")
+
+    if args.baseline:
+        return 1 if compare(results, load_baseline(args.baseline, backend), args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк горячих путей CRUD и аналитики")
+    parser.add_argument('--sqlite', metavar='PATH', help="SQLite-файл (benchmarks.datagen --sqlite) вместо MySQL")
+    parser.add_argument('--repeat', type=int, default=20, help="Замеров на сценарий")
+    parser.add_argument('--heavy-repeat', type=int, default=3,
+                        help="Замеров для полного прохода по заказам")
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--period-days', type=int, default=30, help="Длина периода отчетов")
+    parser.add_argument('--pages', type=int, default=10, help="Страниц при заполнении таблицы GUI")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cases', nargs='*', help="Только сценарии, имя которых содержит подстроку")
+    parser.add_argument('--no-writes', action='store_true', help="Не запускать сценарии записи")
+    parser.add_argument('--no-save', action='store_true', help="Не сохранять результаты")
+    parser.add_argument('--baseline', help="Коммит или файл результатов для сравнения")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Допустимый рост медианы, доля (по умолчанию 0.1)")
+    raise SystemExit(main(parser.parse_args()))
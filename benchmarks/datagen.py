@@ -0,0 +1,494 @@
+"""
+Генератор синтетических данных автосервиса для бенчмарков: клиенты, автомобили,
+заказы, работы, платежи и расход запчастей - от 10 тыс. до 10 млн заказов.
+Постоянные клиенты, популярные услуги и загруженные мастера задаются
+распределением Ципфа (--skew 0 - равномерно), заказы распределены по дням
+с учетом дня недели, сезона и роста потока.
+Запуск из корня проекта:
+    python -m benchmarks.datagen --orders 100000 --skew 1.1
+    python -m benchmarks.datagen --orders 100000 --sqlite bench.db
+"""
+import argparse
+import random
+import time
+from array import array
+from bisect import bisect
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+from db_connector import DatabaseManager, DEFAULT_BATCH_SIZE
+
+# Сколько в среднем заказов на клиента (клиентов = заказов / ORDERS_PER_CLIENT)
+ORDERS_PER_CLIENT = 5
+
+# Распределения: значение -> вес
+CARS_PER_CLIENT = {1: 70, 2: 25, 3: 5}
+WORKS_PER_ORDER = {1: 45, 2: 30, 3: 17, 4: 8}
+PARTS_PER_WORK = {0: 40, 1: 40, 2: 20}
+PAYMENT_METHODS = {'card': 60, 'cash': 25, 'transfer': 15}
+
+# Поток заказов: по дням недели (пн..вс), по месяцам (сезонная смена шин) и по часам
+WEEKDAY_FACTORS = (1.0, 1.0, 1.0, 1.05, 1.15, 0.8, 0.35)
+MONTH_FACTORS = (0.8, 0.8, 0.9, 1.3, 1.2, 1.0, 1.0, 1.0, 1.0, 1.3, 1.4, 1.0)
+HOUR_WEIGHTS = {8: 6, 9: 10, 10: 12, 11: 11, 12: 9, 13: 8, 14: 9, 15: 9, 16: 8, 17: 8, 18: 6, 19: 4}
+
+FIRST_NAMES_MALE = ('Александр', 'Алексей', 'Андрей', 'Дмитрий', 'Евгений', 'Иван', 'Игорь',
+                    'Константин', 'Максим', 'Михаил', 'Николай', 'Олег', 'Павел', 'Сергей', 'Юрий')
+FIRST_NAMES_FEMALE = ('Анна', 'Виктория', 'Екатерина', 'Елена', 'Ирина', 'Мария', 'Наталья',
+                      'Ольга', 'Светлана', 'Татьяна', 'Юлия')
+SURNAMES = ('Алексеев', 'Андреев', 'Васильев', 'Волков', 'Егоров', 'Захаров', 'Иванов', 'Козлов',
+            'Кузнецов', 'Лебедев', 'Макаров', 'Михайлов', 'Морозов', 'Никитин', 'Николаев',
+            'Новиков', 'Орлов', 'Павлов', 'Петров', 'Попов', 'Семенов', 'Смирнов', 'Соколов',
+            'Степанов', 'Федоров')
+STREETS = ('Ленина', 'Мира', 'Гагарина', 'Садовая', 'Лесная', 'Советская', 'Кирова',
+           'Пушкина', 'Зеленая', 'Центральная', 'Молодежная', 'Школьная')
+CITIES = ('Москва', 'Химки', 'Мытищи', 'Красногорск', 'Одинцово', 'Балашиха')
+EMAIL_DOMAINS = ('mail.ru', 'yandex.ru', 'gmail.com', 'bk.ru')
+
+# Марка -> (модели, WMI для VIN, вес)
+BRANDS = {
+    'Lada': (('Vesta', 'Granta', 'Niva', 'XRAY', 'Largus'), 'XTA', 30),
+    'Kia': (('Rio', 'Sportage', 'Ceed', 'Optima'), 'Z94', 14),
+    'Hyundai': (('Solaris', 'Creta', 'Tucson'), 'Z94', 13),
+    'Toyota': (('Camry', 'Corolla', 'RAV4', 'Land Cruiser'), 'JTD', 10),
+    'Volkswagen': (('Polo', 'Tiguan', 'Passat'), 'XW8', 8),
+    'Skoda': (('Octavia', 'Rapid', 'Kodiaq'), 'TMB', 7),
+    'Renault': (('Logan', 'Duster', 'Sandero'), 'X7L', 7),
+    'Nissan': (('Qashqai', 'X-Trail', 'Almera'), 'SJN', 5),
+    'BMW': (('X5', '3 Series', '5 Series'), 'WBA', 3),
+    'Mercedes-Benz': (('E-Class', 'C-Class', 'GLC'), 'WDD', 3),
+}
+
+# Буквы госномера (совпадают по начертанию с латиницей) и коды регионов
+PLATE_LETTERS = 'АВЕКМНОРСТУХ'
+REGIONS = ('77', '177', '777', '97', '197', '799', '50', '150', '750', '90',
+           '190', '78', '178', '198', '98', '47', '16', '116', '66', '196')
+
+# Каталог услуг: (название, цена, норма часов, гарантия в днях)
+SERVICES = (
+    ('Замена масла', 2500, 0.5, 30), ('Диагностика', 2000, 1.0, 0),
+    ('Ремонт тормозов', 4500, 2.0, 90), ('Замена шин', 3000, 1.0, 0),
+    ('Ремонт двигателя', 20000, 16.0, 180), ('Ремонт электроники', 5000, 3.0, 60),
+    ('Покраска кузова', 15000, 12.0, 365), ('Ремонт подвески', 6000, 3.0, 90),
+    ('Обслуживание кондиционера', 3500, 1.0, 30), ('Химчистка салона', 5000, 4.0, 0),
+    ('Замена ремня ГРМ', 7000, 4.0, 180), ('Развал-схождение', 2200, 1.0, 0),
+    ('Замена аккумулятора', 800, 0.3, 0), ('Замена свечей зажигания', 1500, 0.7, 30),
+    ('Замена сцепления', 9000, 5.0, 180), ('Ремонт КПП', 18000, 10.0, 180),
+)
+
+PART_KINDS = (
+    ('Масло моторное 5W-40', 3500), ('Фильтр масляный', 600), ('Фильтр воздушный', 900),
+    ('Фильтр салона', 1100), ('Колодки тормозные передние', 4500), ('Диск тормозной', 5200),
+    ('Аккумулятор 60Ah', 8000), ('Свечи зажигания, комплект', 2500), ('Ремень ГРМ', 5000),
+    ('Амортизатор передний', 6500), ('Щетки стеклоочистителя', 1800), ('Лампа H7', 450),
+    ('Сайлентблок', 1300), ('Комплект сцепления', 14000), ('Антифриз 5л', 1900),
+)
+
+POSITIONS = (
+    ('Механик', 60000, 'Ремонт и обслуживание автомобилей'),
+    ('Электрик', 65000, 'Диагностика и ремонт электрооборудования'),
+    ('Маляр', 62000, 'Кузовной ремонт и покраска'),
+    ('Мастер-приемщик', 55000, 'Прием автомобилей и оформление заказов'),
+)
+
+
+def zipf_cum_weights(count, skew):
+    """Накопленные веса распределения Ципфа для рангов 0..count-1 (skew=0 - равномерное)"""
+    return array('d', accumulate(1.0 / (rank + 1) ** skew for rank in range(count)))
+
+
+def _cum(weights):
+    """Значения и накопленные веса словаря {значение: вес} для random.choices"""
+    return tuple(weights), tuple(accumulate(weights.values()))
+
+
+def _pick(rnd, distribution):
+    values, cum_weights = distribution
+    return rnd.choices(values, cum_weights=cum_weights)[0]
+
+
+_CARS_PER_CLIENT = _cum(CARS_PER_CLIENT)
+_WORKS_PER_ORDER = _cum(WORKS_PER_ORDER)
+_PARTS_PER_WORK = _cum(PARTS_PER_WORK)
+_PAYMENT_METHODS = _cum(PAYMENT_METHODS)
+_HOURS = _cum(HOUR_WEIGHTS)
+_BRANDS = _cum({brand: weight for brand, (_, _, weight) in BRANDS.items()})
+
+
+def day_counts(total, start, days):
+    """
+    Количество заказов по дням периода: сумма ровно total,
+    доли - по дню недели, месяцу и линейному росту потока (+50% за период)
+    """
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        weights.append(WEEKDAY_FACTORS[day.weekday()] * MONTH_FACTORS[day.month - 1]
+                       * (1 + 0.5 * offset / max(1, days - 1)))
+    scale = total / sum(weights)
+    counts, carry = [], 0.0
+    for weight in weights:
+        carry += weight * scale
+        counts.append(int(carry))
+        carry -= counts[-1]
+    counts[-1] += total - sum(counts)
+    return counts
+
+
+def plate_number(car_id):
+    """Уникальный для car_id госномер вида А123ВС77"""
+    number, rest = car_id % 999 + 1, car_id // 999
+    letters = rest % len(PLATE_LETTERS) ** 3
+    region = REGIONS[(rest // len(PLATE_LETTERS) ** 3) % len(REGIONS)]
+    first, second, third = letters // 144, letters // 12 % 12, letters % 12
+    return (f"{PLATE_LETTERS[first]}{number:03d}{PLATE_LETTERS[second]}"
+            f"{PLATE_LETTERS[third]}{region}")
+
+
+class MySQLWriter:
+    """Запись сгенерированных строк в MySQL пакетами через DatabaseManager.insert_many"""
+
+    name = 'mysql'
+
+    def __init__(self, db=None, batch_size=DEFAULT_BATCH_SIZE):
+        self.db = db or DatabaseManager()
+        self.batch_size = batch_size
+
+    def fetch(self, query):
+        return self.db.execute_query(query, fetch=True) or []
+
+    def insert(self, table, columns, rows):
+        query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columns))})")
+        result = self.db.insert_many(query, rows, self.batch_size)
+        for position, row, error in result.failed[:5]:
+            print(f"{table}: строка {position} не вставлена: {error}")
+        return result.inserted
+
+    def finish(self, generator):
+        """Дневные агрегаты пересчитываются из вставленных данных (rollups.py)"""
+        from rollups import RollupRefresher
+        # Работы и оплаты последних заказов могут закончиться на несколько дней позже
+        RollupRefresher(self.db).refresh_range(generator.start, generator.end + timedelta(days=7))
+
+
+class SQLiteWriter(MySQLWriter):
+    """Запись в SQLite-файл (sqlite_standin.SQLiteDatabase); агрегаты считаются генератором"""
+
+    name = 'sqlite'
+
+    def insert(self, table, columns, rows):
+        query = (f"INSERT INTO {table} ({', '.join(columns)}) "
+                 f"VALUES ({', '.join(['?'] * len(columns))})")
+        with self.db.transaction() as connection:
+            connection.executemany(query, rows)
+        return len(rows)
+
+    def finish(self, generator):
+        # Запросы пересчета из rollups.py используют синтаксис MySQL (INTERVAL, TIMESTAMPDIFF)
+        upserts = (
+            ("daily_order_stats", ('stat_date', 'status'), ('order_count', 'total_cost'),
+             generator.order_stats),
+            ("daily_revenue", ('stat_date',), ('payment_count', 'paid_amount'), generator.revenue_stats),
+            ("daily_employee_stats", ('stat_date', 'employee_id'), ('work_count', 'income', 'work_hours'),
+             generator.employee_stats),
+        )
+        with self.db.transaction() as connection:
+            for table, keys, values, stats in upserts:
+                columns = keys + values
+                updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in values)
+                connection.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(['?'] * len(columns))}) "
+                    f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}",
+                    [(*(key if isinstance(key, tuple) else (key,)), *totals)
+                     for key, totals in stats.items()]
+                )
+
+
+class DataGenerator:
+    """
+    Синтетическая база автосервиса. Ключи назначаются генератором (от MAX(id) + 1),
+    поэтому данные можно добавлять к существующей базе, а связи известны без
+    обратного чтения. Заказы генерируются по дням от start к end и пишутся
+    пакетами вместе с работами, запчастями и платежами - в памяти держится
+    один пакет и индексы клиентов (несколько байт на клиента).
+    """
+
+    def __init__(self, writer, orders, skew=0.8, days=730, seed=42, end=None):
+        """
+        :param writer: MySQLWriter или SQLiteWriter
+        :param orders: Сколько заказов сгенерировать
+        :param skew: Показатель распределения Ципфа для клиентов, услуг и сотрудников
+        :param days: Длина периода в днях
+        :param end: Последний день периода (по умолчанию - сегодня)
+        """
+        self.writer = writer
+        self.orders = orders
+        self.skew = skew
+        self.days = days
+        self.end = end or date.today()
+        self.start = self.end - timedelta(days=days - 1)
+        self.random = random.Random(seed)
+        self.counts = {}
+        # Дневные агрегаты сгенерированных данных (для SQLite, см. SQLiteWriter.finish)
+        self.order_stats = {}     # (день, статус) -> [заказов, стоимость]
+        self.revenue_stats = {}   # день -> [платежей, сумма]
+        self.employee_stats = {}  # (день, сотрудник) -> [работ, доход, часы]
+
+    # Вспомогательные -------------------------------------------------------------------------------
+    def _next_id(self, table, column):
+        rows = self.writer.fetch(f"SELECT MAX({column}) as last_id FROM {table}")
+        return (rows[0]['last_id'] or 0) + 1 if rows else 1
+
+    def _existing_ids(self, table, column):
+        return [row[column] for row in self.writer.fetch(f"SELECT {column} FROM {table}")]
+
+    def _write(self, table, columns, rows):
+        if rows:
+            self.counts[table] = self.counts.get(table, 0) + self.writer.insert(table, columns, rows)
+
+    def _person_name(self):
+        pick = self.random.choice
+        if self.random.random() < 0.65:
+            return f"{pick(FIRST_NAMES_MALE)} {pick(SURNAMES)}"
+        return f"{pick(FIRST_NAMES_FEMALE)} {pick(SURNAMES)}а"
+
+    # Справочники -----------------------------------------------------------------------------------
+    def generate_references(self):
+        """Должности и склады (если их нет), каталог услуг и запчастей, сотрудники"""
+        rnd = self.random
+        positions = self._existing_ids('positions', 'position_id')
+        if not positions:
+            self._write('positions', ('title', 'salary', 'responsibilities'), list(POSITIONS))
+            positions = self._existing_ids('positions', 'position_id')
+        warehouses = self._existing_ids('warehouses', 'warehouse_id')
+        if not warehouses:
+            self._write('warehouses', ('name', 'address', 'phone'),
+                        [(f"Склад {number}", f"г. {CITIES[number - 1]}, ул. Складская, {number}",
+                          f"+7495000000{number}") for number in range(1, 4)])
+            warehouses = self._existing_ids('warehouses', 'warehouse_id')
+
+        first_service = self._next_id('services', 'service_id')
+        self.services = []  # (service_id, цена, норма часов)
+        rows = []
+        for offset, (name, price, hours, warranty) in enumerate(SERVICES):
+            self.services.append((first_service + offset, price, hours))
+            rows.append((first_service + offset, name, f"{name} (синтетические данные)", price, warranty))
+        self._write('services', ('service_id', 'name', 'description', 'price', 'warranty_days'), rows)
+        self.service_weights = zipf_cum_weights(len(self.services), self.skew)
+
+        first_part = self._next_id('parts', 'part_id')
+        self.parts = []  # (part_id, цена)
+        rows = []
+        for offset in range(len(PART_KINDS) * len(BRANDS)):
+            kind, base_price = PART_KINDS[offset % len(PART_KINDS)]
+            brand = list(BRANDS)[offset // len(PART_KINDS)]
+            part_id = first_part + offset
+            price = round(base_price * rnd.uniform(0.7, 1.6), 2)
+            self.parts.append((part_id, price))
+            rows.append((part_id, f"{kind} {brand}", f"SYN-{part_id:07d}", None, price,
+                         rnd.choice(warehouses), rnd.randint(0, 500)))
+        self._write('parts', ('part_id', 'name', 'code', 'description', 'price', 'warehouse_id', 'quantity'),
+                    rows)
+
+        employee_count = max(10, min(1000, self.orders // 2000))
+        first_employee = self._next_id('employees', 'employee_id')
+        self.employees = list(range(first_employee, first_employee + employee_count))
+        rows = [(employee_id, self._person_name(), f"+7800{employee_id:07d}",
+                 (self.start - timedelta(days=rnd.randint(30, 5 * 365))).isoformat(), rnd.choice(positions))
+                for employee_id in self.employees]
+        self._write('employees', ('employee_id', 'name', 'phone', 'hire_date', 'position_id'), rows)
+        # Сотрудники в случайном порядке: "загруженные" мастера не совпадают с первыми ID
+        rnd.shuffle(self.employees)
+        self.employee_weights = zipf_cum_weights(employee_count, self.skew)
+
+    # Клиенты и автомобили --------------------------------------------------------------------------
+    def generate_clients(self):
+        """Клиенты и их автомобили; автомобили клиента получают подряд идущие ID"""
+        rnd = self.random
+        batch_size = self.writer.batch_size
+        client_count = max(1, self.orders // ORDERS_PER_CLIENT)
+        self.first_client = self._next_id('clients', 'client_id')
+        car_id = self._next_id('cars', 'car_id')
+        self.first_car = array('q')
+        self.car_counts = array('b')
+
+        clients, cars = [], []
+        for index in range(client_count):
+            client_id = self.first_client + index
+            email = (f"client{client_id}@{rnd.choice(EMAIL_DOMAINS)}" if rnd.random() < 0.6 else None)
+            clients.append((client_id, self._person_name(), f"+79{client_id:09d}", email,
+                            f"ул. {rnd.choice(STREETS)}, {rnd.randint(1, 120)}, {rnd.choice(CITIES)}"))
+            count = _pick(rnd, _CARS_PER_CLIENT)
+            self.first_car.append(car_id)
+            self.car_counts.append(count)
+            for _ in range(count):
+                brand = _pick(rnd, _BRANDS)
+                models, wmi, _ = BRANDS[brand]
+                cars.append((car_id, brand, rnd.choice(models), rnd.randint(2005, self.end.year),
+                             plate_number(car_id), f"{wmi}{car_id:014d}", client_id))
+                car_id += 1
+            if len(clients) >= batch_size:
+                self._write('clients', ('client_id', 'name', 'phone', 'email', 'address'), clients)
+                self._write('cars', ('car_id', 'brand', 'model', 'year', 'license_plate', 'vin', 'client_id'),
+                            cars)
+                clients, cars = [], []
+        self._write('clients', ('client_id', 'name', 'phone', 'email', 'address'), clients)
+        self._write('cars', ('car_id', 'brand', 'model', 'year', 'license_plate', 'vin', 'client_id'), cars)
+
+        # Постоянные клиенты - случайные, а не первые по ID
+        self.client_ranks = array('q', range(client_count))
+        rnd.shuffle(self.client_ranks)
+        self.client_weights = zipf_cum_weights(client_count, self.skew)
+
+    # Заказы ----------------------------------------------------------------------------------------
+    def _order_status(self, age_days):
+        """Статус по возрасту заказа: старые завершены или отменены, свежие - в работе"""
+        if age_days > 14:
+            weights = {'completed': 88, 'cancelled': 12}
+        elif age_days > 1:
+            weights = {'completed': 50, 'in_progress': 35, 'new': 10, 'cancelled': 5}
+        else:
+            weights = {'new': 60, 'in_progress': 40}
+        return self.random.choices(list(weights), list(weights.values()))[0]
+
+    def _add(self, stats, key, *values):
+        totals = stats.get(key)
+        if totals is None:
+            stats[key] = list(values)
+        else:
+            for position, value in enumerate(values):
+                totals[position] += value
+
+    def _order(self, order_id, created, status, work_id, works, workparts, payments, payment_id):
+        """
+        Работы, запчасти и платежи одного заказа
+        :return: (стоимость заказа, следующий work_id, следующий payment_id)
+        """
+        rnd = self.random
+        work_status = {'new': 'planned', 'cancelled': 'cancelled'}.get(status)
+        total = 0.0
+        moment = created + timedelta(minutes=rnd.randint(5, 120))
+        for _ in range(_pick(rnd, _WORKS_PER_ORDER)):
+            service_id, price, hours = self.services[
+                bisect(self.service_weights, rnd.random() * self.service_weights[-1])]
+            employee_id = self.employees[bisect(self.employee_weights, rnd.random() * self.employee_weights[-1])]
+            finished = moment + timedelta(hours=hours * rnd.uniform(0.7, 1.5))
+            state = work_status or ('completed' if status == 'completed' or rnd.random() < 0.5 else 'in_progress')
+            finished_at = finished.replace(microsecond=0) if state == 'completed' else None
+            works.append((work_id, order_id, service_id, employee_id, str(moment),
+                          finished_at and str(finished_at), state, None))
+            total += price
+
+            day = moment.date().isoformat()
+            worked = (finished_at - moment).total_seconds() / 3600 if finished_at else 0
+            self._add(self.employee_stats, (day, employee_id), 1, price, worked)
+
+            for part_index in rnd.sample(range(len(self.parts)), _pick(rnd, _PARTS_PER_WORK)):
+                part_id, part_price = self.parts[part_index]
+                quantity = rnd.randint(1, 4)
+                workparts.append((work_id, part_id, quantity, part_price))
+                total += quantity * part_price
+            work_id += 1
+            moment = finished.replace(microsecond=0)
+        total = round(total, 2)
+
+        paid_parts = []
+        if status == 'completed':
+            # Часть клиентов вносит предоплату при приемке
+            prepay = round(total * 0.3, 2) if rnd.random() < 0.15 else 0
+            if prepay:
+                paid_parts.append((prepay, created + timedelta(minutes=2), 'paid'))
+            paid_parts.append((round(total - prepay, 2), moment + timedelta(minutes=rnd.randint(5, 90)), 'paid'))
+        elif status == 'in_progress' and rnd.random() < 0.3:
+            paid_parts.append((round(total * 0.3, 2), created + timedelta(minutes=2),
+                               'paid' if rnd.random() < 0.8 else 'pending'))
+        elif status == 'cancelled' and rnd.random() < 0.2:
+            paid_parts.append((round(total * 0.3, 2), created + timedelta(minutes=2), 'cancelled'))
+        for amount, paid_at, payment_status in paid_parts:
+            paid_at = paid_at.replace(microsecond=0)
+            payments.append((payment_id, order_id, amount, str(paid_at),
+                             _pick(rnd, _PAYMENT_METHODS), payment_status))
+            if payment_status == 'paid':
+                self._add(self.revenue_stats, paid_at.date().isoformat(), 1, amount)
+            payment_id += 1
+        return total, work_id, payment_id
+
+    def generate_orders(self):
+        """Заказы по дням периода с работами, запчастями и платежами"""
+        rnd = self.random
+        batch_size = self.writer.batch_size
+        order_id = self._next_id('orders', 'order_id')
+        work_id = self._next_id('works', 'work_id')
+        payment_id = self._next_id('payments', 'payment_id')
+        client_total = self.client_weights[-1]
+
+        orders, works, workparts, payments = [], [], [], []
+        generated, reported = 0, 0
+        for offset, count in enumerate(day_counts(self.orders, self.start, self.days)):
+            day = self.start + timedelta(days=offset)
+            age = (self.end - day).days
+            for hour in sorted(rnd.choices(_HOURS[0], cum_weights=_HOURS[1], k=count)):
+                created = datetime(day.year, day.month, day.day, hour, rnd.randint(0, 59), rnd.randint(0, 59))
+                client_index = self.client_ranks[bisect(self.client_weights, rnd.random() * client_total)]
+                car_id = self.first_car[client_index] + rnd.randrange(self.car_counts[client_index])
+                status = self._order_status(age)
+                total, work_id, payment_id = self._order(order_id, created, status, work_id,
+                                                         works, workparts, payments, payment_id)
+                orders.append((order_id, str(created), self.first_client + client_index, car_id, status, total))
+                self._add(self.order_stats, (day.isoformat(), status), 1, total)
+                order_id += 1
+
+            if len(orders) >= batch_size or offset == self.days - 1:
+                # Порядок записи - по внешним ключам
+                self._write('orders', ('order_id', 'creation_date', 'client_id', 'car_id', 'status', 'total_cost'),
+                            orders)
+                self._write('works', ('work_id', 'order_id', 'service_id', 'employee_id', 'start_date',
+                                      'end_date', 'status', 'notes'), works)
+                self._write('workparts', ('work_id', 'part_id', 'quantity', 'price_at_usage'), workparts)
+                self._write('payments', ('payment_id', 'order_id', 'amount', 'date', 'method', 'status'), payments)
+                generated += len(orders)
+                orders, works, workparts, payments = [], [], [], []
+                if generated - reported >= self.orders / 10:
+                    print(f"  заказов: {generated} из {self.orders}")
+                    reported = generated
+
+    def generate(self):
+        """
+        Полная генерация
+        :return: Словарь {таблица: вставлено строк}
+        """
+        self.generate_references()
+        self.generate_clients()
+        self.generate_orders()
+        self.writer.finish(self)
+        return self.counts
+
+
+def open_writer(sqlite_path=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Приемник данных: SQLite-файл или MySQL из настроек .env"""
+    if sqlite_path:
+        from sqlite_standin import SQLiteDatabase
+        return SQLiteWriter(SQLiteDatabase(sqlite_path), batch_size)
+    return MySQLWriter(DatabaseManager(), batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генерация синтетических данных автосервиса")
+    parser.add_argument('--orders', type=int, default=10000, help="Сколько заказов (от 10 тыс. до 10 млн)")
+    parser.add_argument('--skew', type=float, default=0.8,
+                        help="Перекос распределения Ципфа: 0 - равномерно, больше - сильнее")
+    parser.add_argument('--days', type=int, default=730, help="Период заказов в днях, до сегодня")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--sqlite', metavar='PATH', help="Писать в SQLite-файл вместо MySQL")
+    args = parser.parse_args()
+
+    writer = open_writer(args.sqlite, args.batch_size)
+    started = time.perf_counter()
+    counts = DataGenerator(writer, args.orders, args.skew, args.days, args.seed).generate()
+    elapsed = time.perf_counter() - started
+    for table, count in counts.items():
+        print(f"{table:<12} {count:>10}")
+    print(f"Всего {sum(counts.values())} строк за {elapsed:.1f} с "
+          f"({sum(counts.values()) / elapsed:.0f} строк/с), база: {writer.name}")
@@ -0,0 +1,82 @@
+"""
+Нагрузочная проверка HTTP API (api_server.py): задержки p50/p99 по эндпоинтам.
+Запуск: python -m benchmarks.load_test --url http://127.0.0.1:8080 --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+import aiohttp
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def discover(session, base_url):
+    """Сценарии нагрузки: список заказов, детали заказов (с ETag), поиск"""
+    async with session.get(f"{base_url}/orders", params={'limit': 100}) as response:
+        orders = (await response.json())['items']
+    if not orders:
+        raise SystemExit("В базе нет заказов для нагрузочной проверки")
+    order_ids = [order['order_id'] for order in orders]
+    names = [order['client_name'][:3] for order in orders if order.get('client_name')]
+    return [
+        ('GET /orders', lambda: (f"{base_url}/orders", {'limit': 50})),
+        ('GET /orders/{id}', lambda: (f"{base_url}/orders/{random.choice(order_ids)}", None)),
+        ('GET /orders/search', lambda: (f"{base_url}/orders/search", {'q': random.choice(names or ['А'])})),
+        ('GET /clients', lambda: (f"{base_url}/clients", {'limit': 50})),
+    ]
+
+
+async def run(base_url, total, concurrency, use_etag):
+    latencies = defaultdict(list)
+    statuses = defaultdict(int)
+    etags = {}
+    timeout = aiohttp.ClientTimeout(total=30)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                     headers={'Accept-Encoding': 'gzip'}) as session:
+        scenarios = await discover(session, base_url)
+        queue = asyncio.Queue()
+        for _ in range(total):
+            queue.put_nowait(random.choice(scenarios))
+
+        async def worker():
+            while not queue.empty():
+                name, make_request = queue.get_nowait()
+                url, params = make_request()
+                headers = {'If-None-Match': etags[url]} if use_etag and url in etags else None
+                started = time.perf_counter()
+                async with session.get(url, params=params, headers=headers) as response:
+                    await response.read()
+                    if 'ETag' in response.headers:
+                        etags[url] = response.headers['ETag']
+                latencies[name].append(time.perf_counter() - started)
+                statuses[response.status] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    print(f"{'Эндпоинт':<22} {'Запросов':>9} {'p50, мс':>9} {'p99, мс':>9}")
+    for name, values in sorted(latencies.items()):
+        print(f"{name:<22} {len(values):>9} {percentile(values, 0.5) * 1000:>9.2f} "
+              f"{percentile(values, 0.99) * 1000:>9.2f}")
+    all_values = [value for values in latencies.values() for value in values]
+    print(f"{'Всего':<22} {len(all_values):>9} {percentile(all_values, 0.5) * 1000:>9.2f} "
+          f"{percentile(all_values, 0.99) * 1000:>9.2f}")
+    print(f"Пропускная способность: {len(all_values) / elapsed:.0f} запросов/с, коды ответов: {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочная проверка HTTP API автосервиса")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--no-etag', action='store_true',
+                        help="Не отправлять If-None-Match (каждый раз полный ответ)")
+    args = parser.parse_args()
+    asyncio.run(run(args.url.rstrip('/'), args.requests, args.concurrency, not args.no_etag))
@@ -1,20 +1,285 @@
 import mysql
+from datetime import datetime
 from tabulate import tabulate
-from db_connector import DatabaseManager
+from db_connector import DatabaseManager, BulkResult, iter_batches, DEFAULT_BATCH_SIZE
+from pagination import fetch_keyset_page, DEFAULT_PAGE_SIZE
+from reference_cache import get_reference_cache, REFERENCE_TABLES
+from normalization import normalize_phone, normalize_plate
+from rollups import RollupRefresher
+from search_index import get_search_index
+from status_queue import get_status_queue, STATUS_QUEUE_ENABLED
+from queries import sql, sql_in
+from records import Order, Client
+
+# Допустимые статусы заказа
+ORDER_STATUSES = ['new', 'in_progress', 'completed', 'cancelled']
+
+# Столбцы таблицы заказов в консоли: (атрибут Order, заголовок)
+ORDER_TABLE_COLUMNS = [
+    ('order_id', "ID"), ('created', "Дата"), ('status', "Статус"),
+    ('client_name', "Клиент"), ('car', "Автомобиль"),
+]
+
+
+def assemble_order_aggregate(head, work_rows, payment_rows, services, employees):
+    """
+    Сборка агрегата заказа из прочитанных строк (общая для синхронного и асинхронного CRUD)
+    :param head: Строка заказа с клиентом и автомобилем
+    :param work_rows: Работы заказа с запчастями (строка на запчасть)
+    :param payment_rows: Платежи заказа (payment_id, amount, payment_date, method, payment_status)
+    :param services: Справочник услуг из кэша {service_id: строка}
+    :param employees: Справочник сотрудников из кэша {employee_id: строка}
+    :return: Словарь с ключами order, client, car, works, payments
+    """
+    works = {}
+    for row in work_rows:
+        work = works.get(row['work_id'])
+        if work is None:
+            service = services.get(row['service_id'])
+            employee = employees.get(row['employee_id'])
+            work = works[row['work_id']] = {
+                'work_id': row['work_id'],
+                'service': service['name'] if service else None,
+                'employee': employee['name'] if employee else None,
+                'start_date': row['start_date'],
+                'end_date': row['end_date'],
+                'status': row['status'],
+                'parts': []
+            }
+        if row['part_id'] is not None:
+            work['parts'].append({
+                'part_id': row['part_id'],
+                'name': row['part_name'],
+                'quantity': row['quantity'],
+                'price_at_usage': row['price_at_usage']
+            })
+
+    return {
+        'order': {key: head[key] for key in ('order_id', 'creation_date', 'status', 'total_cost')},
+        'client': {
+            'client_id': head['client_id'],
+            'name': head['client_name'],
+            'phone': head['client_phone'],
+            'email': head['email']
+        },
+        'car': {key: head[key] for key in ('car_id', 'brand', 'model', 'year', 'license_plate', 'vin')},
+        'works': list(works.values()),
+        'payments': [{
+            'payment_id': row['payment_id'],
+            'amount': row['amount'],
+            'date': row['payment_date'],
+            'method': row['method'],
+            'status': row['payment_status']
+        } for row in payment_rows]
+    }
+
+
+def build_order_stats_query(start_date=None, end_date=None, client_id=None):
+    """
+    Запрос статистики заказов GROUP BY status WITH ROLLUP с фильтрами: (запрос, параметры).
+    Итоговая строка ROLLUP - строка со status IS NULL (без GROUPING(), которой нет
+    в MySQL 5.7 и MariaDB); заказы без статуса не учитываются, как и в daily_order_stats
+    """
+    conditions, params = ["status IS NOT NULL"], []
+    if start_date:
+        conditions.append("creation_date >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append("creation_date < %s + INTERVAL 1 DAY")
+        params.append(end_date)
+    if client_id is not None:
+        conditions.append("client_id = %s")
+        params.append(client_id)
+
+    query = """
+    SELECT status,
+           COUNT(*) as order_count,
+           COALESCE(SUM(total_cost), 0) as total_cost,
+           AVG(total_cost) as avg_cost,
+           COUNT(total_cost) as cost_count
+    FROM orders
+    """
+    query += " WHERE " + " AND ".join(conditions)
+    query += " GROUP BY status WITH ROLLUP"
+    return query, params
+
+
+def build_order_search(term, limit):
+    """
+    Поиск заказов для выбора (общий для синхронного и асинхронного CRUD): по номеру
+    заказа или телефону (цифры), по началу ФИО клиента или госномера (текст)
+    :return: (имя запроса из реестра, параметры)
+    """
+    term = term.strip()
+    if term.isdigit():
+        return 'orders.search_by_number', (int(term), f"%{term}%", limit)
+    return 'orders.search_by_text', (f"{term}%", f"{normalize_plate(term)}%", limit)
+
+
+def build_status_update(order_id, status):
+    """
+    Прямая запись статуса заказа: (запрос, параметры). Запись условная - не перезаписывает
+    более новое изменение, в том числе из очереди статусов (см. status_queue.OrderStatusQueue)
+    """
+    changed_at = datetime.now()
+    return sql('orders.update_status_at'), (status, changed_at, order_id, changed_at)
+
+
+def order_stats_from_rows(rows):
+    """
+    Строки WITH ROLLUP -> {статус: {'order_count', 'total_cost', 'avg_cost'}, 'total': {...}}.
+    Если итоговой строки нет (база без WITH ROLLUP, например SQLite), итог считается по статусам
+    :param rows: Результат build_order_stats_query; False или None - ошибка запроса
+    :return: Словарь статистики или None при ошибке запроса
+    """
+    if rows is None or rows is False:
+        return None
+    stats = {}
+    for row in rows:
+        key = 'total' if row['status'] is None else row['status']
+        stats[key] = {'order_count': row['order_count'],
+                      'total_cost': row['total_cost'],
+                      'avg_cost': row['avg_cost']}
+    if 'total' not in stats:
+        total_cost = sum(row['total_cost'] for row in rows)
+        cost_count = sum(row['cost_count'] for row in rows)
+        stats['total'] = {'order_count': sum(row['order_count'] for row in rows),
+                          'total_cost': total_cost,
+                          'avg_cost': total_cost / cost_count if cost_count else None}
+    return stats
+
 
 # CRUD операции для клиентов
 class clientCRUD:
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
     def add_client(self, name, phone, email=None, address=None):
-        query = """
-        INSERT INTO clients (name, phone, email, address)
-        VALUES (%s, %s, %s, %s)
-        """
-        return self.db.execute_query(query, (name, phone, email, address))
+        """:return: ID нового клиента или None при ошибке"""
+        client_id = self.db.execute_insert(sql('clients.insert'), (name, phone, email, address),
+                                           name='clients.insert')
+        if client_id is not None:
+            get_search_index(self.db).add_client(client_id, name, phone, email)
+        return client_id
     
-    def get_clients(self):
-        query = "SELECT * FROM clients"
-        return self.db.execute_query(query, fetch=True)
+    def add_clients_bulk(self, clients, batch_size=None):
+        """
+        Массовое добавление клиентов пакетами (одна транзакция на пакет)
+        :param clients: Итерируемое словарей с ключами name, phone, email, address
+        :param batch_size: Размер пакета
+        :return: BulkResult(inserted, failed); строки с ошибками (например, дубликат
+                 телефона) попадают в failed и не прерывают загрузку
+        """
+        query = sql('clients.insert')
+        rows = (
+            (client['name'], client['phone'], client.get('email'), client.get('address'))
+            for client in clients
+        )
+        result = self.db.insert_many(query, rows, batch_size)
+        # Построчно обновлять индекс дороже, чем перестроить его при следующем поиске
+        get_search_index(self.db).invalidate()
+        return result
+
+    def register_client_with_cars(self, client, cars=()):
+        """
+        Регистрация клиента вместе с автомобилями в одной транзакции:
+        ID берутся из lastrowid, при ошибке любой вставки не остается ни клиента, ни машин
+        :param client: Словарь с ключами name, phone, email, address
+        :param cars: Список словарей с ключами brand, model, license_plate, year, vin
+        :return: (client_id, [car_id, ...]) или None при ошибке
+        """
+        try:
+            with self.db.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    client_id, car_ids = self._insert_registration(cursor, client, cars)
+                finally:
+                    cursor.close()
+        except mysql.connector.Error as e:
+            print(f"Ошибка базы данных: {e}")
+            return None
+        self._index_registration(client_id, client, cars, car_ids)
+        return client_id, car_ids
+
+    def register_clients_with_cars(self, registrations, batch_size=None):
+        """
+        Массовая регистрация клиентов с автомобилями: одна транзакция на пакет,
+        каждая регистрация - в своей точке сохранения. Отвергнутая регистрация
+        (дубликат телефона, номера, VIN) откатывается целиком и попадает в отчет,
+        остальные регистрации пакета фиксируются.
+        :param registrations: Итерируемое пар (клиент, список автомобилей) в формате register_client_with_cars
+        :return: BulkResult(inserted, failed); inserted - число зарегистрированных клиентов
+        """
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+        inserted = 0
+        failed = []
+        for start, batch in iter_batches(registrations, batch_size):
+            registered, batch_failed = [], []
+            try:
+                with self.db.transaction() as connection:
+                    cursor = connection.cursor()
+                    try:
+                        for offset, (client, cars) in enumerate(batch):
+                            cursor.execute("SAVEPOINT registration")
+                            try:
+                                client_id, car_ids = self._insert_registration(cursor, client, cars)
+                            except mysql.connector.Error as e:
+                                cursor.execute("ROLLBACK TO SAVEPOINT registration")
+                                batch_failed.append((start + offset, (client, cars), str(e)))
+                                continue
+                            registered.append((client_id, client, cars, car_ids))
+                    finally:
+                        cursor.close()
+            except mysql.connector.Error as e:
+                # Пакет не зафиксирован - в отчет попадают все его регистрации
+                print(f"Ошибка базы данных: {e}")
+                failed.extend((start + offset, registration, str(e)) for offset, registration in enumerate(batch))
+                continue
+            inserted += len(registered)
+            failed.extend(batch_failed)
+            for registration in registered:
+                self._index_registration(*registration)
+        return BulkResult(inserted, failed)
+
+    @staticmethod
+    def _insert_registration(cursor, client, cars):
+        """Вставка клиента и его автомобилей курсором открытой транзакции: (client_id, [car_id, ...])"""
+        cursor.execute(
+            sql('clients.insert'),
+            (client['name'], client['phone'], client.get('email'), client.get('address'))
+        )
+        client_id = cursor.lastrowid
+        car_ids = []
+        for car in cars:
+            cursor.execute(
+                sql('cars.insert'),
+                (client_id, car['brand'], car['model'], car.get('license_plate'), car.get('year'), car.get('vin'))
+            )
+            car_ids.append(cursor.lastrowid)
+        return client_id, car_ids
+
+    def _index_registration(self, client_id, client, cars, car_ids):
+        index = get_search_index(self.db)
+        index.add_client(client_id, client['name'], client['phone'], client.get('email'))
+        for car_id, car in zip(car_ids, cars):
+            index.add_car(car_id, client_id, car['brand'], car['model'], car.get('license_plate'), car.get('vin'))
+
+    def get_clients(self, stream=False, chunk_size=None):
+        return self.db.execute_named('clients.list', fetch=True, stream=stream, chunk_size=chunk_size)
     
+    def get_clients_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Страница списка клиентов (keyset по client_id)
+        :param cursor: Курсор из предыдущей страницы, None - первая страница
+        :param limit: Размер страницы
+        :return: Page(rows, next_cursor, prev_cursor)
+        """
+        return fetch_keyset_page(
+            self.db, sql('clients.list'), ['client_id'],
+            lambda client: (client.client_id,),
+            cursor=cursor, limit=limit, record=Client
+        )
+
     def update_client(self, client_id, **kwargs):
         if not kwargs:
             return False
@@ -30,16 +295,94 @@ class clientCRUD:
         query += ", ".join(updates) + " WHERE client_id = %s"
         params.append(client_id)
         
-        return self.db.execute_query(query, params)
+        result = self.db.execute_query(query, params)
+        if result:
+            get_search_index(self.db).update_client(client_id, **kwargs)
+        return result
     
     def delete_client(self, client_id):
-        query = "DELETE FROM clients WHERE client_id = %s"
-        return self.db.execute_query(query, (client_id,))
+        result = self.db.execute_named('clients.delete', (client_id,))
+        if result:
+            get_search_index(self.db).remove_client(client_id)
+        return result
     
+# CRUD операции для автомобилей
+class carCRUD:
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def add_car(self, client_id, brand, model, license_plate, year=None, vin=None):
+        """:return: ID нового автомобиля или None при ошибке"""
+        car_id = self.db.execute_insert(sql('cars.insert'), (client_id, brand, model, license_plate, year, vin),
+                                        name='cars.insert')
+        if car_id is not None:
+            get_search_index(self.db).add_car(car_id, client_id, brand, model, license_plate, vin)
+        return car_id
+
+    def add_cars_bulk(self, cars, batch_size=None):
+        """
+        Массовое добавление автомобилей пакетами (одна транзакция на пакет)
+        :param cars: Итерируемое словарей с ключами client_id, brand, model,
+                     license_plate, year, vin
+        :param batch_size: Размер пакета
+        :return: BulkResult(inserted, failed); дубликаты номера или VIN попадают в failed
+        """
+        query = sql('cars.insert')
+        rows = (
+            (car['client_id'], car['brand'], car['model'], car['license_plate'],
+             car.get('year'), car.get('vin'))
+            for car in cars
+        )
+        result = self.db.insert_many(query, rows, batch_size)
+        get_search_index(self.db).invalidate()
+        return result
+
+    def get_client_cars(self, client_id):
+        return self.db.execute_named('cars.by_client', (client_id,), fetch=True)
+
+# CRUD операции для справочников (услуги, сотрудники, должности, склады)
+class referenceCRUD:
+    def __init__(self, table, db=None):
+        if table not in REFERENCE_TABLES:
+            raise ValueError(f"{table} не является справочником")
+        self.table = table
+        self.key_field = REFERENCE_TABLES[table][1]
+        self.db = db or DatabaseManager()
+        self.cache = get_reference_cache(self.db)
+
+    def get_all(self):
+        """Справочник из кэша: {id: строка}"""
+        return self.cache.get_table(self.table)
+
+    def add(self, **fields):
+        query = (f"INSERT INTO {self.table} ({', '.join(fields)}) "
+                 f"VALUES ({', '.join(['%s'] * len(fields))})")
+        return self._write(query, list(fields.values()))
+
+    def update(self, record_id, **fields):
+        if not fields:
+            return False
+        updates = ", ".join(f"{field} = %s" for field in fields)
+        query = f"UPDATE {self.table} SET {updates} WHERE {self.key_field} = %s"
+        return self._write(query, list(fields.values()) + [record_id])
+
+    def delete(self, record_id):
+        query = f"DELETE FROM {self.table} WHERE {self.key_field} = %s"
+        return self._write(query, (record_id,))
+
+    def _write(self, query, params):
+        """Запись в справочник со сбросом его записи в кэше"""
+        result = self.db.execute_query(query, params)
+        self.cache.invalidate(self.table)
+        return result
+
 # CRUD операции для заказов---------------------------------------------------------------------------------
 class OrderCRUD:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+        self.rollups = RollupRefresher(self.db)
+        # Отложенная запись статусов (ORDER_STATUS_QUEUE=1, см. status_queue.py)
+        self.status_queue = get_status_queue(self.db) if STATUS_QUEUE_ENABLED else None
 
     def create_order(self, client_id, car_id, status='new'):
         """
@@ -49,7 +392,6 @@ class OrderCRUD:
         :param status: Статус заказа (str)
         :return: ID нового заказа или None при ошибке
         """
-        cursor = None
         try:
             # Валидация входных данных
             if not isinstance(client_id, int) or not isinstance(car_id, int):
@@ -59,86 +401,185 @@ class OrderCRUD:
                 return None
 
             # Создание заказа
-            query = """
-            INSERT INTO orders (client_id, car_id, status)
-            VALUES (%s, %s, %s)
-            """
-            cursor = self.db.connection.cursor()
-            cursor.execute(query, (client_id, car_id, status))
-            self.db.connection.commit()
-            return cursor.lastrowid
+            with self.db.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(sql('orders.insert'), (client_id, car_id, status, datetime.now()))
+                    order_id = cursor.lastrowid
+                    days = self.rollups.order_days([order_id], cursor)
+                finally:
+                    cursor.close()
+            self.rollups.refresh_after_commit(days)
+            return order_id
 
         except mysql.connector.Error as e:
             print(f"Ошибка базы данных: {e}")
-            self.db.connection.rollback()
             return None
         except Exception as e:
             print(f"Ошибка при создании заказа: {e}")
             return None
-        finally:
-            if cursor:
-                cursor.close()
+
+    def create_orders_bulk(self, orders, batch_size=None):
+        """
+        Массовое создание заказов пакетами (одна транзакция на пакет).
+        Принадлежность автомобилей клиентам проверяется одним запросом на пакет.
+        :param orders: Итерируемое словарей с ключами client_id, car_id, status
+        :param batch_size: Размер пакета
+        :return: BulkResult(inserted, failed)
+        """
+        query = sql('orders.insert')
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+        inserted = 0
+        failed = []
+        for start, batch in iter_batches(orders, batch_size):
+            changed_at = datetime.now()
+            owners = self._car_owners({order['car_id'] for order in batch})
+            valid_rows = []
+            positions = []
+            for offset, order in enumerate(batch):
+                row = (order['client_id'], order['car_id'], order.get('status', 'new'))
+                if row[2] not in ORDER_STATUSES:
+                    failed.append((start + offset, row, f"Недопустимый статус: {row[2]}"))
+                elif owners.get(row[1]) != row[0]:
+                    failed.append((start + offset, row, "Автомобиль не существует или не принадлежит клиенту"))
+                else:
+                    valid_rows.append(row + (changed_at,))
+                    positions.append(start + offset)
+
+            result = self.db.insert_many(query, valid_rows, len(batch))
+            inserted += result.inserted
+            failed.extend((positions[i], row[:3], error) for i, row, error in result.failed)
+        if inserted:
+            # Заказы создаются с creation_date по умолчанию - текущим днем сервера
+            self.rollups.refresh_after_commit([self.rollups.current_day()])
+        return BulkResult(inserted, failed)
+
+    def _car_owners(self, car_ids):
+        """Владельцы автомобилей одним запросом: {car_id: client_id}"""
+        if not car_ids:
+            return {}
+        rows = self.db.execute_query(
+            sql_in('cars.owners', len(car_ids)), tuple(car_ids), fetch=True, name='cars.owners'
+        ) or []
+        return {row['car_id']: row['client_id'] for row in rows}
 
     def read_order(self, order_id):
         """
         Получение информации о заказе с JOIN-данными
         :param order_id: ID заказа
-        :return: Словарь с данными заказа или None если не найден
+        :return: Order или None если не найден; статус - с учетом еще не записанного из очереди
+        """
+        try:
+            result = self.db.execute_named('orders.read', (order_id,), fetch=True, record=Order)
+            if not result:
+                return None
+            pending = self.status_queue.pending_status(order_id) if self.status_queue is not None else None
+            return result[0]._replace(status=pending) if pending else result[0]
+        except Exception as e:
+            print(f"Ошибка при чтении заказа: {e}")
+            return None
+
+    def load_order_aggregate(self, order_id):
+        """
+        Заказ целиком за два запроса: заказ с клиентом, автомобилем и платежами,
+        затем работы с использованными запчастями. Названия услуг и имена
+        сотрудников подставляются из кэша справочников.
+        :param order_id: ID заказа
+        :return: Словарь с ключами order, client, car, works, payments или None
         """
         try:
-            query = """
-            SELECT o.order_id, o.creation_date, o.status, o.total_cost,
-                   c.client_id, c.name as client_name, c.phone as client_phone,
-                   car.car_id, car.brand, car.model, car.license_plate
-            FROM orders o
-            JOIN clients c ON o.client_id = c.client_id
-            JOIN cars car ON o.car_id = car.car_id
-            WHERE o.order_id = %s
-            """
-            result = self.db.execute_query(query, (order_id,), fetch=True)
-            return result[0] if result else None
+            rows = self.db.execute_named('orders.aggregate_head', (order_id,), fetch=True)
+            if not rows:
+                return None
+
+            work_rows = self.db.execute_named('orders.aggregate_works', (order_id,), fetch=True) or []
         except Exception as e:
             print(f"Ошибка при чтении заказа: {e}")
             return None
 
-    def read_all_orders(self):
+        payments = [row for row in rows if row['payment_id'] is not None]
+        cache = get_reference_cache(self.db)
+        return assemble_order_aggregate(rows[0], work_rows, payments,
+                                        cache.get_table('services'), cache.get_table('employees'))
+
+    def search_orders(self, term, limit=20):
+        """
+        Поиск заказов для выбора: по номеру заказа или телефону (цифры),
+        по началу ФИО клиента или госномера (текст)
+        :param term: Строка поиска
+        :param limit: Максимум результатов
+        :return: Список Order, от новых к старым
+        """
+        name, params = build_order_search(term, limit)
+        return self.db.execute_named(name, params, fetch=True, record=Order) or []
+
+    def read_all_orders(self, stream=False, chunk_size=None):
         """
         Получение списка всех заказов с JOIN-данными
-        :return: Список словарей с заказами
+        :param stream: Читать потоково, порциями по chunk_size строк
+        :param chunk_size: Размер порции при stream=True
+        :return: Список Order (при stream=True - генератор порций)
         """
         try:
-            query = """
-            SELECT o.order_id, o.creation_date, o.status,
-                   c.name as client_name, car.brand, car.model
-            FROM orders o
-            JOIN clients c ON o.client_id = c.client_id
-            JOIN cars car ON o.car_id = car.car_id
-            ORDER BY o.creation_date DESC
-            """
-            return self.db.execute_query(query, fetch=True)
+            query = sql('orders.list') + " ORDER BY o.creation_date DESC"
+            if stream:
+                return self.db.iter_query(query, chunk_size=chunk_size, record=Order)
+            return self.db.execute_query(query, fetch=True, name='orders.list_all', record=Order)
         except Exception as e:
             print(f"Ошибка при получении списка заказов: {e}")
             return []
 
+    def read_orders_page(self, cursor=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        Страница списка заказов, от новых к старым (keyset по creation_date, order_id)
+        :param cursor: Курсор из предыдущей страницы, None - первая страница
+        :param limit: Размер страницы
+        :return: Page(rows, next_cursor, prev_cursor), строки - Order
+        """
+        return fetch_keyset_page(
+            self.db, sql('orders.list'), ['o.creation_date', 'o.order_id'],
+            lambda order: (order.creation_date, order.order_id),
+            cursor=cursor, limit=limit, descending=True, record=Order
+        )
+
+    def get_order_stats(self, start_date=None, end_date=None, client_id=None):
+        """
+        Статистика заказов одним запросом GROUP BY status WITH ROLLUP,
+        без выборки самих заказов
+        :param start_date: Начало периода (включительно)
+        :param end_date: Конец периода (день включительно)
+        :param client_id: Только заказы клиента
+        :return: Словарь {статус: {'order_count', 'total_cost', 'avg_cost'}},
+                 итог по всем статусам - под ключом 'total'; None при ошибке запроса
+        """
+        query, params = build_order_stats_query(start_date, end_date, client_id)
+        return order_stats_from_rows(self.db.execute_query(query, params, fetch=True))
+
     def update_order_status(self, order_id, new_status):
         """
-        Обновление статуса заказа
+        Обновление статуса заказа.
+        С очередью статусов изменение принимается в очередь и записывается
+        в базу пакетом вместе с другими (см. status_queue.OrderStatusQueue)
         :param order_id: ID заказа
         :param new_status: Новый статус
         :return: True при успехе, False при ошибке
         """
-        valid_statuses = ['new', 'in_progress', 'completed', 'cancelled']
-        if new_status not in valid_statuses:
-            print(f"Недопустимый статус. Допустимые значения: {', '.join(valid_statuses)}")
+        if new_status not in ORDER_STATUSES:
+            print(f"Недопустимый статус. Допустимые значения: {', '.join(ORDER_STATUSES)}")
             return False
+        if self.status_queue is not None:
+            return self.status_queue.enqueue(order_id, new_status)
 
         try:
-            query = """
-            UPDATE orders 
-            SET status = %s 
-            WHERE order_id = %s
-            """
-            return self.db.execute_query(query, (new_status, order_id))
+            with self.db.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(*build_status_update(order_id, new_status))
+                    days = self.rollups.order_days([order_id], cursor)
+                finally:
+                    cursor.close()
+            self.rollups.refresh_after_commit(days)
+            return True
         except Exception as e:
             print(f"Ошибка при обновлении статуса заказа: {e}")
             return False
@@ -149,78 +590,79 @@ class OrderCRUD:
         :param order_id: ID заказа для удаления
         :return: True если удаление успешно, False при ошибке
         """
-        cursor = None
         try:
-            # 1. Проверяем существование заказа
-            check_query = "SELECT 1 FROM orders WHERE order_id = %s"
-            cursor = self.db.connection.cursor()
-            cursor.execute(check_query, (order_id,))
-            if not cursor.fetchone():
-                print(f"Ошибка: Заказ с ID {order_id} не найден")
-                return False
+            with self.db.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    # 1. Проверяем существование заказа
+                    cursor.execute(sql('orders.exists'), (order_id,))
+                    if not cursor.fetchone():
+                        print(f"Ошибка: Заказ с ID {order_id} не найден")
+                        return False
 
-            # 2. Удаляем связанные работы (если нужно каскадное удаление)
-            # delete_works_query = "DELETE FROM works WHERE order_id = %s"
-            # cursor.execute(delete_works_query, (order_id,))
+                    # 2. Удаляем связанные работы (если нужно каскадное удаление)
+                    # delete_works_query = "DELETE FROM works WHERE order_id = %s"
+                    # cursor.execute(delete_works_query, (order_id,))
+
+                    # 3. Удаляем сам заказ; дневные агрегаты его дня пересчитываются после фиксации
+                    days = self.rollups.order_days([order_id], cursor)
+                    cursor.execute(sql('orders.delete'), (order_id,))
+                finally:
+                    cursor.close()
+            self.rollups.refresh_after_commit(days)
 
-            # 3. Удаляем сам заказ
-            delete_query = "DELETE FROM orders WHERE order_id = %s"
-            cursor.execute(delete_query, (order_id,))
-            self.db.connection.commit()
-            
             print(f"Заказ {order_id} успешно удален")
             return True
 
         except mysql.connector.Error as err:
             print(f"Ошибка базы данных: {err}")
-            self.db.connection.rollback()
             return False
         except Exception as e:
             print(f"Неожиданная ошибка при удалении: {e}")
             return False
-        finally:
-            if cursor:
-                cursor.close()
 
     def get_orders_by_client(self, client_id):
         """
         Получение всех заказов клиента
         :param client_id: ID клиента
-        :return: Список заказов клиента
+        :return: Список Order клиента
         """
         try:
-            query = """
-            SELECT o.order_id, o.creation_date, o.status,
-                   car.brand, car.model, car.license_plate
-            FROM orders o
-            JOIN cars car ON o.car_id = car.car_id
-            WHERE o.client_id = %s
-            ORDER BY o.creation_date DESC
-            """
-            return self.db.execute_query(query, (client_id,), fetch=True)
+            return self.db.execute_named('orders.by_client', (client_id,), fetch=True, record=Order)
         except Exception as e:
             print(f"Ошибка при получении заказов клиента: {e}")
             return []
 
+    def get_orders_by_phone(self, phone, limit=20):
+        """
+        Последние заказы клиента по номеру телефона (статус заказа по звонку)
+        :param phone: Телефон в любом формате (ищется как введен и в виде +7XXXXXXXXXX)
+        :param limit: Максимум заказов
+        """
+        phone = str(phone).strip()
+        return self.db.execute_named('orders.by_phone', (phone, normalize_phone(phone) or phone, limit),
+                                     fetch=True, record=Order) or []
+
+    def get_car_history(self, license_plate):
+        """
+        История заказов автомобиля по госномеру
+        :param license_plate: Госномер (ищется как введен и в нормализованном виде)
+        """
+        plate = str(license_plate).strip()
+        return self.db.execute_named('orders.car_history', (plate, normalize_plate(plate) or plate),
+                                     fetch=True, record=Order) or []
+
     def _validate_client_and_car(self, client_id, car_id):
         """Приватный метод валидации"""
         try:
             # Проверка клиента
-            client_check = self.db.execute_query(
-                "SELECT 1 FROM clients WHERE client_id = %s",
-                (client_id,),
-                fetch=True
-            )
+            client_check = self.db.execute_named('clients.exists', (client_id,), fetch=True)
             if not client_check:
                 print("Ошибка: Клиент не существует")
                 return False
 
             # Проверка автомобиля и его принадлежности клиенту
-            car_check = self.db.execute_query(
-                "SELECT 1 FROM cars WHERE car_id = %s AND client_id = %s",
-                (car_id, client_id),
-                fetch=True
-            )
+            car_check = self.db.execute_named('cars.owned_by_client', (car_id, client_id), fetch=True)
             if not car_check:
                 print("Ошибка: Автомобиль не существует или не принадлежит клиенту")
                 return False
@@ -230,24 +672,19 @@ class OrderCRUD:
             print(f"Ошибка валидации: {e}")
             return False
 
-    def display_orders_table(self, orders):
+    def display_orders_table(self, orders, columns=ORDER_TABLE_COLUMNS):
         """
         Красивый вывод таблицы заказов
-        :param orders: Список заказов
+        :param orders: Список Order
+        :param columns: Столбцы: (атрибут Order, заголовок); значения
+                        форматируются при выводе, без копий строк
         """
         if not orders:
             print("Нет данных для отображения")
             return
 
-        # Форматируем дату для лучшего отображения
-        formatted_orders = []
-        for order in orders:
-            formatted_order = order.copy()
-            if 'creation_date' in formatted_order:
-                formatted_order['creation_date'] = formatted_order['creation_date'].strftime('%Y-%m-%d %H:%M')
-            formatted_orders.append(formatted_order)
-
-        print(tabulate(formatted_orders, headers="keys", tablefmt="grid"))
+        print(tabulate(([getattr(order, key) for key, _ in columns] for order in orders),
+                       headers=[header for _, header in columns], tablefmt="grid"))
 
 
 
@@ -0,0 +1,256 @@
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from decimal import Decimal
+from db_connector import DatabaseManager, DEFAULT_CHUNK_SIZE
+from records import Order, Work, Payment
+
+# Типы столбцов Parquet по схеме Скрипт.sql (INT, VARCHAR/ENUM, DATETIME, DECIMAL(10,2))
+PARQUET_TYPES = {
+    'int': lambda pa: pa.int32(),
+    'string': lambda pa: pa.string(),
+    'datetime': lambda pa: pa.timestamp('s'),
+    'money': lambda pa: pa.decimal128(10, 2),
+}
+
+_CENTS = Decimal('0.01')
+
+# Приведение значений, которые SQLite-заглушка возвращает в других типах (строки дат, float)
+PARQUET_CONVERTERS = {
+    'datetime': lambda value: datetime.fromisoformat(value) if isinstance(value, str) else value,
+    'money': lambda value: (Decimal(str(value)).quantize(_CENTS)
+                            if isinstance(value, (int, float)) else value),
+}
+
+# Источники выгрузки: запрос, класс записи строк, типы столбцов Parquet, столбец даты
+# для фильтра по периоду и возрастающий ключ для инкрементальной выгрузки
+SOURCES = {
+    'orders': {
+        'query': """
+        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
+               c.client_id, c.name as client_name, c.phone as client_phone,
+               car.car_id, car.brand, car.model, car.license_plate
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        """,
+        'record': Order,
+        'parquet_types': {
+            'order_id': 'int', 'creation_date': 'datetime', 'status': 'string', 'total_cost': 'money',
+            'client_id': 'int', 'client_name': 'string', 'client_phone': 'string',
+            'car_id': 'int', 'brand': 'string', 'model': 'string', 'license_plate': 'string',
+        },
+        'date_column': 'o.creation_date',
+        'key_column': 'o.order_id',
+        'key_field': 'order_id',
+    },
+    'works': {
+        'query': """
+        SELECT w.work_id, w.order_id, w.start_date, w.end_date, w.status,
+               s.service_id, s.name as service, s.price,
+               e.employee_id, e.name as employee
+        FROM works w
+        JOIN services s ON w.service_id = s.service_id
+        LEFT JOIN employees e ON w.employee_id = e.employee_id
+        """,
+        'record': Work,
+        'parquet_types': {
+            'work_id': 'int', 'order_id': 'int', 'start_date': 'datetime', 'end_date': 'datetime',
+            'status': 'string', 'service_id': 'int', 'service': 'string', 'price': 'money',
+            'employee_id': 'int', 'employee': 'string',
+        },
+        'date_column': 'w.start_date',
+        'key_column': 'w.work_id',
+        'key_field': 'work_id',
+    },
+    'payments': {
+        'query': """
+        SELECT p.payment_id, p.order_id, p.amount, p.date, p.method, p.status,
+               o.client_id
+        FROM payments p
+        JOIN orders o ON p.order_id = o.order_id
+        """,
+        'record': Payment,
+        'parquet_types': {
+            'payment_id': 'int', 'order_id': 'int', 'amount': 'money', 'date': 'datetime',
+            'method': 'string', 'status': 'string', 'client_id': 'int',
+        },
+        'date_column': 'p.date',
+        'key_column': 'p.payment_id',
+        'key_field': 'payment_id',
+    },
+}
+
+
+class CsvExportWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8', newline='')
+        self.writer = None
+
+    def write_chunk(self, rows):
+        # Записи - кортежи: пишутся как есть, заголовок - имена полей записи
+        if self.writer is None:
+            self.writer = csv.writer(self.file)
+            self.writer.writerow(rows[0]._fields)
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class JsonlExportWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write_chunk(self, rows):
+        self.file.writelines(
+            json.dumps(row._asdict(), ensure_ascii=False, default=str) + '\n' for row in rows
+        )
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExportWriter:
+    """
+    Запись в Parquet порциями: каждая порция - отдельная row group (нужен pyarrow).
+    Схема задается типами столбцов источника (SOURCES[...]['parquet_types']),
+    а не выводится из первой порции, поэтому одинакова для всех порций.
+    """
+
+    def __init__(self, path, types):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Для выгрузки в Parquet установите pyarrow") from e
+        self.pa = pyarrow
+        self.path = path
+        self.types = types
+        self.schema = pyarrow.schema([(field, PARQUET_TYPES[kind](pyarrow)) for field, kind in types.items()])
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write_chunk(self, rows):
+        # Порция собирается по столбцам, без словаря на строку
+        columns = {}
+        for field, values in zip(rows[0]._fields, zip(*rows)):
+            convert = PARQUET_CONVERTERS.get(self.types[field])
+            columns[field] = list(map(convert, values)) if convert else list(values)
+        self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {
+    'csv': CsvExportWriter,
+    'jsonl': JsonlExportWriter,
+    'parquet': ParquetExportWriter,
+}
+
+
+class DataExporter:
+    """
+    Потоковая выгрузка заказов, работ и платежей.
+    Строки читаются серверным курсором порциями и сразу пишутся в файл,
+    поэтому расход памяти не зависит от размера таблицы.
+    """
+
+    def __init__(self, db=None, state_path=None):
+        """
+        :param state_path: JSON-файл с последними выгруженными ключами (для инкрементальной выгрузки)
+        """
+        self.db = db or DatabaseManager()
+        self.state_path = state_path
+
+    def export(self, source, path, fmt=None, start_date=None, end_date=None,
+               incremental=False, chunk_size=None):
+        """
+        Выгрузка источника в файл
+        :param source: 'orders', 'works' или 'payments'
+        :param fmt: 'csv', 'jsonl' или 'parquet' (по умолчанию - по расширению файла)
+        :param start_date: Начало периода (включительно)
+        :param end_date: Конец периода (включительно)
+        :param incremental: Выгрузить только строки, появившиеся после прошлой выгрузки
+        :return: Количество выгруженных строк
+        """
+        if source not in SOURCES:
+            raise ValueError(f"Неизвестный источник: {source}")
+        spec = SOURCES[source]
+        fmt = fmt or os.path.splitext(path)[1].lstrip('.')
+        if fmt not in WRITERS:
+            raise ValueError(f"Неподдерживаемый формат: {fmt}")
+        if incremental and not self.state_path:
+            raise ValueError("Для инкрементальной выгрузки нужен файл состояния")
+
+        conditions, params = [], []
+        if start_date:
+            conditions.append(f"{spec['date_column']} >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append(f"{spec['date_column']} < %s + INTERVAL 1 DAY")
+            params.append(end_date)
+        state = self._load_state()
+        if incremental and source in state:
+            conditions.append(f"{spec['key_column']} > %s")
+            params.append(state[source])
+
+        query = spec['query']
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {spec['key_column']}"
+
+        exported = 0
+        last_key = None
+        started = time.monotonic()
+        writer = WRITERS[fmt](path, spec['parquet_types']) if fmt == 'parquet' else WRITERS[fmt](path)
+        try:
+            for rows in self.db.iter_query(query, params, chunk_size or DEFAULT_CHUNK_SIZE, record=spec['record']):
+                writer.write_chunk(rows)
+                exported += len(rows)
+                last_key = rows[-1][spec['key_field']]
+        finally:
+            writer.close()
+
+        if incremental and last_key is not None:
+            state[source] = last_key
+            self._save_state(state)
+
+        elapsed = time.monotonic() - started
+        print(f"{source}: выгружено {exported} строк в {path} "
+              f"({exported / elapsed if elapsed else 0:.0f} строк/с)")
+        return exported
+
+    def _load_state(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_state(self, state):
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Выгрузка заказов, работ и платежей в CSV/JSONL/Parquet")
+    parser.add_argument('source', choices=list(SOURCES))
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=list(WRITERS))
+    parser.add_argument('--from', dest='start_date', help="Начало периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--to', dest='end_date', help="Конец периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Только новые строки с прошлой выгрузки")
+    parser.add_argument('--state', default='export_state.json',
+                        help="Файл состояния инкрементальной выгрузки")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    exporter = DataExporter(state_path=args.state)
+    exporter.export(args.source, args.path, args.format, args.start_date, args.end_date,
+                    args.incremental, args.chunk_size)
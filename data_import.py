@@ -0,0 +1,399 @@
+import argparse
+import csv
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from mysql.connector import Error
+from db_connector import DatabaseManager, iter_batches, DEFAULT_BATCH_SIZE
+from crud_operations import ORDER_STATUSES
+from normalization import normalize_phone, normalize_plate, normalize_vin
+from rollups import RollupRefresher
+from search_index import get_search_index
+
+# Предупреждения LOAD DATA ... IGNORE о пропущенных строках: дубликат ключа, нет родительской строки.
+# Остальные (обрезка, преобразование значений) относятся к записанным строкам
+SKIPPED_ROW_WARNINGS = {1062, 1452}
+
+# Сколько предупреждений хранит сервер для SHOW WARNINGS (не больше 65535)
+MAX_WARNINGS = 65535
+
+_DUPLICATE_ENTRY = re.compile(r"Duplicate entry '(.*)' for key")
+_AT_ROW = re.compile(r"at row (\d+)")
+
+# Столбцы, которые импорт записывает в каждую таблицу
+COLUMNS = {
+    'clients': ['name', 'phone', 'email', 'address'],
+    'cars': ['client_id', 'brand', 'model', 'license_plate', 'year', 'vin'],
+    'orders': ['client_id', 'car_id', 'creation_date', 'status', 'total_cost'],
+}
+
+
+def read_records(path, fmt=None):
+    """
+    Потоковое чтение CSV или JSONL: в памяти одна запись
+    :param fmt: 'csv' или 'jsonl' (по умолчанию - по расширению файла)
+    :return: Генератор словарей
+    """
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.json')) else 'csv')
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _tsv_value(value):
+    """Значение поля для LOAD DATA (NULL - \\N, спецсимволы экранируются)"""
+    if value is None:
+        return '\\N'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class DataImporter:
+    """
+    Импорт выгрузок клиентов, автомобилей и заказов.
+    Конвейер: чтение -> нормализация и проверка -> поиск внешних ключей
+    одним запросом на пакет -> запись через LOAD DATA LOCAL INFILE
+    (если разрешен) или пакетными INSERT.
+    """
+
+    def __init__(self, db=None, use_load_data=True):
+        self.db = db or DatabaseManager()
+        # LOAD DATA требует DB_LOCAL_INFILE_DIR у клиента и local_infile на сервере
+        self.use_load_data = use_load_data and bool(os.getenv('DB_LOCAL_INFILE_DIR'))
+        self._seen = {}  # поле -> значения текущего пакета (см. _unique)
+
+    def import_file(self, entity, path, fmt=None, batch_size=None,
+                    checkpoint_path=None, rejects_path=None):
+        """
+        Импорт файла в таблицу
+        :param entity: 'clients', 'cars' или 'orders'
+        :param checkpoint_path: Файл контрольной точки для продолжения после сбоя
+        :param rejects_path: JSONL-файл для отвергнутых записей с причиной
+        :return: Словарь со статистикой импорта
+        """
+        if entity not in COLUMNS:
+            raise ValueError(f"Неизвестный тип данных: {entity}")
+        prepare = getattr(self, f"_prepare_{entity}")
+        resolve = getattr(self, f"_resolve_{entity}")
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+
+        position = self._load_checkpoint(checkpoint_path, entity, path)
+        stats = {'read': 0, 'inserted': 0, 'rejected': 0, 'skipped': position}
+        rejects = open(rejects_path, 'a', encoding='utf-8') if rejects_path else None
+        started = time.monotonic()
+        order_days = set()
+        try:
+            records = islice(read_records(path, fmt), position, None)
+            for start, batch in iter_batches(records, batch_size):
+                first_line = position + start
+                self._seen = {'phone': set(), 'license_plate': set(), 'vin': set()}
+                rows, failed = [], []
+                for offset, record in enumerate(batch):
+                    try:
+                        row = prepare(record)
+                        row['_line'] = first_line + offset
+                        rows.append(row)
+                    except (ValueError, KeyError) as e:
+                        failed.append((first_line + offset, record, str(e)))
+
+                rows, unresolved = resolve(rows)
+                failed.extend(unresolved)
+                inserted, not_written = self._write(entity, rows)
+                failed.extend(not_written)
+                if entity == 'orders' and inserted:
+                    order_days.update(row['creation_date'].date() for row in rows)
+
+                stats['read'] += len(batch)
+                stats['inserted'] += inserted
+                stats['rejected'] += len(failed)
+                self._report_rejects(rejects, failed)
+                self._save_checkpoint(checkpoint_path, entity, path, first_line + len(batch))
+
+                elapsed = time.monotonic() - started
+                print(f"{entity}: прочитано {stats['read']}, записано {stats['inserted']}, "
+                      f"отклонено {stats['rejected']}, {stats['read'] / elapsed:.0f} строк/с")
+        finally:
+            if rejects:
+                rejects.close()
+
+        if order_days:
+            # Заказы загружаются с исходными датами - пересчитываем дневные агрегаты этих дней
+            RollupRefresher(self.db).refresh_after_commit(order_days)
+        if entity in ('clients', 'cars') and stats['inserted']:
+            get_search_index(self.db).invalidate()
+
+        stats['seconds'] = time.monotonic() - started
+        stats['rows_per_second'] = stats['read'] / stats['seconds'] if stats['seconds'] else 0
+        return stats
+
+    # Нормализация и проверка записей ---------------------------------------------------------------
+    def _unique(self, field, value):
+        """
+        Проверка уникальности значения в пределах пакета: повтор отвергается до записи,
+        и пакет не откатывается целиком. Повторы между пакетами и с уже записанными
+        строками (в том числе после продолжения с контрольной точки) отвергает база
+        по UNIQUE: insert_many - построчным повтором пакета, LOAD DATA - предупреждением
+        """
+        if value in self._seen[field]:
+            raise ValueError(f"Повтор в файле: {field} = {value}")
+        self._seen[field].add(value)
+
+    def _prepare_clients(self, record):
+        name = (record.get('name') or '').strip()
+        phone = normalize_phone(record.get('phone'))
+        if not name:
+            raise ValueError("Не указано ФИО")
+        if not phone:
+            raise ValueError(f"Некорректный телефон: {record.get('phone')}")
+        self._unique('phone', phone)
+        return {
+            'name': name,
+            'phone': phone,
+            'email': (record.get('email') or '').strip().lower() or None,
+            'address': (record.get('address') or '').strip() or None,
+        }
+
+    def _prepare_cars(self, record):
+        plate = normalize_plate(record.get('license_plate'))
+        vin = normalize_vin(record.get('vin'))
+        if record.get('vin') and not vin:
+            raise ValueError(f"Некорректный VIN: {record.get('vin')}")
+        if not record.get('brand') or not record.get('model'):
+            raise ValueError("Не указаны марка и модель")
+        year = str(record.get('year') or '').strip()
+        if year and not year.isdigit():
+            raise ValueError(f"Некорректный год выпуска: {year}")
+        if plate:
+            self._unique('license_plate', plate)
+        if vin:
+            self._unique('vin', vin)
+        return {
+            'client_id': int(record['client_id']) if record.get('client_id') else None,
+            'client_phone': normalize_phone(record.get('client_phone')),
+            'brand': record['brand'].strip(),
+            'model': record['model'].strip(),
+            'license_plate': plate,
+            'year': int(year) if year else None,
+            'vin': vin,
+        }
+
+    def _prepare_orders(self, record):
+        status = (record.get('status') or 'new').strip()
+        if status not in ORDER_STATUSES:
+            raise ValueError(f"Недопустимый статус: {status}")
+        creation_date = record.get('creation_date')
+        creation_date = (datetime.fromisoformat(creation_date.strip()) if creation_date
+                         else datetime.now().replace(microsecond=0))
+        total_cost = record.get('total_cost')
+        try:
+            total_cost = Decimal(str(total_cost)) if total_cost not in (None, '') else None
+        except InvalidOperation:
+            raise ValueError(f"Некорректная сумма: {total_cost}")
+        plate = normalize_plate(record.get('license_plate'))
+        vin = normalize_vin(record.get('vin'))
+        if not plate and not vin:
+            raise ValueError("Автомобиль не указан (нужен госномер или VIN)")
+        return {
+            'license_plate': plate,
+            'vin': vin,
+            'creation_date': creation_date,
+            'status': status,
+            'total_cost': total_cost,
+        }
+
+    # Поиск внешних ключей: клиенты -> автомобили -> заказы -----------------------------------------
+    def _lookup(self, query_template, values):
+        """Один запрос IN (...) на пакет"""
+        values = list(values)
+        if not values:
+            return []
+        placeholders = ", ".join(["%s"] * len(values))
+        return self.db.execute_query(query_template.format(placeholders), values, fetch=True) or []
+
+    def _resolve_clients(self, rows):
+        return rows, []
+
+    def _resolve_cars(self, rows):
+        phones = {row['client_phone'] for row in rows if not row['client_id'] and row['client_phone']}
+        by_phone = {
+            client['phone']: client['client_id']
+            for client in self._lookup("SELECT client_id, phone FROM clients WHERE phone IN ({})", phones)
+        }
+        resolved, failed = [], []
+        for row in rows:
+            if not row['client_id']:
+                row['client_id'] = by_phone.get(row['client_phone'])
+            if row['client_id']:
+                resolved.append(row)
+            else:
+                failed.append((row['_line'], row, "Клиент не найден"))
+        return resolved, failed
+
+    def _resolve_orders(self, rows):
+        plates = {row['license_plate'] for row in rows if row['license_plate']}
+        vins = {row['vin'] for row in rows if row['vin'] and not row['license_plate']}
+        by_plate = {
+            car['license_plate']: car
+            for car in self._lookup(
+                "SELECT car_id, client_id, license_plate FROM cars WHERE license_plate IN ({})", plates)
+        }
+        by_vin = {
+            car['vin']: car
+            for car in self._lookup("SELECT car_id, client_id, vin FROM cars WHERE vin IN ({})", vins)
+        }
+        resolved, failed = [], []
+        for row in rows:
+            car = by_plate.get(row['license_plate']) or by_vin.get(row['vin'])
+            if car and car['client_id']:
+                row['car_id'] = car['car_id']
+                row['client_id'] = car['client_id']
+                resolved.append(row)
+            else:
+                failed.append((row['_line'], row, "Автомобиль не найден или не привязан к клиенту"))
+        return resolved, failed
+
+    # Запись ------------------------------------------------------------------------------------------
+    def _write(self, entity, rows):
+        """
+        Запись пакета: LOAD DATA LOCAL INFILE, при недоступности - пакетные INSERT
+        :return: (количество записанных строк, список отвергнутых)
+        """
+        if not rows:
+            return 0, []
+        columns = COLUMNS[entity]
+        if self.use_load_data:
+            try:
+                return self._load_data(entity, columns, rows)
+            except Error as e:
+                print(f"LOAD DATA недоступен ({e}), переход на пакетные INSERT")
+                self.use_load_data = False
+
+        query = f"INSERT INTO {entity} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+        result = self.db.insert_many(query, [tuple(row[c] for c in columns) for row in rows], len(rows))
+        return result.inserted, [(rows[i]['_line'], row, error) for i, row, error in result.failed]
+
+    def _load_data(self, entity, columns, rows):
+        """
+        Загрузка пакета через временный TSV-файл и LOAD DATA LOCAL INFILE ... IGNORE.
+        Отвергнутых строк - len(rows) минус записанные; номера строк восстанавливаются
+        по предупреждениям (см. _skipped_rows)
+        """
+        with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', delete=False,
+                                         dir=os.getenv('DB_LOCAL_INFILE_DIR')) as f:
+            for row in rows:
+                f.write('\t'.join(_tsv_value(row[c]) for c in columns) + '\n')
+            path = f.name
+        try:
+            with self.db.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    # По умолчанию сервер хранит 64 предупреждения - на пакет нужно по одному на строку
+                    cursor.execute("SET SESSION max_error_count = %s", (min(len(rows), MAX_WARNINGS),))
+                    cursor.execute(
+                        f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {entity} "
+                        "CHARACTER SET utf8mb4 FIELDS TERMINATED BY '\\t' "
+                        f"LINES TERMINATED BY '\\n' ({', '.join(columns)})",
+                        (path,)
+                    )
+                    inserted = cursor.rowcount
+                    # Строки, пропущенные сервером (дубликаты ключей), видны только как предупреждения
+                    cursor.execute("SHOW WARNINGS")
+                    warnings = cursor.fetchall()
+                    cursor.execute("SET SESSION max_error_count = DEFAULT")
+                finally:
+                    cursor.close()
+        finally:
+            os.unlink(path)
+        return inserted, self._skipped_rows(columns, rows, warnings, len(rows) - inserted)
+
+    @staticmethod
+    def _skipped_rows(columns, rows, warnings, skipped):
+        """
+        Отвергнутые LOAD DATA строки по предупреждениям: строка находится по номеру
+        ("at row N") или по значению дубликата ключа. Предупреждения о записанных
+        строках (обрезка, преобразование) печатаются и в отчет не попадают
+        :param warnings: Строки SHOW WARNINGS (уровень, код, сообщение)
+        :param skipped: Сколько строк сервер не записал
+        :return: Список (номер записи, запись, ошибка) длиной skipped
+        """
+        failed, matched, converted = [], set(), 0
+        for _, code, message in warnings:
+            if code not in SKIPPED_ROW_WARNINGS:
+                converted += 1
+                continue
+            position = None
+            at_row = _AT_ROW.search(message)
+            duplicate = _DUPLICATE_ENTRY.search(message)
+            if at_row:
+                position = int(at_row.group(1)) - 1
+            elif duplicate:
+                position = next((i for i, row in enumerate(rows) if i not in matched
+                                 and any(str(row[c]) == duplicate.group(1) for c in columns)), None)
+            if position is not None and 0 <= position < len(rows) and position not in matched:
+                matched.add(position)
+                failed.append((rows[position]['_line'], rows[position], message))
+            else:
+                failed.append((None, None, message))
+        if converted:
+            print(f"LOAD DATA: значения изменены при записи в {converted} строках (SHOW WARNINGS)")
+        failed = failed[:skipped]
+        failed.extend([(None, None, "Строка пропущена сервером без предупреждения")] * (skipped - len(failed)))
+        return failed
+
+    # Контрольные точки и отчет --------------------------------------------------------------------
+    @staticmethod
+    def _load_checkpoint(checkpoint_path, entity, path):
+        """Количество уже обработанных записей этого файла"""
+        if not checkpoint_path or not os.path.exists(checkpoint_path):
+            return 0
+        with open(checkpoint_path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('entity') != entity or checkpoint.get('source') != os.path.abspath(path):
+            return 0
+        print(f"Продолжение импорта с записи {checkpoint['position']}")
+        return checkpoint['position']
+
+    @staticmethod
+    def _save_checkpoint(checkpoint_path, entity, path, position):
+        """Атомарная запись контрольной точки после фиксации пакета"""
+        if not checkpoint_path:
+            return
+        tmp_path = checkpoint_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'entity': entity, 'source': os.path.abspath(path), 'position': position}, f)
+        os.replace(tmp_path, checkpoint_path)
+
+    @staticmethod
+    def _report_rejects(rejects, failed):
+        if not rejects:
+            return
+        for line, record, error in failed:
+            rejects.write(json.dumps({'line': line, 'record': record, 'error': error},
+                                     ensure_ascii=False, default=str) + '\n')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Импорт клиентов, автомобилей и заказов из CSV/JSONL")
+    parser.add_argument('entity', choices=list(COLUMNS))
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'jsonl'])
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--checkpoint', help="Файл контрольной точки для продолжения импорта")
+    parser.add_argument('--rejects', help="JSONL-файл для отклоненных записей")
+    parser.add_argument('--no-load-data', action='store_true', help="Не использовать LOAD DATA LOCAL INFILE")
+    args = parser.parse_args()
+
+    importer = DataImporter(use_load_data=not args.no_load_data)
+    result = importer.import_file(args.entity, args.path, args.format, args.batch_size,
+                                  args.checkpoint, args.rejects)
+    print(f"Готово: записано {result['inserted']}, отклонено {result['rejected']}, "
+          f"{result['rows_per_second']:.0f} строк/с")
@@ -1,55 +1,524 @@
 from dotenv import load_dotenv
 import mysql.connector
 from mysql.connector import Error
+from collections import namedtuple, OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+import threading
+import time
+import weakref
 import os
+from queries import sql
+from instrumentation import instrumentation, metrics
 
 # Загрузка переменных окружения
 load_dotenv()
 
-class DatabaseManager:
-    def __init__(self):
-        self.connection = None
-        self.connect()
-    
-    def connect(self):
-        """Установка соединения с базой данных"""
+# Размер порции строк при потоковом чтении
+DEFAULT_CHUNK_SIZE = int(os.getenv('DB_FETCH_CHUNK', 500))
+
+# Размер пакета при массовой вставке
+DEFAULT_BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', 1000))
+
+# Использовать серверные подготовленные выражения (cursor(prepared=True))
+PREPARED_STATEMENTS = os.getenv('DB_PREPARED_STATEMENTS', '0') == '1'
+
+# Сколько подготовленных выражений держать на одном соединении
+STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE', 64))
+
+# Итог массовой вставки: число вставленных строк и список (номер строки, строка, ошибка)
+BulkResult = namedtuple('BulkResult', ['inserted', 'failed'])
+
+
+def iter_batches(rows, batch_size):
+    """Разбиение итерируемого на пакеты: генератор пар (номер первой строки, список строк)"""
+    iterator = iter(rows)
+    start = 0
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield start, batch
+        start += len(batch)
+
+
+class PoolExhaustedError(Error):
+    """Не удалось получить соединение из пула за отведенное время"""
+
+
+class ConnectionPool:
+    """Ограниченный пул соединений с MySQL, общий для всего процесса"""
+
+    def __init__(self, max_size=None, timeout=None, health_check_interval=None, **connect_args):
+        """
+        :param max_size: Максимальное число открытых соединений
+        :param timeout: Сколько секунд ждать свободное соединение
+        :param health_check_interval: Через сколько секунд простоя соединение проверяется перед выдачей
+        :param connect_args: Параметры для mysql.connector.connect
+        """
+        self.max_size = max_size or int(os.getenv('DB_POOL_SIZE', 5))
+        self.timeout = timeout or float(os.getenv('DB_POOL_TIMEOUT', 30))
+        self.health_check_interval = (
+            health_check_interval if health_check_interval is not None
+            else float(os.getenv('DB_POOL_HEALTH_CHECK', 30))
+        )
+        self._connect_args = connect_args
+        self._idle = []  # (соединение, время возврата в пул)
+        self._size = 0
+        self._condition = threading.Condition()
+        self.stats = {'hits': 0, 'waits': 0, 'handshakes': 0, 'reconnects': 0}
+
+    def _connect(self):
+        """Открытие нового соединения (TCP + авторизация)"""
+        connection = mysql.connector.connect(**self._connect_args)
+        with self._condition:
+            self.stats['handshakes'] += 1
+        return connection
+
+    def acquire(self):
+        """
+        Получение соединения из пула
+        :return: Открытое соединение
+        :raises PoolExhaustedError: если свободное соединение не появилось за timeout секунд
+        """
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection, returned_at = self._idle.pop()
+                    self.stats['hits'] += 1
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = None
+                    break
+                if not waited:
+                    self.stats['waits'] += 1
+                    waited = True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhaustedError(
+                        msg=f"Нет свободных соединений в пуле (максимум {self.max_size})"
+                    )
+                self._condition.wait(remaining)
+
+        if connection is None:
+            try:
+                return self._connect()
+            except Exception:
+                self._forget()
+                raise
+
+        if time.monotonic() - returned_at > self.health_check_interval:
+            connection = self._ensure_alive(connection)
+        return connection
+
+    def _ensure_alive(self, connection):
+        """Проверка простаивавшего соединения и переподключение при необходимости"""
+        try:
+            if connection.is_connected():
+                return connection
+            connection.reconnect(attempts=1, delay=0)
+            with self._condition:
+                self.stats['reconnects'] += 1
+                self.stats['handshakes'] += 1
+            return connection
+        except Error:
+            self._close_quietly(connection)
+        try:
+            return self._connect()
+        except Exception:
+            self._forget()
+            raise
+
+    def release(self, connection):
+        """Возврат соединения в пул"""
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except Error:
+            self.discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def discard(self, connection):
+        """Закрытие сломанного соединения с освобождением места в пуле"""
+        self._close_quietly(connection)
+        self._forget()
+
+    def _forget(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Контекстный менеджер: соединение возвращается в пул при выходе"""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def close(self):
+        """Закрытие всех простаивающих соединений"""
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _ in idle:
+            self._close_quietly(connection)
+
+    def get_stats(self):
+        """Счетчики пула и текущая заполненность"""
+        with self._condition:
+            return dict(self.stats, size=self._size, idle=len(self._idle), max_size=self.max_size)
+
+
+class StatementCache:
+    """
+    Подготовленные выражения одного соединения: (текст запроса, строки-словари) -> курсор с prepared=True.
+    Повторный запрос с тем же текстом выполняется без разбора на сервере.
+    При переполнении закрывается курсор, к которому дольше всего не обращались (LRU),
+    что освобождает выражение на сервере. Соединением в каждый момент владеет один поток.
+    """
+
+    def __init__(self, connection_id, max_size):
+        # После переподключения выражения прежнего сеанса на сервере уже не существуют
+        self.connection_id = connection_id
+        self.max_size = max_size
+        self._cursors = OrderedDict()
+        self.stats = {'hits': 0, 'prepares': 0, 'evictions': 0}
+
+    def cursor(self, connection, query, dictionary=True):
+        key = (query, dictionary)
+        cursor = self._cursors.get(key)
+        if cursor is not None:
+            self._cursors.move_to_end(key)
+            self.stats['hits'] += 1
+            return cursor
+        cursor = connection.cursor(prepared=True, dictionary=dictionary)
+        self._cursors[key] = cursor
+        self.stats['prepares'] += 1
+        if len(self._cursors) > self.max_size:
+            _, oldest = self._cursors.popitem(last=False)
+            self.stats['evictions'] += 1
+            self._close_quietly(oldest)
+        return cursor
+
+    def evict(self, query):
+        """Удаление выражения после ошибки: следующий вызов подготовит его заново"""
+        for dictionary in (True, False):
+            cursor = self._cursors.pop((query, dictionary), None)
+            if cursor is not None:
+                self._close_quietly(cursor)
+
+    @staticmethod
+    def _close_quietly(cursor):
         try:
-            self.connection = mysql.connector.connect(
+            cursor.close()
+        except Error:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Общий для процесса пул соединений (создается при первом обращении)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            connect_args = dict(
                 host=os.getenv('DB_HOST'),
                 user=os.getenv('DB_USER'),
                 password=os.getenv('DB_PASSWORD'),
                 database=os.getenv('DB_NAME'),
                 auth_plugin='mysql_native_password'
             )
+            # LOAD DATA LOCAL INFILE разрешается только для файлов из этого каталога
+            if os.getenv('DB_LOCAL_INFILE_DIR'):
+                connect_args['allow_local_infile_in_path'] = os.getenv('DB_LOCAL_INFILE_DIR')
+            _pool = ConnectionPool(**connect_args)
+        return _pool
+
+
+class DatabaseManager:
+    def __init__(self, pool=None, prepared=None, statement_cache_size=None):
+        """
+        :param pool: Пул соединений (по умолчанию общий для процесса)
+        :param prepared: Выполнять execute_query подготовленными выражениями (по умолчанию DB_PREPARED_STATEMENTS)
+        :param statement_cache_size: Размер кэша выражений на соединение (по умолчанию DB_STATEMENT_CACHE)
+        """
+        self.pool = pool or get_pool()
+        self.prepared = PREPARED_STATEMENTS if prepared is None else prepared
+        self.statement_cache_size = statement_cache_size or STATEMENT_CACHE_SIZE
+        self._statements = weakref.WeakKeyDictionary()  # соединение -> StatementCache
+        self._statements_lock = threading.Lock()
+        self.connect()
+
+    def connect(self):
+        """Проверка доступности базы данных через пул"""
+        try:
+            with self.pool.connection():
+                pass
             print("Успешное подключение к базе данных!")
         except Error as e:
             print(f"Ошибка подключения к MySQL: {e}")
             raise
-    
-    def execute_query(self, query, params=None, fetch=False):
-        """Выполнение SQL запроса"""
+
+    @contextmanager
+    def transaction(self):
+        """
+        Соединение из пула для нескольких запросов в одной транзакции.
+        Фиксация при успешном выходе, откат при исключении.
+        В метрики транзакция попадает целиком, под именем 'transaction'.
+        """
+        started = time.perf_counter()
+        error = None
+        with self.pool.connection() as connection:
+            try:
+                yield connection
+                connection.commit()
+            except Exception as e:
+                error = e
+                self._rollback(connection)
+                raise
+            finally:
+                instrumentation.record(self, 'transaction', None, time.perf_counter() - started, 0,
+                                       error, name='transaction')
+
+    def execute_query(self, query, params=None, fetch=False, stream=False, chunk_size=None, name=None,
+                      record=None):
+        """
+        Выполнение SQL запроса
+        :param fetch: Вернуть все строки результата списком
+        :param stream: Вернуть генератор порций строк (см. iter_query)
+        :param chunk_size: Размер порции при stream=True
+        :param name: Имя запроса для метрик (см. execute_named)
+        :param record: Класс записи из records.py: строки читаются кортежами и
+                       возвращаются записями этого класса, а не словарями
+        """
+        if stream:
+            return self.iter_query(query, params, chunk_size, name, record)
+
+        connection = None
         cursor = None
+        statements = None
+        started = time.perf_counter()
+        rows = error = None
         try:
-            cursor = self.connection.cursor(dictionary=True)
+            connection = self.pool.acquire()
+            if self.prepared:
+                statements = self._statement_cache(connection)
+                cursor = statements.cursor(connection, query, dictionary=record is None)
+            else:
+                cursor = connection.cursor(dictionary=record is None)
             cursor.execute(query, params or ())
-            
+
             if fetch:
-                result = cursor.fetchall()
-                return result
-            
-            self.connection.commit()
+                rows = cursor.fetchall()
+                if record is not None:
+                    rows = record.from_rows(cursor.column_names, rows)
+                return rows
+
+            rows = max(cursor.rowcount, 0)
+            connection.commit()
             return True
-            
+
         except Error as e:
+            error = e
             print(f"Ошибка выполнения запроса: {e}")
-            self.connection.rollback()
+            if statements:
+                statements.evict(query)
+                cursor = None
+            if connection:
+                self._rollback(connection)
             return False
         finally:
-            if cursor:
+            instrumentation.record(self, query, params, time.perf_counter() - started, rows, error, name)
+            if cursor and not statements:
                 cursor.close()
-    
+            if connection:
+                self.pool.release(connection)
+
+    def execute_named(self, name, params=None, fetch=False, stream=False, chunk_size=None, record=None):
+        """Выполнение запроса из реестра queries.QUERIES по имени"""
+        if stream:
+            return self.iter_query(sql(name), params, chunk_size, name, record)
+        return self.execute_query(sql(name), params, fetch, name=name, record=record)
+
+    def _statement_cache(self, connection):
+        """Кэш подготовленных выражений соединения (новый после переподключения)"""
+        with self._statements_lock:
+            statements = self._statements.get(connection)
+            if statements is None or statements.connection_id != connection.connection_id:
+                statements = StatementCache(connection.connection_id, self.statement_cache_size)
+                self._statements[connection] = statements
+            return statements
+
+    def statement_stats(self):
+        """Суммарные счетчики кэшей подготовленных выражений: попадания, подготовки, вытеснения"""
+        totals = {'connections': 0, 'hits': 0, 'prepares': 0, 'evictions': 0}
+        with self._statements_lock:
+            caches = list(self._statements.values())
+        for statements in caches:
+            totals['connections'] += 1
+            for key, value in statements.stats.items():
+                totals[key] += value
+        return totals
+
+    def query_stats(self, top=None):
+        """Метрики запросов процесса (instrumentation.metrics), самые затратные первыми"""
+        return metrics.snapshot()['queries'][:top]
+
+    def execute_insert(self, query, params=None, name=None):
+        """
+        Вставка одной строки
+        :param name: Имя запроса для метрик
+        :return: ID новой строки (lastrowid) или None при ошибке
+        """
+        started = time.perf_counter()
+        error = None
+        try:
+            with self.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(query, params or ())
+                    return cursor.lastrowid
+                finally:
+                    cursor.close()
+        except Error as e:
+            error = e
+            print(f"Ошибка выполнения запроса: {e}")
+            return None
+        finally:
+            instrumentation.record(self, query, params, time.perf_counter() - started, 1 - (error is not None),
+                                   error, name)
+
+    def insert_many(self, query, rows, batch_size=None):
+        """
+        Массовая вставка пакетами, одна транзакция на пакет.
+        mysql.connector сворачивает executemany для INSERT ... VALUES
+        в один многострочный VALUES, поэтому пакет - один запрос к серверу.
+        Если пакет отвергнут (дубликат телефона, номера, VIN...), он откатывается
+        и повторяется построчно в одной транзакции: корректные строки вставляются,
+        ошибочные попадают в отчет, загрузка не прерывается.
+        :param query: INSERT ... VALUES (%s, ...)
+        :param rows: Итерируемое кортежей параметров
+        :param batch_size: Количество строк в пакете
+        :return: BulkResult(inserted, failed), в failed номера строк считаются от 0
+        """
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+        inserted = 0
+        failed = []
+        for start, batch in iter_batches(rows, batch_size):
+            started = time.perf_counter()
+            failed_before = len(failed)
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    try:
+                        cursor.executemany(query, batch)
+                        connection.commit()
+                        inserted += len(batch)
+                        instrumentation.record(self, query, None, time.perf_counter() - started, len(batch))
+                        continue
+                    except Error:
+                        self._rollback(connection)
+
+                    batch_inserted = 0
+                    batch_failed = []
+                    for offset, row in enumerate(batch):
+                        try:
+                            cursor.execute(query, row)
+                            batch_inserted += 1
+                        except Error as e:
+                            batch_failed.append((start + offset, row, str(e)))
+                    connection.commit()
+                    inserted += batch_inserted
+                    failed.extend(batch_failed)
+                except Error as e:
+                    print(f"Ошибка выполнения запроса: {e}")
+                    self._rollback(connection)
+                    failed.extend((start + offset, row, str(e)) for offset, row in enumerate(batch))
+                finally:
+                    cursor.close()
+            batch_failed = len(failed) - failed_before
+            instrumentation.record(self, query, None, time.perf_counter() - started, len(batch) - batch_failed,
+                                   f"Отклонено строк: {batch_failed}" if batch_failed else None)
+        return BulkResult(inserted, failed)
+
+    def iter_query(self, query, params=None, chunk_size=None, name=None, record=None):
+        """
+        Потоковое чтение результата небуферизованным (серверным) курсором.
+        Строки забираются с сервера порциями, в памяти держится одна порция.
+        Соединение возвращается в пул, когда генератор исчерпан или закрыт.
+        :param chunk_size: Количество строк в порции
+        :param name: Имя запроса для метрик
+        :param record: Класс записи из records.py вместо строк-словарей
+        :return: Генератор списков строк длиной не более chunk_size
+        """
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        connection = self.pool.acquire()
+        cursor = None
+        # В метрики идет время ожидания базы, без обработки порций потребителем
+        elapsed = 0.0
+        row_count = 0
+        error = None
+        try:
+            started = time.perf_counter()
+            cursor = connection.cursor(dictionary=record is None, buffered=False)
+            cursor.execute(query, params or ())
+            read = record.reader(cursor.column_names) if record is not None else None
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    break
+                if read is not None:
+                    rows = list(map(read, rows))
+                row_count += len(rows)
+                yield rows
+                started = time.perf_counter()
+        except Error as e:
+            error = e
+            print(f"Ошибка выполнения запроса: {e}")
+            raise
+        finally:
+            instrumentation.record(self, query, params, elapsed, row_count, error, name)
+            if connection.unread_result:
+                # Генератор закрыт досрочно: дочитывать остаток результата
+                # дороже, чем открыть новое соединение
+                self.pool.discard(connection)
+            else:
+                if cursor:
+                    cursor.close()
+                self.pool.release(connection)
+
+    @staticmethod
+    def _rollback(connection):
+        try:
+            connection.rollback()
+        except Error:
+            pass
+
+    def pool_stats(self):
+        """Статистика пула: попадания, ожидания, рукопожатия с сервером"""
+        return self.pool.get_stats()
+
     def close(self):
-        """Закрытие соединения"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-            print("Соединение с базой данных закрыто")
+        """Закрытие простаивающих соединений пула"""
+        self.pool.close()
+        print("Соединение с базой данных закрыто")
@@ -0,0 +1,83 @@
+import sys
+from analytics import build_employee_stats_query
+from crud_operations import build_order_stats_query
+from db_connector import DatabaseManager
+from pagination import build_keyset_query, encode_cursor, DEFAULT_PAGE_SIZE
+from queries import sql
+
+# Типичные параметры проверяемых запросов
+PERIOD = ('2024-01-01', '2024-01-31')
+PAGE_CURSOR = encode_cursor('next', ['2024-01-01 00:00:00', 1000])
+
+
+def _page(name, select, key_columns, cursor=None, descending=False):
+    """Запрос страницы так, как его строит fetch_keyset_page"""
+    query, params, _, _ = build_keyset_query(select, key_columns, cursor, DEFAULT_PAGE_SIZE, descending)
+    return name, query, tuple(params), DEFAULT_PAGE_SIZE + 1
+
+
+# Горячие запросы приложения с типичными параметрами: (название, запрос, параметры,
+# предел строк LIMIT или None). Тексты берутся из реестра запросов и построителей
+# запросов, поэтому проверяется именно то, что выполняет приложение.
+HOT_QUERIES = [
+    _page("Первая страница заказов", sql('orders.list'), ['o.creation_date', 'o.order_id'], descending=True),
+    _page("Следующая страница заказов", sql('orders.list'), ['o.creation_date', 'o.order_id'],
+          PAGE_CURSOR, descending=True),
+    _page("Страница клиентов", sql('clients.list'), ['client_id'], encode_cursor('next', [1000])),
+    ("Заказ", sql('orders.read'), (1,), None),
+    ("Агрегат заказа: заказ и платежи", sql('orders.aggregate_head'), (1,), None),
+    ("Агрегат заказа: работы", sql('orders.aggregate_works'), (1,), None),
+    ("Заказы клиента", sql('orders.by_client'), (1,), None),
+    ("Заказы по телефону", sql('orders.by_phone'), ('+79990000000', '+79990000000', 20), None),
+    ("История автомобиля", sql('orders.car_history'), ('А123ВС77', 'А123ВС77'), None),
+    ("Заказы за период", sql('analytics.orders_by_period'), PERIOD, None),
+    ("Статистика заказов за период", *build_order_stats_query(*PERIOD), None),
+    ("Статистика сотрудника", *build_employee_stats_query([1], *PERIOD), None),
+]
+
+# Таблицы, полный просмотр которых (данных или индекса) недопустим
+LARGE_TABLES = {'orders', 'works', 'payments', 'clients', 'cars'}
+
+
+def explain(db, query, params=()):
+    """Строки плана EXPLAIN для запроса"""
+    return db.execute_query("EXPLAIN " + query, params, fetch=True) or []
+
+
+def is_full_scan(step, row_limit=None):
+    """
+    Шаг плана читает большую таблицу целиком: type=ALL (данные) или type=index (весь индекс).
+    Просмотр индекса в порядке ORDER BY, который останавливается на LIMIT
+    (оценка rows не больше предела), допустим - так читается первая страница списка.
+    """
+    if step.get('table') not in LARGE_TABLES:
+        return False
+    if step.get('type') == 'ALL':
+        return True
+    if step.get('type') == 'index':
+        return row_limit is None or (step.get('rows') or 0) > row_limit
+    return False
+
+
+def check_query_plans(db=None, queries=HOT_QUERIES):
+    """
+    Проверка, что горячие запросы не читают большие таблицы целиком
+    :return: True, если ни один план не содержит полного просмотра orders, works, payments, clients или cars
+    """
+    db = db or DatabaseManager()
+    ok = True
+    for name, query, params, row_limit in queries:
+        plan = explain(db, query, params)
+        full_scans = [step for step in plan if is_full_scan(step, row_limit)]
+        for step in plan:
+            print(f"{name}: table={step.get('table')} type={step.get('type')} "
+                  f"key={step.get('key')} rows={step.get('rows')}")
+        if full_scans:
+            ok = False
+            tables = ', '.join(f"{step['table']} ({step['type']})" for step in full_scans)
+            print(f"ОШИБКА: {name} - полный просмотр таблицы ({tables})")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_query_plans() else 1)
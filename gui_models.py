@@ -0,0 +1,101 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+
+
+class LazyTableModel(QAbstractTableModel):
+    """
+    Табличная модель с догрузкой строк порциями.
+    QTableView рисует только видимые строки и сам запрашивает следующую
+    страницу (canFetchMore/fetchMore), когда прокрутка доходит до конца.
+    С runner страницы читаются в фоновом потоке, и UI не ждет MySQL.
+    """
+    load_failed = pyqtSignal(str)
+
+    def __init__(self, headers, fetch_page, row_values, parent=None, runner=None, channel='table'):
+        """
+        :param headers: Заголовки столбцов
+        :param fetch_page: Функция cursor -> Page (keyset-пагинация из БД)
+        :param row_values: Функция строка БД -> кортеж значений столбцов;
+                           первый столбец - идентификатор записи. Вызывается при
+                           первой отрисовке строки: строки хранятся как получены
+                           из БД (записи records.py), форматируются только показанные
+        :param runner: QueryRunner для фоновой загрузки (None - загрузка в UI-потоке)
+        :param channel: Канал QueryRunner; новая модель в том же канале отменяет загрузку старой
+        """
+        super().__init__(parent)
+        self._headers = headers
+        self._fetch_page = fetch_page
+        self._row_values = row_values
+        self._runner = runner
+        self._channel = channel
+        self._rows = []
+        self._display = {}  # номер строки -> значения столбцов для вывода
+        self._cursor = None
+        self._exhausted = False
+        self._loading = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        # Строка форматируется один раз, при первой отрисовке любой ее ячейки
+        values = self._display.get(index.row())
+        if values is None:
+            values = self._display[index.row()] = tuple(
+                "" if value is None else str(value) for value in self._row_values(self._rows[index.row()])
+            )
+        return values[index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._loading:
+            return
+        if self._runner is None:
+            self._append_page(self._fetch_page(self._cursor))
+            return
+        self._loading = True
+        self._runner.submit(
+            self._channel, self._fetch_page, self._cursor,
+            on_result=self._append_page, on_error=self._fetch_failed
+        )
+
+    def _append_page(self, page):
+        self._loading = False
+        self._cursor = page.next_cursor
+        self._exhausted = page.next_cursor is None
+        if not page.rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page.rows) - 1)
+        self._rows.extend(page.rows)
+        self.endInsertRows()
+
+    def _fetch_failed(self, message):
+        self._loading = False
+        self._exhausted = True
+        self.load_failed.emit(message)
+
+    def row_id(self, row):
+        """Идентификатор записи в строке таблицы"""
+        return self._row_values(self._rows[row])[0]
+
+    def reload(self):
+        """Сброс загруженных строк и чтение с первой страницы"""
+        self.beginResetModel()
+        self._rows = []
+        self._display = {}
+        self._cursor = None
+        self._exhausted = False
+        self._loading = False
+        self.endResetModel()
@@ -0,0 +1,103 @@
+import itertools
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Сигналы фоновой задачи (доставляются в UI-поток через очередь событий)"""
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class QueryWorker(QRunnable):
+    """Выполнение одного обращения к БД в потоке из QThreadPool"""
+
+    def __init__(self, ticket, func, args):
+        super().__init__()
+        self.ticket = ticket
+        self.func = func
+        self.args = args
+        self.signals = WorkerSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.ticket, str(e))
+            return
+        self.signals.finished.emit(self.ticket, result)
+
+
+class QueryRunner(QObject):
+    """
+    Запуск запросов вне UI-потока.
+    Запросы группируются по каналам (например, 'table' для основной таблицы):
+    новый запрос в канале делает предыдущий устаревшим, и его результат
+    отбрасывается, а еще не начатый - снимается из очереди пула.
+    """
+    busy_changed = pyqtSignal(bool)
+    error = pyqtSignal(str)
+
+    def __init__(self, parent=None, max_threads=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_threads:
+            # Больше потоков, чем соединений в пуле БД, только добавит ожидание
+            self.pool.setMaxThreadCount(max_threads)
+        self._tickets = itertools.count(1)
+        self._latest = {}    # канал -> номер актуального запроса
+        self._active = {}    # номер запроса -> задача (держим ссылку до завершения)
+        self._finished = []  # завершенные задачи, освобождаются при следующем запуске
+        self._running = 0
+
+    def submit(self, channel, func, *args, on_result=None, on_error=None):
+        """
+        Постановка запроса в очередь
+        :param channel: Имя канала; предыдущий запрос канала становится устаревшим
+        :param func: Функция, обращающаяся к БД
+        :param on_result: Обработчик результата (вызывается в UI-потоке)
+        :param on_error: Обработчик текста ошибки (по умолчанию - сигнал error)
+        :return: Номер запроса
+        """
+        self.cancel(channel)
+        self._finished.clear()
+        ticket = next(self._tickets)
+        worker = QueryWorker(ticket, func, args)
+        worker.setAutoDelete(False)
+        worker.signals.finished.connect(
+            lambda t, result: self._finish(channel, t, on_result, result))
+        worker.signals.failed.connect(
+            lambda t, message: self._finish(channel, t, on_error or self.error.emit, message))
+        self._latest[channel] = ticket
+        self._active[ticket] = worker
+        self._set_running(self._running + 1)
+        self.pool.start(worker)
+        return ticket
+
+    def cancel(self, channel):
+        """Отмена запроса канала: из очереди снимается, результат выполняемого отбрасывается"""
+        ticket = self._latest.pop(channel, None)
+        worker = self._active.get(ticket)
+        if worker is not None and self.pool.tryTake(worker):
+            del self._active[ticket]
+            self._set_running(self._running - 1)
+
+    def cancel_all(self):
+        for channel in list(self._latest):
+            self.cancel(channel)
+
+    def _finish(self, channel, ticket, handler, payload):
+        worker = self._active.pop(ticket, None)
+        if worker is not None:
+            self._finished.append(worker)
+        self._set_running(self._running - 1)
+        if self._latest.get(channel) != ticket:
+            return  # Устаревший результат: пользователь уже переключился
+        del self._latest[channel]
+        if handler:
+            handler(payload)
+
+    def _set_running(self, count):
+        was_busy = self._running > 0
+        self._running = count
+        if was_busy != (count > 0):
+            self.busy_changed.emit(count > 0)
@@ -0,0 +1,354 @@
+import inspect
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import namedtuple, deque
+from datetime import datetime
+from queries import query_label
+
+# Порог медленного запроса, мс
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))
+
+# Файл журнала медленных запросов (JSONL); без него записи хранятся только в памяти
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG')
+
+# Как часто снимать EXPLAIN для одного и того же медленного запроса, секунд
+SLOW_QUERY_EXPLAIN_INTERVAL = float(os.getenv('SLOW_QUERY_EXPLAIN_INTERVAL', 300))
+
+# Сколько медленных запросов может ждать EXPLAIN; при переполнении план не снимается
+SLOW_QUERY_EXPLAIN_QUEUE = int(os.getenv('SLOW_QUERY_EXPLAIN_QUEUE', 16))
+
+# Оценивать объем прочитанных данных (обход всех значений результата)
+MEASURE_BYTES = os.getenv('DB_METRICS_BYTES', '0') == '1'
+
+# Определять вызывающий метод для каждого запроса (обход стека); по умолчанию -
+# только для медленных запросов и ошибок
+MEASURE_CALLERS = os.getenv('DB_METRICS_CALLERS', '0') == '1'
+
+# Границы корзин гистограммы времени выполнения, секунд
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Модули слоя доступа к данным: вызывающим считается первый кадр стека вне их
+_DB_LAYER_MODULES = {'db_connector', 'async_db', 'instrumentation', 'pagination',
+                     'queries', 'sqlite_standin', 'contextlib'}
+
+# Одно выполнение запроса:
+# name - имя из реестра или начало текста, rows/bytes - прочитано строк и ~байт,
+# caller - вызвавший метод (clientCRUD.add_client) или None, если не определялся
+# (см. event_caller), error - текст ошибки или None, source - менеджер БД, выполнивший запрос
+QueryEvent = namedtuple('QueryEvent', ['name', 'query', 'params', 'seconds', 'rows', 'bytes',
+                                       'caller', 'error', 'source'])
+
+
+def find_caller():
+    """Метод приложения, из которого пришел запрос: 'Класс.метод' или имя функции"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.split('.')[0] not in _DB_LAYER_MODULES and not module.startswith('asyncio'):
+            owner = frame.f_locals.get('self')
+            function = frame.f_code.co_name
+            return f"{type(owner).__name__}.{function}" if owner is not None else f"{module}.{function}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+def event_caller(event):
+    """
+    Вызывающий метод запроса; если он не определен при записи, ищется по стеку.
+    Вызывать только из обработчика - пока стек запроса еще не свернут
+    """
+    return event.caller or find_caller()
+
+
+def estimate_bytes(rows):
+    """Примерный объем строк результата: длина строковых значений, 8 байт на прочие"""
+    if not MEASURE_BYTES or not rows:
+        return 0
+    total = 0
+    for row in rows:
+        for value in (row.values() if isinstance(row, dict) else row):
+            total += len(value) if isinstance(value, (str, bytes, bytearray)) else 8
+    return total
+
+
+class Instrumentation:
+    """
+    Точка подключения обработчиков к выполнению запросов.
+    Менеджеры БД сообщают о каждом запросе через record(); обработчики
+    (метрики, журнал медленных запросов, свои) получают QueryEvent.
+    Ошибка обработчика печатается и не влияет на запрос.
+    """
+
+    def __init__(self):
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """:param hook: Функция QueryEvent -> None"""
+        with self._lock:
+            self._hooks = self._hooks + [hook]
+        return hook
+
+    def remove_hook(self, hook):
+        with self._lock:
+            self._hooks = [registered for registered in self._hooks if registered is not hook]
+
+    def record(self, source, query, params, seconds, rows=None, error=None, name=None, caller=None):
+        """
+        Сообщение о выполненном запросе
+        :param rows: Прочитанные строки (список) или их количество
+        :param error: Исключение или текст ошибки
+        """
+        hooks = self._hooks
+        if not hooks:
+            return
+        if isinstance(rows, int):
+            row_count, size = rows, 0
+        else:
+            row_count, size = len(rows or ()), estimate_bytes(rows)
+        if caller is None and MEASURE_CALLERS:
+            caller = find_caller()
+        event = QueryEvent(name or query_label(query), query, params, seconds, row_count, size,
+                           caller, str(error) if error is not None else None, source)
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Ошибка обработчика метрик: {e}")
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class QueryMetrics:
+    """
+    Накопленные метрики: по запросам (вызовы, ошибки, время, строки, байты, гистограмма)
+    и по вызывающим. Вызывающие учитываются для медленных запросов и ошибок,
+    а при DB_METRICS_CALLERS=1 - для всех запросов
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, caller_threshold_ms=SLOW_QUERY_MS):
+        self.buckets = buckets
+        self.caller_threshold = caller_threshold_ms / 1000
+        self._lock = threading.Lock()
+        self._queries = {}  # имя -> словарь счетчиков
+        self._callers = {}  # вызывающий -> [вызовы, суммарное время]
+        self.started = time.time()
+
+    def __call__(self, event):
+        caller = None
+        if event.caller is not None or event.error is not None or event.seconds >= self.caller_threshold:
+            caller = event_caller(event)
+        with self._lock:
+            stats = self._queries.get(event.name)
+            if stats is None:
+                stats = self._queries[event.name] = {
+                    'calls': 0, 'errors': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                    'rows': 0, 'bytes': 0, 'buckets': [0] * len(self.buckets)
+                }
+            stats['calls'] += 1
+            stats['errors'] += event.error is not None
+            stats['seconds'] += event.seconds
+            stats['max_seconds'] = max(stats['max_seconds'], event.seconds)
+            stats['rows'] += event.rows
+            stats['bytes'] += event.bytes
+            for position, bound in enumerate(self.buckets):
+                if event.seconds <= bound:
+                    stats['buckets'][position] += 1
+                    break
+            if caller is not None:
+                totals = self._callers.setdefault(caller, [0, 0.0])
+                totals[0] += 1
+                totals[1] += event.seconds
+
+    def snapshot(self):
+        """
+        Копия метрик: самые затратные по суммарному времени запросы и вызывающие - первыми
+        :return: Словарь queries (список), callers (список), uptime_seconds
+        """
+        with self._lock:
+            queries = [dict(stats, query=name, buckets=list(stats['buckets']))
+                       for name, stats in self._queries.items()]
+            callers = [{'caller': caller, 'calls': calls, 'seconds': seconds}
+                       for caller, (calls, seconds) in self._callers.items()]
+        queries.sort(key=lambda stats: stats['seconds'], reverse=True)
+        callers.sort(key=lambda stats: stats['seconds'], reverse=True)
+        for stats in queries:
+            stats['avg_ms'] = round(stats['seconds'] * 1000 / stats['calls'], 3)
+        return {'queries': queries, 'callers': callers, 'uptime_seconds': time.time() - self.started}
+
+    def reset(self):
+        with self._lock:
+            self._queries.clear()
+            self._callers.clear()
+            self.started = time.time()
+
+    def prometheus_text(self, slow_log=None):
+        """Метрики в текстовом формате Prometheus"""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP autoservice_db_query_seconds Время выполнения запросов к БД",
+            "# TYPE autoservice_db_query_seconds histogram",
+        ]
+        for stats in snapshot['queries']:
+            label = f'query="{_escape_label(stats["query"])}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, stats['buckets']):
+                cumulative += count
+                lines.append(f'autoservice_db_query_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f'autoservice_db_query_seconds_bucket{{{label},le="+Inf"}} {stats["calls"]}')
+            lines.append(f'autoservice_db_query_seconds_sum{{{label}}} {stats["seconds"]:.6f}')
+            lines.append(f'autoservice_db_query_seconds_count{{{label}}} {stats["calls"]}')
+
+        for metric, key, help_text in (
+                ('autoservice_db_query_errors_total', 'errors', 'Запросы, завершившиеся ошибкой'),
+                ('autoservice_db_query_rows_total', 'rows', 'Прочитано строк'),
+                ('autoservice_db_query_bytes_total', 'bytes', 'Прочитано данных, байт (оценка)')):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for stats in snapshot['queries']:
+                lines.append(f'{metric}{{query="{_escape_label(stats["query"])}"}} {stats[key]}')
+
+        lines.append("# HELP autoservice_db_caller_seconds_total "
+                     "Время медленных и ошибочных запросов по вызывающим методам")
+        lines.append("# TYPE autoservice_db_caller_seconds_total counter")
+        for stats in snapshot['callers']:
+            lines.append(f'autoservice_db_caller_seconds_total{{caller="{_escape_label(stats["caller"])}"}} '
+                         f'{stats["seconds"]:.6f}')
+
+        if slow_log is not None:
+            lines.append("# HELP autoservice_db_slow_queries_total Запросы дольше порога журнала")
+            lines.append("# TYPE autoservice_db_slow_queries_total counter")
+            lines.append(f"autoservice_db_slow_queries_total {slow_log.total}")
+        return "\n".join(lines) + "\n"
+
+
+class SlowQueryLog:
+    """
+    Журнал запросов дольше порога: последние записи в памяти и, если задан файл, JSONL.
+    Для медленных SELECT снимается план EXPLAIN - не чаще раза в explain_interval
+    секунд на запрос, чтобы журнал сам не нагружал базу. EXPLAIN выполняет фоновый
+    поток: запрос, вызвавший запись, не ждет ни плана, ни второго соединения из пула.
+    Запись попадает в файл, когда план снят (или сразу, если план не нужен).
+    """
+
+    def __init__(self, threshold_ms=SLOW_QUERY_MS, path=SLOW_QUERY_LOG,
+                 explain_interval=SLOW_QUERY_EXPLAIN_INTERVAL, max_entries=100,
+                 explain_queue=SLOW_QUERY_EXPLAIN_QUEUE):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self.explain_interval = explain_interval
+        self.entries = deque(maxlen=max_entries)
+        self.total = 0
+        self._explained = {}  # имя запроса -> время последнего EXPLAIN
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._tasks = queue.Queue(maxsize=explain_queue)  # (запись журнала, QueryEvent)
+        self._worker = None
+
+    def __call__(self, event):
+        if event.seconds < self.threshold or getattr(self._local, 'explaining', False):
+            return
+        entry = {
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'query': event.name,
+            'caller': event_caller(event),
+            'ms': round(event.seconds * 1000, 1),
+            'rows': event.rows,
+            'error': event.error,
+            'sql': query_label(event.query, 2000),
+            'plan': None,
+        }
+        with self._lock:
+            self.total += 1
+            self.entries.append(entry)
+        if not (self._needs_plan(event) and self._submit(entry, event)):
+            self._write(entry)
+
+    def _needs_plan(self, event):
+        """Нужен ли план: только SELECT синхронных менеджеров и не чаще explain_interval на запрос"""
+        execute = getattr(event.source, 'execute_query', None)
+        if (execute is None or event.error is not None
+                or not event.query.lstrip().upper().startswith(('SELECT', 'WITH'))
+                or inspect.iscoroutinefunction(execute)):
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if now - self._explained.get(event.name, -self.explain_interval) < self.explain_interval:
+                return False
+            self._explained[event.name] = now
+        return True
+
+    def _submit(self, entry, event):
+        """Передача EXPLAIN фоновому потоку; False - очередь заполнена"""
+        try:
+            self._tasks.put_nowait((entry, event))
+        except queue.Full:
+            with self._lock:
+                self._explained.pop(event.name, None)
+            return False
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name='slow-query-explain', daemon=True)
+                self._worker.start()
+        return True
+
+    def _run(self):
+        # Запросы потока EXPLAIN сами не попадают в журнал
+        self._local.explaining = True
+        while True:
+            entry, event = self._tasks.get()
+            try:
+                entry['plan'] = self._explain(event)
+            except Exception as e:
+                print(f"Ошибка EXPLAIN медленного запроса {event.name}: {e}")
+            finally:
+                self._write(entry)
+                self._tasks.task_done()
+
+    @staticmethod
+    def _explain(event):
+        plan = event.source.execute_query("EXPLAIN " + event.query, event.params, fetch=True, name='explain')
+        return [{key: step.get(key) for key in ('table', 'type', 'key', 'rows', 'Extra')}
+                for step in plan or []]
+
+    def _write(self, entry):
+        if not self.path:
+            return
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as log:
+                log.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def wait_explained(self):
+        """Дождаться планов уже принятых медленных запросов"""
+        self._tasks.join()
+
+    def recent(self, limit=20):
+        """Последние медленные запросы, новые первыми"""
+        with self._lock:
+            return list(self.entries)[::-1][:limit]
+
+
+# Общие для процесса точка подключения, метрики и журнал медленных запросов
+instrumentation = Instrumentation()
+metrics = instrumentation.add_hook(QueryMetrics())
+slow_query_log = instrumentation.add_hook(SlowQueryLog())
+
+
+def metrics_json(slow_limit=20):
+    """Метрики и последние медленные запросы одним JSON-документом"""
+    data = metrics.snapshot()
+    data['slow_queries'] = slow_query_log.recent(slow_limit)
+    data['slow_queries_total'] = slow_query_log.total
+    data['slow_query_threshold_ms'] = slow_query_log.threshold * 1000
+    return json.dumps(data, ensure_ascii=False, indent=2, default=str)
+
+
+def metrics_text():
+    """Метрики в формате Prometheus"""
+    return metrics.prometheus_text(slow_query_log)
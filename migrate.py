@@ -0,0 +1,105 @@
+import argparse
+import os
+import re
+import sys
+from mysql.connector import Error
+from db_connector import DatabaseManager
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# Файлы миграций: 0001_описание.sql, применяются по возрастанию номера
+MIGRATION_FILE = re.compile(r'^(\d+)_.+\.sql$')
+
+
+class MigrationRunner:
+    """
+    Версионные миграции схемы поверх Скрипт.sql.
+    Примененные версии хранятся в таблице schema_migrations.
+    """
+
+    def __init__(self, db=None, migrations_dir=MIGRATIONS_DIR):
+        self.db = db or DatabaseManager()
+        self.migrations_dir = migrations_dir
+
+    def _ensure_table(self):
+        self.db.execute_query("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version VARCHAR(255) PRIMARY KEY,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """)
+
+    def available(self):
+        """Список (версия, путь) всех файлов миграций по порядку"""
+        migrations = []
+        for name in os.listdir(self.migrations_dir):
+            if MIGRATION_FILE.match(name):
+                migrations.append((name[:-len('.sql')], os.path.join(self.migrations_dir, name)))
+        return sorted(migrations, key=lambda migration: int(MIGRATION_FILE.match(os.path.basename(migration[1])).group(1)))
+
+    def applied(self):
+        self._ensure_table()
+        rows = self.db.execute_query("SELECT version FROM schema_migrations", fetch=True) or []
+        return {row['version'] for row in rows}
+
+    def pending(self):
+        applied = self.applied()
+        return [(version, path) for version, path in self.available() if version not in applied]
+
+    @staticmethod
+    def _statements(path):
+        """Разбор файла на отдельные операторы (без процедур и триггеров)"""
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        text = re.sub(r'^\s*(--|#).*$', '', text, flags=re.MULTILINE)
+        return [statement.strip() for statement in text.split(';') if statement.strip()]
+
+    def migrate(self):
+        """
+        Применение всех непримененных миграций по порядку.
+        DDL в MySQL не транзакционен, поэтому версия записывается
+        только после успешного выполнения всех операторов файла.
+        :return: Список примененных версий
+        """
+        done = []
+        for version, path in self.pending():
+            print(f"Применение миграции {version}...")
+            with self.db.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    for statement in self._statements(path):
+                        cursor.execute(statement)
+                    cursor.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+                finally:
+                    cursor.close()
+            done.append(version)
+        return done
+
+    def status(self):
+        applied = self.applied()
+        return [(version, version in applied) for version, _ in self.available()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Миграции схемы автосервиса")
+    parser.add_argument('--status', action='store_true', help="Показать состояние миграций")
+    parser.add_argument('--check', action='store_true',
+                        help="Проверить планы горячих запросов (EXPLAIN) после миграции")
+    args = parser.parse_args()
+
+    runner = MigrationRunner()
+    if args.status:
+        for version, is_applied in runner.status():
+            print(f"{'[x]' if is_applied else '[ ]'} {version}")
+        sys.exit(0)
+
+    try:
+        applied = runner.migrate()
+    except Error as e:
+        print(f"Ошибка миграции: {e}")
+        sys.exit(1)
+    print(f"Применено миграций: {len(applied)}" if applied else "Схема в актуальном состоянии")
+
+    if args.check:
+        from explain_check import check_query_plans
+        sys.exit(0 if check_query_plans(runner.db) else 1)
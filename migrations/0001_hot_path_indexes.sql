@@ -0,0 +1,19 @@
+-- Индексы для горячих запросов.
+-- Неявные индексы внешних ключей на orders.client_id, works.employee_id,
+-- works.order_id и payments.order_id MySQL удаляет сам: их заменяют
+-- составные индексы ниже с тем же первым столбцом.
+
+-- Список заказов (ORDER BY creation_date DESC с keyset-пагинацией) и отчет за период
+CREATE INDEX idx_orders_creation_date_id ON orders (creation_date, order_id);
+
+-- Заказы клиента, отсортированные по дате
+CREATE INDEX idx_orders_client_date ON orders (client_id, creation_date);
+
+-- Статистика сотрудника: группировка работ по услугам
+CREATE INDEX idx_works_employee_service ON works (employee_id, service_id);
+
+-- Работы заказа
+CREATE INDEX idx_works_order ON works (order_id);
+
+-- Платежи заказа с фильтром по статусу
+CREATE INDEX idx_payments_order_status ON payments (order_id, status);
@@ -0,0 +1,51 @@
+-- Дневные агрегаты для аналитики: запросы за период читают по строке
+-- на день (или день и статус/сотрудника) вместо всех заказов и работ.
+-- Поддерживаются rollups.py: пересчет затронутых дней при изменении заказов
+-- и периодический пересчет последних дней.
+
+CREATE TABLE daily_order_stats (
+    stat_date DATE NOT NULL,
+    status ENUM('new','in_progress','completed','cancelled') NOT NULL,
+    order_count INT NOT NULL,
+    total_cost DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (stat_date, status)
+);
+
+CREATE TABLE daily_revenue (
+    stat_date DATE PRIMARY KEY,
+    payment_count INT NOT NULL,
+    paid_amount DECIMAL(14,2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE daily_employee_stats (
+    stat_date DATE NOT NULL,
+    employee_id INT NOT NULL,
+    work_count INT NOT NULL,
+    income DECIMAL(14,2) NOT NULL DEFAULT 0,
+    PRIMARY KEY (stat_date, employee_id),
+    INDEX idx_daily_employee_stats_employee (employee_id, stat_date)
+);
+
+-- Пересчет дня по работам и платежам без полного просмотра таблиц
+CREATE INDEX idx_works_start_date ON works (start_date);
+CREATE INDEX idx_payments_date ON payments (date);
+
+-- Начальное заполнение
+INSERT INTO daily_order_stats (stat_date, status, order_count, total_cost)
+SELECT DATE(creation_date), status, COUNT(*), COALESCE(SUM(total_cost), 0)
+FROM orders
+WHERE status IS NOT NULL
+GROUP BY DATE(creation_date), status;
+
+INSERT INTO daily_revenue (stat_date, payment_count, paid_amount)
+SELECT DATE(date), COUNT(*), SUM(amount)
+FROM payments
+WHERE status = 'paid'
+GROUP BY DATE(date);
+
+INSERT INTO daily_employee_stats (stat_date, employee_id, work_count, income)
+SELECT DATE(w.start_date), w.employee_id, COUNT(*), SUM(s.price)
+FROM works w
+JOIN services s ON w.service_id = s.service_id
+WHERE w.start_date IS NOT NULL AND w.employee_id IS NOT NULL
+GROUP BY DATE(w.start_date), w.employee_id;
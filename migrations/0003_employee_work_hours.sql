@@ -0,0 +1,15 @@
+-- Часы работы сотрудника в дневных агрегатах: основа для загрузки сотрудников
+-- (часы завершенных работ / рабочее время периода)
+
+ALTER TABLE daily_employee_stats
+    ADD COLUMN work_hours DECIMAL(12,2) NOT NULL DEFAULT 0;
+
+DELETE FROM daily_employee_stats;
+
+INSERT INTO daily_employee_stats (stat_date, employee_id, work_count, income, work_hours)
+SELECT DATE(w.start_date), w.employee_id, COUNT(*), SUM(s.price),
+       COALESCE(SUM(TIMESTAMPDIFF(SECOND, w.start_date, w.end_date)) / 3600, 0)
+FROM works w
+JOIN services s ON w.service_id = s.service_id
+WHERE w.start_date IS NOT NULL AND w.employee_id IS NOT NULL
+GROUP BY DATE(w.start_date), w.employee_id;
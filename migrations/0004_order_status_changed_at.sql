@@ -0,0 +1,8 @@
+-- Время изменения статуса заказа: запись статуса применяется, только если она
+-- не старше уже записанной (запрос orders.update_status_at). Обязательна: заказы
+-- создаются с status_changed_at, и статус всегда пишется условно - поэтому статус
+-- из очереди или журнала (status_queue.py) не перезаписывает более новое изменение,
+-- сделанное напрямую (HTTP API, другой процесс).
+
+ALTER TABLE orders
+    ADD COLUMN status_changed_at DATETIME(6) NULL;
@@ -0,0 +1,54 @@
+import re
+
+# Латинские буквы, совпадающие по начертанию с допустимыми в госномерах кириллическими
+PLATE_LOOKALIKES = str.maketrans('ABEKMHOPCTYX', 'АВЕКМНОРСТУХ')
+
+VIN_PATTERN = re.compile(r'^[A-HJ-NPR-Z0-9]{17}$')
+
+
+def normalize_phone(phone):
+    """
+    Приведение телефона к виду +7XXXXXXXXXX (8..., 7..., без кода страны)
+    :return: Нормализованный номер или None, если формат не распознан
+    """
+    if not phone:
+        return None
+    text = str(phone).strip()
+    digits = re.sub(r'\D', '', text)
+    if len(digits) == 10:
+        return '+7' + digits
+    if len(digits) == 11 and digits[0] in '78':
+        return '+7' + digits[1:]
+    if text.startswith('+') and 11 <= len(digits) <= 15:
+        return '+' + digits
+    return None
+
+
+def phone_digits(phone):
+    """Только цифры номера без кода страны - для поиска по фрагменту"""
+    digits = re.sub(r'\D', '', str(phone or ''))
+    if len(digits) == 11 and digits[0] in '78':
+        digits = digits[1:]
+    return digits
+
+
+def normalize_plate(plate):
+    """
+    Госномер в верхнем регистре, без пробелов и дефисов,
+    латинские буквы-двойники заменены кириллическими (A123BC777 -> А123ВС777)
+    """
+    if not plate:
+        return None
+    text = re.sub(r'[\s-]', '', str(plate)).upper()
+    return text.translate(PLATE_LOOKALIKES) or None
+
+
+def normalize_vin(vin):
+    """
+    VIN в верхнем регистре
+    :return: VIN или None, если это не 17 допустимых символов (без I, O, Q)
+    """
+    if not vin:
+        return None
+    text = re.sub(r'\s', '', str(vin)).upper()
+    return text if VIN_PATTERN.match(text) else None
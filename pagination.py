@@ -0,0 +1,116 @@
+import base64
+import json
+from collections import namedtuple
+
+# Страница результата: строки и курсоры соседних страниц (None, если страницы нет)
+Page = namedtuple('Page', ['rows', 'next_cursor', 'prev_cursor'])
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def encode_cursor(direction, key):
+    """
+    Упаковка позиции в непрозрачную строку
+    :param direction: 'next' или 'prev'
+    :param key: Значения ключа сортировки граничной строки
+    """
+    payload = json.dumps([direction, list(key)], default=str)
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """
+    Распаковка курсора страницы
+    :return: (направление, значения ключа)
+    :raises ValueError: если курсор поврежден
+    """
+    try:
+        direction, key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Некорректный курсор страницы") from e
+    if direction not in ('next', 'prev'):
+        raise ValueError("Некорректный курсор страницы")
+    return direction, key
+
+
+def _seek_condition(key_columns, descending):
+    """
+    Условие "строго после ключа" в раскрытом виде:
+    a < x OR (a = x AND b < y) - в отличие от (a, b) < (x, y)
+    MySQL строит по нему диапазонный поиск по составному индексу
+    """
+    op = '<' if descending else '>'
+    alternatives = []
+    params_order = []
+    for i, column in enumerate(key_columns):
+        parts = [f"{prev} = %s" for prev in key_columns[:i]]
+        parts.append(f"{column} {op} %s")
+        alternatives.append("(" + " AND ".join(parts) + ")")
+        params_order.extend(range(i + 1))
+    return "(" + " OR ".join(alternatives) + ")", params_order
+
+
+def build_keyset_query(select, key_columns, cursor=None, limit=DEFAULT_PAGE_SIZE,
+                       descending=False, where=None, params=()):
+    """
+    Запрос страницы для keyset-пагинации (см. fetch_keyset_page)
+    :return: (запрос, параметры, значения ключа из курсора, признак движения назад)
+    """
+    direction, after = decode_cursor(cursor) if cursor else ('next', None)
+    backwards = direction == 'prev'
+    # Назад идем в обратном порядке от первой строки текущей страницы
+    desc = descending != backwards
+
+    conditions = [where] if where else []
+    args = list(params)
+    if after is not None:
+        condition, params_order = _seek_condition(key_columns, desc)
+        conditions.append(condition)
+        args.extend(after[i] for i in params_order)
+
+    query = select
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    order = " DESC" if desc else " ASC"
+    query += " ORDER BY " + ", ".join(column + order for column in key_columns)
+    query += " LIMIT %s"
+    args.append(limit + 1)
+    return query, args, after, backwards
+
+
+def make_page(rows, row_key, limit, after, backwards):
+    """Страница из limit + 1 прочитанных строк: лишняя строка означает, что дальше есть еще"""
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+        has_next, has_prev = after is not None, has_more
+    else:
+        has_next, has_prev = has_more, after is not None
+
+    next_cursor = encode_cursor('next', row_key(rows[-1])) if rows and has_next else None
+    prev_cursor = encode_cursor('prev', row_key(rows[0])) if rows and has_prev else None
+    return Page(rows, next_cursor, prev_cursor)
+
+
+def fetch_keyset_page(db, select, key_columns, row_key, cursor=None,
+                      limit=DEFAULT_PAGE_SIZE, descending=False, where=None, params=(), record=None):
+    """
+    Keyset (seek) пагинация без OFFSET: сервер читает только строки страницы
+    :param db: DatabaseManager
+    :param select: SELECT ... FROM ... JOIN ... без WHERE/ORDER BY/LIMIT
+    :param key_columns: Уникальный ключ сортировки, например ['o.creation_date', 'o.order_id']
+    :param row_key: Функция, возвращающая значения ключа из строки результата
+    :param cursor: Курсор из предыдущей страницы (None - первая страница)
+    :param limit: Размер страницы
+    :param descending: Основной порядок сортировки - по убыванию
+    :param where: Дополнительное условие фильтрации
+    :param params: Параметры дополнительного условия
+    :param record: Класс записи из records.py для строк страницы (None - словари)
+    :return: Page
+    """
+    query, args, after, backwards = build_keyset_query(
+        select, key_columns, cursor, limit, descending, where, params
+    )
+    rows = db.execute_query(query, args, fetch=True, record=record) or []
+    return make_page(rows, row_key, limit, after, backwards)
@@ -0,0 +1,182 @@
+import re
+
+# Именованные запросы приложения: текст каждого запроса определяется один раз.
+# Одинаковый текст - одно подготовленное выражение в кэше соединения (DB_PREPARED_STATEMENTS)
+QUERIES = {
+    # Клиенты
+    'clients.insert': "INSERT INTO clients (name, phone, email, address) VALUES (%s, %s, %s, %s)",
+    'clients.delete': "DELETE FROM clients WHERE client_id = %s",
+    'clients.exists': "SELECT 1 FROM clients WHERE client_id = %s",
+    'clients.list': "SELECT * FROM clients",
+
+    # Автомобили
+    'cars.insert': """
+        INSERT INTO cars (client_id, brand, model, license_plate, year, vin)
+        VALUES (%s, %s, %s, %s, %s, %s)
+    """,
+    'cars.by_client': "SELECT car_id, brand, model, license_plate FROM cars WHERE client_id = %s",
+    'cars.owned_by_client': "SELECT 1 FROM cars WHERE car_id = %s AND client_id = %s",
+    'cars.owners': "SELECT car_id, client_id FROM cars WHERE car_id IN ({placeholders})",
+
+    # Заказы
+    'orders.insert': "INSERT INTO orders (client_id, car_id, status, status_changed_at) VALUES (%s, %s, %s, %s)",
+    # (статус, время изменения, order_id, время изменения): более старое изменение не применяется
+    'orders.update_status_at': """
+        UPDATE orders SET status = %s, status_changed_at = %s
+        WHERE order_id = %s AND (status_changed_at IS NULL OR status_changed_at <= %s)
+    """,
+    'orders.exists': "SELECT 1 FROM orders WHERE order_id = %s",
+    'orders.days': "SELECT DISTINCT DATE(creation_date) as day FROM orders WHERE order_id IN ({placeholders})",
+    'orders.delete': "DELETE FROM orders WHERE order_id = %s",
+    'orders.list': """
+        SELECT o.order_id, o.creation_date, o.status,
+               c.name as client_name, car.brand, car.model
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+    """,
+    'orders.read': """
+        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
+               c.client_id, c.name as client_name, c.phone as client_phone,
+               car.car_id, car.brand, car.model, car.license_plate
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE o.order_id = %s
+    """,
+    'orders.aggregate_head': """
+        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
+               c.client_id, c.name as client_name, c.phone as client_phone, c.email,
+               car.car_id, car.brand, car.model, car.year, car.license_plate, car.vin,
+               p.payment_id, p.amount, p.date as payment_date, p.method,
+               p.status as payment_status
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        LEFT JOIN payments p ON p.order_id = o.order_id
+        WHERE o.order_id = %s
+        ORDER BY p.date
+    """,
+    # Заказ, работы и платежи отдельными запросами - для одновременного чтения (async_crud)
+    'orders.aggregate_order': """
+        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
+               c.client_id, c.name as client_name, c.phone as client_phone, c.email,
+               car.car_id, car.brand, car.model, car.year, car.license_plate, car.vin
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE o.order_id = %s
+    """,
+    'orders.aggregate_payments': """
+        SELECT payment_id, amount, date as payment_date, method, status as payment_status
+        FROM payments
+        WHERE order_id = %s
+        ORDER BY date
+    """,
+    'orders.aggregate_works': """
+        SELECT w.work_id, w.service_id, w.employee_id, w.start_date, w.end_date, w.status,
+               wp.part_id, pt.name as part_name, wp.quantity, wp.price_at_usage
+        FROM works w
+        LEFT JOIN workparts wp ON wp.work_id = w.work_id
+        LEFT JOIN parts pt ON pt.part_id = wp.part_id
+        WHERE w.order_id = %s
+        ORDER BY w.work_id
+    """,
+    # Поиск заказов для выбора: (order_id, телефон LIKE, limit) и (ФИО LIKE, госномер LIKE, limit)
+    'orders.search_by_number': """
+        SELECT o.order_id, o.creation_date, o.status,
+               c.name as client_name, car.brand, car.model, car.license_plate
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE o.order_id = %s OR c.phone LIKE %s
+        ORDER BY o.creation_date DESC, o.order_id DESC
+        LIMIT %s
+    """,
+    'orders.search_by_text': """
+        SELECT o.order_id, o.creation_date, o.status,
+               c.name as client_name, car.brand, car.model, car.license_plate
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE c.name LIKE %s OR car.license_plate LIKE %s
+        ORDER BY o.creation_date DESC, o.order_id DESC
+        LIMIT %s
+    """,
+    'orders.by_client': """
+        SELECT o.order_id, o.creation_date, o.status,
+               car.brand, car.model, car.license_plate
+        FROM orders o
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE o.client_id = %s
+        ORDER BY o.creation_date DESC
+    """,
+    'orders.by_phone': """
+        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
+               c.name as client_name, car.brand, car.model, car.license_plate
+        FROM clients c
+        JOIN orders o ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE c.phone IN (%s, %s)
+        ORDER BY o.creation_date DESC
+        LIMIT %s
+    """,
+    'orders.car_history': """
+        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
+               car.car_id, car.brand, car.model, car.license_plate
+        FROM cars car
+        JOIN orders o ON o.car_id = car.car_id
+        WHERE car.license_plate IN (%s, %s)
+        ORDER BY o.creation_date DESC
+    """,
+
+    # Аналитика
+    'analytics.orders_by_period': """
+        SELECT o.order_id, o.creation_date, o.status, o.total_cost,
+               c.name as client_name, car.brand, car.model
+        FROM orders o
+        JOIN clients c ON o.client_id = c.client_id
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE o.creation_date BETWEEN %s AND %s
+        ORDER BY o.creation_date
+    """,
+    'analytics.daily_orders': """
+        SELECT stat_date, SUM(order_count) as order_count, SUM(total_cost) as total_cost
+        FROM daily_order_stats
+        WHERE stat_date BETWEEN %s AND %s
+        GROUP BY stat_date
+    """,
+    'analytics.daily_revenue': """
+        SELECT stat_date, paid_amount
+        FROM daily_revenue
+        WHERE stat_date BETWEEN %s AND %s
+    """,
+    'analytics.status_summary': """
+        SELECT status, SUM(order_count) as order_count, SUM(total_cost) as total_cost
+        FROM daily_order_stats
+        WHERE stat_date BETWEEN %s AND %s
+        GROUP BY status
+    """,
+}
+
+
+def sql(name):
+    """Текст именованного запроса"""
+    try:
+        return QUERIES[name]
+    except KeyError:
+        raise KeyError(f"Неизвестный запрос: {name}") from None
+
+
+def sql_in(name, count):
+    """Текст именованного запроса со списком IN из count параметров (шаблон {placeholders})"""
+    return sql(name).format(placeholders=", ".join(["%s"] * count))
+
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def query_label(query, length=80):
+    """Подпись для запроса без имени: текст в одну строку, обрезанный до length символов"""
+    text = _WHITESPACE.sub(' ', query).strip()
+    return text if len(text) <= length else text[:length - 3] + '...'
@@ -0,0 +1,118 @@
+from collections import namedtuple
+from functools import partial
+from operator import itemgetter
+
+
+def format_datetime(value, pattern='%Y-%m-%d %H:%M'):
+    """Дата/время для вывода; строки (SQLite) обрезаются до минут"""
+    if value is None:
+        return None
+    if hasattr(value, 'strftime'):
+        return value.strftime(pattern)
+    return str(value)[:16]
+
+
+class Record:
+    """
+    Основа записей - строк результата без словаря на каждую строку.
+    Запись - namedtuple: значения хранятся в кортеже, имена столбцов - одни
+    на класс. Для кода, написанного под курсор dictionary=True, поддерживается
+    чтение по имени: row['name'], row.get(), keys(), dict(row), 'name' in row.
+    Запись неизменяема; форматирование для вывода - свойства, вычисляемые при обращении.
+    Столбцы, которых нет в запросе, равны None.
+    """
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._index = {field: position for position, field in enumerate(cls._fields)}
+        cls._readers = {}
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return tuple.__getitem__(self, self._index[key])
+        return tuple.__getitem__(self, key)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def get(self, key, default=None):
+        position = self._index.get(key)
+        return default if position is None else tuple.__getitem__(self, position)
+
+    def keys(self):
+        return self._fields
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._fields, self)
+
+    @classmethod
+    def reader(cls, columns):
+        """
+        Функция "кортеж строки курсора -> запись" для набора столбцов запроса
+        (строится один раз на набор столбцов)
+        :raises ValueError: если в запросе есть столбцы, которых нет в записи
+        """
+        columns = tuple(columns)
+        read = cls._readers.get(columns)
+        if read is not None:
+            return read
+        unknown = [column for column in columns if column not in cls._index]
+        if unknown:
+            raise ValueError(f"Столбцов {', '.join(unknown)} нет в записи {cls.__name__}")
+        new = partial(tuple.__new__, cls)
+        if columns == cls._fields:
+            read = new
+        else:
+            # Отсутствующие столбцы берутся из добавленного в конец строки None
+            positions = {column: position for position, column in enumerate(columns)}
+            take = itemgetter(*(positions.get(field, len(columns)) for field in cls._fields))
+            read = lambda row: new(take(row + (None,)))
+        cls._readers[columns] = read
+        return read
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """Список записей из кортежей строк"""
+        return list(map(cls.reader(columns), rows))
+
+
+class Order(Record, namedtuple('Order', [
+        'order_id', 'creation_date', 'status', 'total_cost',
+        'client_id', 'client_name', 'client_phone',
+        'car_id', 'brand', 'model', 'license_plate'], defaults=(None,) * 11)):
+    """Заказ с клиентом и автомобилем (столбцы orders.read и выгрузки заказов)"""
+    __slots__ = ()
+
+    @property
+    def created(self):
+        return format_datetime(self.creation_date)
+
+    @property
+    def car(self):
+        return f"{self.brand} {self.model}" if self.brand is not None else None
+
+
+class Client(Record, namedtuple('Client', ['client_id', 'name', 'phone', 'email', 'address'],
+                                defaults=(None,) * 5)):
+    __slots__ = ()
+
+
+class Car(Record, namedtuple('Car', ['car_id', 'client_id', 'brand', 'model', 'year', 'license_plate', 'vin'],
+                             defaults=(None,) * 7)):
+    __slots__ = ()
+
+
+class Work(Record, namedtuple('Work', [
+        'work_id', 'order_id', 'start_date', 'end_date', 'status',
+        'service_id', 'service', 'price', 'employee_id', 'employee'], defaults=(None,) * 10)):
+    """Работа с названием услуги и именем сотрудника (столбцы выгрузки работ)"""
+    __slots__ = ()
+
+
+class Payment(Record, namedtuple('Payment', ['payment_id', 'order_id', 'amount', 'date', 'method', 'status',
+                                             'client_id'], defaults=(None,) * 7)):
+    __slots__ = ()
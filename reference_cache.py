@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from db_connector import DatabaseManager
+
+# Справочники, которые почти не меняются: запрос и первичный ключ
+REFERENCE_TABLES = {
+    'services': ("SELECT service_id, name, description, price, warranty_days FROM services", 'service_id'),
+    'employees': ("SELECT employee_id, name, phone, hire_date, position_id FROM employees", 'employee_id'),
+    'positions': ("SELECT position_id, title, salary, responsibilities FROM positions", 'position_id'),
+    'warehouses': ("SELECT warehouse_id, name, address, phone FROM warehouses", 'warehouse_id'),
+}
+
+
+class ReferenceCache:
+    """
+    Кэш справочников перед DatabaseManager (read-through).
+    Записи живут не дольше ttl секунд; при превышении max_entries
+    вытесняется запись, к которой дольше всего не обращались (LRU).
+    Пути записи в справочники вызывают invalidate().
+    """
+
+    def __init__(self, db, ttl=None, max_entries=None):
+        self.db = db
+        self.ttl = ttl if ttl is not None else float(os.getenv('REFERENCE_CACHE_TTL', 300))
+        self.max_entries = max_entries or int(os.getenv('REFERENCE_CACHE_SIZE', 16))
+        self._entries = OrderedDict()  # ключ -> (время загрузки, значение)
+        self._lock = threading.Lock()
+        self._generation = 0  # растет при каждом сбросе, чтобы не сохранить устаревшую загрузку
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get_or_load(self, key, loader):
+        """
+        Значение из кэша или результат loader() с сохранением в кэш
+        :param key: Ключ записи
+        :param loader: Функция загрузки из БД
+        """
+        now = time.monotonic()
+        found, value, generation = self._lookup(key, now)
+        if found:
+            return value
+        value = loader()
+        self._store(key, now, value, generation)
+        return value
+
+    async def get_or_load_async(self, key, loader):
+        """Вариант get_or_load для асинхронной загрузки: loader - функция, возвращающая корутину"""
+        now = time.monotonic()
+        found, value, generation = self._lookup(key, now)
+        if found:
+            return value
+        value = await loader()
+        self._store(key, now, value, generation)
+        return value
+
+    def _lookup(self, key, now):
+        """(найдено, значение, поколение кэша на момент промаха)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return True, entry[1], None
+            self.stats['misses'] += 1
+            return False, None, self._generation
+
+    def _store(self, key, now, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get_table(self, table):
+        """
+        Справочник целиком
+        :return: Словарь {первичный ключ: строка}
+        """
+        query, key_field = REFERENCE_TABLES[table]
+
+        def load():
+            rows = self.db.execute_query(query, fetch=True) or []
+            return {row[key_field]: row for row in rows}
+
+        return self.get_or_load(table, load)
+
+    async def get_table_async(self, table, db):
+        """
+        Справочник целиком через асинхронный менеджер БД (записи общие с get_table)
+        :param db: AsyncDatabaseManager или AsyncSQLiteDatabase
+        """
+        query, key_field = REFERENCE_TABLES[table]
+
+        async def load():
+            rows = await db.execute_query(query, fetch=True) or []
+            return {row[key_field]: row for row in rows}
+
+        return await self.get_or_load_async(table, load)
+
+    def get(self, table, record_id):
+        """Одна запись справочника или None"""
+        return self.get_table(table).get(record_id)
+
+    def name_of(self, table, record_id, field='name'):
+        """Название записи справочника для отображения"""
+        record = self.get(table, record_id)
+        return record[field] if record else None
+
+    def invalidate(self, table=None):
+        """Сброс записи справочника (или всего кэша) после изменения данных"""
+        with self._lock:
+            if table is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(table, None)
+            self._generation += 1
+            self.stats['invalidations'] += 1
+
+    def get_stats(self):
+        """Попадания, промахи, вытеснения и доля попаданий"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(self.stats, entries=len(self._entries),
+                        hit_ratio=self.stats['hits'] / lookups if lookups else 0.0)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_reference_cache(db=None):
+    """Общий для процесса кэш справочников"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReferenceCache(db or DatabaseManager())
+        return _cache
@@ -0,0 +1,223 @@
+import argparse
+import threading
+import time
+from datetime import date, timedelta
+from db_connector import DatabaseManager
+from queries import sql_in
+
+# Дневные агрегаты: таблица -> (очистка диапазона дней, пересчет диапазона дней).
+# Оба запроса принимают (первый день, последний день).
+ROLLUPS = {
+    'daily_order_stats': (
+        "DELETE FROM daily_order_stats WHERE stat_date BETWEEN %s AND %s",
+        """
+        INSERT INTO daily_order_stats (stat_date, status, order_count, total_cost)
+        SELECT DATE(creation_date), status, COUNT(*), COALESCE(SUM(total_cost), 0)
+        FROM orders
+        WHERE creation_date >= %s AND creation_date < %s + INTERVAL 1 DAY
+          AND status IS NOT NULL
+        GROUP BY DATE(creation_date), status
+        """,
+    ),
+    'daily_revenue': (
+        "DELETE FROM daily_revenue WHERE stat_date BETWEEN %s AND %s",
+        """
+        INSERT INTO daily_revenue (stat_date, payment_count, paid_amount)
+        SELECT DATE(date), COUNT(*), SUM(amount)
+        FROM payments
+        WHERE date >= %s AND date < %s + INTERVAL 1 DAY AND status = 'paid'
+        GROUP BY DATE(date)
+        """,
+    ),
+    'daily_employee_stats': (
+        "DELETE FROM daily_employee_stats WHERE stat_date BETWEEN %s AND %s",
+        """
+        INSERT INTO daily_employee_stats (stat_date, employee_id, work_count, income, work_hours)
+        SELECT DATE(w.start_date), w.employee_id, COUNT(*), SUM(s.price),
+               COALESCE(SUM(TIMESTAMPDIFF(SECOND, w.start_date, w.end_date)) / 3600, 0)
+        FROM works w
+        JOIN services s ON w.service_id = s.service_id
+        WHERE w.start_date >= %s AND w.start_date < %s + INTERVAL 1 DAY
+          AND w.employee_id IS NOT NULL
+        GROUP BY DATE(w.start_date), w.employee_id
+        """,
+    ),
+}
+
+# Агрегаты, зависящие только от таблицы orders
+ORDER_ROLLUPS = ('daily_order_stats',)
+
+# Границы для полного пересчета
+MIN_DAY = date(1000, 1, 1)
+MAX_DAY = date(9999, 12, 31)
+
+
+# Дни, пересчет которых после записи не удался: таблица агрегата -> множество дней.
+# Пересчитываются при следующем refresh_after_commit()/refresh_dirty() в процессе;
+# периодический пересчет (см. __main__) покрывает их и после перезапуска.
+_dirty_days = {}
+_dirty_lock = threading.Lock()
+
+
+def mark_dirty(days, tables=ORDER_ROLLUPS):
+    """Отметить дни агрегатов как требующие пересчета"""
+    days = {day for day in days if day is not None}
+    if not days:
+        return
+    with _dirty_lock:
+        for table in tables:
+            _dirty_days.setdefault(table, set()).update(days)
+
+
+def take_dirty():
+    """Забрать отмеченные дни: {таблица: множество дней}"""
+    with _dirty_lock:
+        dirty = dict(_dirty_days)
+        _dirty_days.clear()
+    return dirty
+
+
+def restore_dirty(dirty):
+    """Вернуть в отметки дни, пересчет которых не удался: {таблица: множество дней}"""
+    for table, days in dirty.items():
+        mark_dirty(days, (table,))
+
+
+def day_ranges(days):
+    """Подряд идущие дни одним диапазоном: генератор (первый день, последний день)"""
+    days = sorted(set(days))
+    while days:
+        start = end = days.pop(0)
+        while days and days[0] == end + timedelta(days=1):
+            end = days.pop(0)
+        yield start, end
+
+
+def refresh_statements(start_day, end_day, tables=None):
+    """Запросы пересчета агрегатов за диапазон дней: генератор (запрос, параметры)"""
+    for table in tables or ROLLUPS:
+        delete_query, insert_query = ROLLUPS[table]
+        yield delete_query, (start_day, end_day)
+        yield insert_query, (start_day, end_day)
+
+
+def order_days_query(order_ids):
+    """Запрос дней создания заказов: (запрос, параметры); строки - (day,)"""
+    return sql_in('orders.days', len(order_ids)), tuple(order_ids)
+
+
+class RollupRefresher:
+    """
+    Поддержка дневных агрегатов (migrations/0002_daily_rollups.sql, 0003_employee_work_hours.sql).
+    День пересчитывается целиком из исходных таблиц, поэтому повторный
+    пересчет безопасен, а стоимость пропорциональна числу строк за день.
+    Пути записи заказов пересчитывают затронутые дни после фиксации своей
+    транзакции (refresh_after_commit), поэтому ошибка или блокировка агрегатов
+    не откатывает и не задерживает сам заказ; работы и платежи подхватываются
+    периодическим пересчетом (см. __main__).
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+
+    def refresh_range(self, start_day, end_day, tables=None, cursor=None):
+        """
+        Пересчет агрегатов за дни с start_day по end_day включительно
+        :param tables: Имена таблиц из ROLLUPS (по умолчанию - все)
+        :param cursor: Курсор открытой транзакции; без него - отдельная транзакция
+        """
+        if cursor is None:
+            with self.db.transaction() as connection:
+                cursor = connection.cursor()
+                try:
+                    return self.refresh_range(start_day, end_day, tables, cursor)
+                finally:
+                    cursor.close()
+
+        for query, params in refresh_statements(start_day, end_day, tables):
+            cursor.execute(query, params)
+
+    def refresh_days(self, days, tables=None, cursor=None):
+        """Пересчет отдельных дней; подряд идущие дни пересчитываются одним диапазоном"""
+        for start, end in day_ranges(days):
+            self.refresh_range(start, end, tables, cursor)
+
+    def refresh_after_commit(self, days, tables=ORDER_ROLLUPS):
+        """
+        Пересчет дней, затронутых зафиксированной записью, в отдельной транзакции.
+        Ошибка печатается и не передается вызывающему: дни остаются отмеченными
+        и пересчитываются при следующем вызове
+        :return: True, если все отмеченные дни пересчитаны
+        """
+        mark_dirty(days, tables)
+        return self.refresh_dirty()
+
+    def refresh_dirty(self):
+        """Пересчет отмеченных дней (см. mark_dirty); при ошибке дни возвращаются в отметки"""
+        dirty = take_dirty()
+        for position, (table, days) in enumerate(dirty.items()):
+            try:
+                self.refresh_days(days, (table,))
+            except Exception as e:
+                print(f"Ошибка пересчета дневных агрегатов {table}: {e}")
+                restore_dirty(dict(list(dirty.items())[position:]))
+                return False
+        return True
+
+    def refresh_all(self, tables=None):
+        """Полное перестроение агрегатов"""
+        self.refresh_range(MIN_DAY, MAX_DAY, tables)
+
+    def order_days(self, order_ids, cursor=None):
+        """
+        Дни создания заказов (до удаления заказа или после его изменения)
+        :param cursor: Курсор открытой транзакции (кортежи строк)
+        :return: Множество дат
+        """
+        if not order_ids:
+            return set()
+        query, params = order_days_query(order_ids)
+        if cursor is None:
+            rows = self.db.execute_query(query, params, fetch=True, name='orders.days') or []
+            return {row['day'] for row in rows}
+        cursor.execute(query, params)
+        return {row[0] for row in cursor.fetchall()}
+
+    def refresh_orders(self, order_ids, cursor=None):
+        """Пересчет дней, к которым относятся заказы (для записи - см. refresh_after_commit)"""
+        self.refresh_days(self.order_days(order_ids, cursor), ORDER_ROLLUPS, cursor)
+
+    def current_day(self):
+        """Текущая дата сервера БД (по ней проставляется creation_date по умолчанию)"""
+        rows = self.db.execute_query("SELECT CURDATE() as day", fetch=True)
+        return rows[0]['day'] if rows else date.today()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Пересчет дневных агрегатов для аналитики")
+    parser.add_argument('--days', type=int, default=2,
+                        help="Сколько последних дней пересчитать (по умолчанию 2)")
+    parser.add_argument('--from', dest='start_date', type=date.fromisoformat,
+                        help="Начало периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--to', dest='end_date', type=date.fromisoformat,
+                        help="Конец периода (ГГГГ-ММ-ДД)")
+    parser.add_argument('--all', action='store_true', help="Полное перестроение")
+    parser.add_argument('--interval', type=int,
+                        help="Повторять пересчет каждые N секунд")
+    args = parser.parse_args()
+
+    refresher = RollupRefresher()
+    while True:
+        started = time.monotonic()
+        refresher.refresh_dirty()
+        if args.all:
+            refresher.refresh_all()
+        elif args.start_date:
+            refresher.refresh_range(args.start_date, args.end_date or args.start_date)
+        else:
+            today = refresher.current_day()
+            refresher.refresh_range(today - timedelta(days=args.days - 1), today)
+        print(f"Агрегаты пересчитаны за {time.monotonic() - started:.2f} с")
+        if not args.interval:
+            break
+        time.sleep(args.interval)
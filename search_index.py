@@ -0,0 +1,312 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+from db_connector import DatabaseManager
+from normalization import normalize_plate, phone_digits
+from records import Car
+
+# Сколько результатов возвращает поиск по умолчанию
+DEFAULT_SEARCH_LIMIT = 10
+
+_WORD_SEPARATORS = re.compile(r'[^\w]+')
+_LETTERS = re.compile(r'[^\W\d_]')
+
+
+def _name_tokens(text):
+    """Слова ФИО/email в нижнем регистре, ё -> е"""
+    return [token for token in _WORD_SEPARATORS.split(str(text or '').lower().replace('ё', 'е')) if token]
+
+
+def _vin_key(text):
+    return re.sub(r'[\s-]', '', str(text or '')).upper()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def query_fragments(query):
+    """
+    Варианты запроса для поиска по фрагменту: госномер (латинские двойники -> кириллица),
+    VIN, а для запросов без букв - цифры телефона без кода страны (и без ведущей 7/8,
+    если так начали вводить номер: "+7 999", "8 921 555"). Короче 3 символов не ищутся.
+    """
+    variants = {normalize_plate(query) or '', _vin_key(query)}
+    if not _LETTERS.search(query):
+        digits = phone_digits(query)
+        variants.add(digits)
+        if digits[:1] in ('7', '8'):
+            variants.add(digits[1:])
+    return {variant for variant in variants if len(variant) >= 3}
+
+
+class ClientSearchIndex:
+    """
+    Индекс для поиска клиентов в памяти: по началу слов ФИО и email
+    (отсортированный список + bisect) и по фрагменту телефона, госномера
+    или VIN (триграммы). Госномера нормализуются (латинские буквы-двойники
+    -> кириллица), телефоны сравниваются по цифрам без кода страны.
+    Строится одним проходом по clients и cars, дальше обновляется путями записи CRUD.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or DatabaseManager()
+        self._lock = threading.RLock()
+        self._docs = {}       # client_id -> клиент с автомобилями
+        self._prefix = []     # отсортированные (слово, client_id)
+        self._trigrams = {}   # триграмма -> множество client_id
+        self._keys = {}       # client_id -> (слова, ключи для поиска по фрагменту)
+        self._built = False
+        self._generation = 0  # растет при каждом invalidate(), чтобы не отметить построенным устаревший индекс
+        self._buffers = []    # записи, пришедшие во время построений: список на каждое идущее построение
+        self._listeners = []  # обработчики invalidate() - например, фоновое перестроение в GUI
+        self.build_seconds = None
+
+    # Построение и обновление ---------------------------------------------------------------------
+    def build(self):
+        """
+        Полное построение индекса из БД (потоковое чтение clients и cars).
+        БД читается без блокировки индекса; записи CRUD, пришедшие за это время,
+        копятся и применяются после замены индекса, поэтому не теряются.
+        """
+        started = time.monotonic()
+        buffer = []
+        with self._lock:
+            generation = self._generation
+            self._buffers.append(buffer)
+        try:
+            docs = self._read_docs()
+        except BaseException:
+            with self._lock:
+                self._buffers.remove(buffer)
+            raise
+
+        with self._lock:
+            self._buffers.remove(buffer)
+            self._docs, self._prefix, self._trigrams, self._keys = {}, [], {}, {}
+            entries = []
+            for client_id, doc in docs.items():
+                self._docs[client_id] = doc
+                entries.extend(self._index_keys(client_id, doc, sort=False))
+            self._prefix = sorted(entries)
+            self._built = True
+            for method, args, kwargs in buffer:
+                method(*args, **kwargs)
+            # Если индекс сбросили во время чтения, прочитанное могло устареть - перестроится при поиске
+            self._built = generation == self._generation
+        self.build_seconds = time.monotonic() - started
+
+    def _read_docs(self):
+        docs = {}
+        for rows in self.db.iter_query("SELECT client_id, name, phone, email FROM clients"):
+            for row in rows:
+                docs[row['client_id']] = dict(row, cars={})
+        # Автомобили хранятся записями Car - без словаря на каждый автомобиль
+        for rows in self.db.iter_query(
+                "SELECT car_id, client_id, brand, model, license_plate, vin FROM cars WHERE client_id IS NOT NULL",
+                record=Car):
+            for car in rows:
+                if car.client_id in docs:
+                    docs[car.client_id]['cars'][car.car_id] = car
+        return docs
+
+    def _buffered(self, method, *args, **kwargs):
+        """
+        Учет записи в идущих построениях (вызывается под self._lock): запись
+        повторяется после замены индекса. Пока индекс не построен, применять
+        запись не нужно - клиент будет прочитан из БД
+        :return: True, если запись не надо применять сейчас
+        """
+        for buffer in self._buffers:
+            buffer.append((method, args, kwargs))
+        return not self._built
+
+    @property
+    def is_built(self):
+        with self._lock:
+            return self._built
+
+    def ensure_built(self):
+        if not self.is_built:
+            self.build()
+
+    def invalidate(self):
+        """
+        Пометить индекс устаревшим (после массовой загрузки): перестроится при следующем
+        поиске или раньше - обработчиком on_invalidate
+        """
+        with self._lock:
+            self._built = False
+            self._generation += 1
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def on_invalidate(self, listener):
+        """
+        Подписка на invalidate()
+        :param listener: Функция без аргументов; вызывается в потоке, сбросившем индекс
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def add_client(self, client_id, name, phone, email=None):
+        with self._lock:
+            if self._buffered(self.add_client, client_id, name, phone, email):
+                return
+            self._unindex(client_id)
+            doc = self._docs.get(client_id) or {'cars': {}}
+            doc.update(client_id=client_id, name=name, phone=phone, email=email)
+            self._docs[client_id] = doc
+            self._index_keys(client_id, doc)
+
+    def update_client(self, client_id, **fields):
+        with self._lock:
+            if self._buffered(self.update_client, client_id, **fields):
+                return
+            doc = self._docs.get(client_id)
+            if doc is None:
+                return
+            self._unindex(client_id)
+            doc.update((field, value) for field, value in fields.items()
+                       if field in ('name', 'phone', 'email'))
+            self._index_keys(client_id, doc)
+
+    def remove_client(self, client_id):
+        with self._lock:
+            if self._buffered(self.remove_client, client_id):
+                return
+            self._unindex(client_id)
+            self._docs.pop(client_id, None)
+
+    def add_car(self, car_id, client_id, brand, model, license_plate=None, vin=None):
+        with self._lock:
+            if self._buffered(self.add_car, car_id, client_id, brand, model, license_plate, vin):
+                return
+            doc = self._docs.get(client_id)
+            if doc is None:
+                return
+            self._unindex(client_id)
+            doc['cars'][car_id] = Car(car_id, client_id, brand, model, license_plate=license_plate, vin=vin)
+            self._index_keys(client_id, doc)
+
+    def _index_keys(self, client_id, doc, sort=True):
+        words = set(_name_tokens(doc['name'])) | set(_name_tokens(doc.get('email')))
+        fragments = {phone_digits(doc['phone'])}
+        for car in doc['cars'].values():
+            fragments.add(normalize_plate(car['license_plate']) or '')
+            fragments.add(_vin_key(car['vin']))
+            words.update(_name_tokens(f"{car['brand']} {car['model']}"))
+        fragments.discard('')
+        self._keys[client_id] = (words, fragments)
+
+        for fragment in fragments:
+            for gram in _trigrams(fragment):
+                self._trigrams.setdefault(gram, set()).add(client_id)
+        entries = [(word, client_id) for word in words]
+        if sort:
+            for entry in entries:
+                bisect.insort(self._prefix, entry)
+        return entries
+
+    def _unindex(self, client_id):
+        words, fragments = self._keys.pop(client_id, (set(), set()))
+        for word in words:
+            position = bisect.bisect_left(self._prefix, (word, client_id))
+            if position < len(self._prefix) and self._prefix[position] == (word, client_id):
+                del self._prefix[position]
+        for fragment in fragments:
+            for gram in _trigrams(fragment):
+                ids = self._trigrams.get(gram)
+                if ids is not None:
+                    ids.discard(client_id)
+                    if not ids:
+                        del self._trigrams[gram]
+
+    # Поиск -----------------------------------------------------------------------------------------
+    def search(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        """
+        Поиск клиентов по началу ФИО/email/марки, фрагменту телефона, госномера или VIN
+        :return: Список словарей client_id, name, phone, email, cars (лучшие совпадения первыми)
+        """
+        self.ensure_built()
+        words = _name_tokens(query)
+        if not words:
+            return []
+        variants = query_fragments(query)
+
+        with self._lock:
+            # Совпадение по началу всех слов запроса - выше совпадения по фрагменту
+            ranked = [(0, self._docs[client_id]['name'], client_id)
+                      for client_id in self._prefix_matches(words)]
+            found = {client_id for _, _, client_id in ranked}
+            ranked.extend((1, self._docs[client_id]['name'], client_id)
+                          for client_id in self._fragment_matches(variants) - found)
+            return [self._result(self._docs[client_id])
+                    for _, _, client_id in heapq.nsmallest(limit, ranked)]
+
+    def _prefix_range(self, word):
+        """Границы в _prefix для слов, начинающихся с word"""
+        return (bisect.bisect_left(self._prefix, (word,)),
+                bisect.bisect_left(self._prefix, (word + '\uffff',)))
+
+    def _prefix_matches(self, words):
+        # Просматривается диапазон самого редкого слова, остальные проверяются по ключам клиента
+        ranges = sorted((end - start, start, end, word)
+                        for word, (start, end) in ((word, self._prefix_range(word)) for word in words))
+        _, start, end, rarest = ranges[0]
+        rest = [word for word in words if word != rarest]
+        ids = {client_id for _, client_id in self._prefix[start:end]}
+        return {client_id for client_id in ids
+                if all(any(key.startswith(word) for key in self._keys[client_id][0]) for word in rest)}
+
+    def _fragment_matches(self, variants):
+        ids = set()
+        for variant in variants:
+            # Пересечение начинается с самой редкой триграммы
+            postings = sorted((self._trigrams.get(gram, set()) for gram in _trigrams(variant)), key=len)
+            candidates = set(postings[0]) if postings else set()
+            for posting in postings[1:]:
+                if not candidates:
+                    break
+                candidates &= posting
+            for client_id in candidates:
+                if any(variant in fragment for fragment in self._keys[client_id][1]):
+                    ids.add(client_id)
+        return ids
+
+    @staticmethod
+    def _result(doc):
+        return {
+            'client_id': doc['client_id'],
+            'name': doc['name'],
+            'phone': doc['phone'],
+            'email': doc.get('email'),
+            'cars': list(doc['cars'].values()),
+        }
+
+    def get_stats(self):
+        with self._lock:
+            return {'clients': len(self._docs), 'prefix_entries': len(self._prefix),
+                    'trigrams': len(self._trigrams), 'build_seconds': self.build_seconds}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index(db=None):
+    """Общий для процесса индекс поиска клиентов (строится при первом поиске)"""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = ClientSearchIndex(db)
+        return _index
+
+
+def describe_client(client):
+    """Строка для списка подсказок: ФИО, телефон и госномера"""
+    plates = ", ".join(car['license_plate'] for car in client['cars'] if car.get('license_plate'))
+    return f"{client['name']} ({client['phone']})" + (f" - {plates}" if plates else "")
@@ -0,0 +1,296 @@
+import re
+import sqlite3
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from db_connector import DEFAULT_CHUNK_SIZE, DEFAULT_BATCH_SIZE, BulkResult, iter_batches
+from queries import sql
+
+# Упрощенная схема Скрипт.sql для SQLite: типы без ENUM, AUTO_INCREMENT -> INTEGER PRIMARY KEY
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS positions (
+    position_id INTEGER PRIMARY KEY, title TEXT NOT NULL UNIQUE,
+    salary NUMERIC NOT NULL, responsibilities TEXT
+);
+CREATE TABLE IF NOT EXISTS warehouses (
+    warehouse_id INTEGER PRIMARY KEY, name TEXT NOT NULL, address TEXT NOT NULL, phone TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS clients (
+    client_id INTEGER PRIMARY KEY, name TEXT NOT NULL, phone TEXT NOT NULL UNIQUE,
+    email TEXT UNIQUE, address TEXT
+);
+CREATE TABLE IF NOT EXISTS services (
+    service_id INTEGER PRIMARY KEY, name TEXT NOT NULL, description TEXT,
+    price NUMERIC NOT NULL, warranty_days INTEGER
+);
+CREATE TABLE IF NOT EXISTS parts (
+    part_id INTEGER PRIMARY KEY, name TEXT NOT NULL, code TEXT UNIQUE, description TEXT,
+    price NUMERIC NOT NULL, warehouse_id INTEGER REFERENCES warehouses(warehouse_id),
+    quantity INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS employees (
+    employee_id INTEGER PRIMARY KEY, name TEXT NOT NULL, phone TEXT NOT NULL UNIQUE,
+    hire_date TEXT NOT NULL, position_id INTEGER REFERENCES positions(position_id)
+);
+CREATE TABLE IF NOT EXISTS cars (
+    car_id INTEGER PRIMARY KEY, brand TEXT NOT NULL, model TEXT NOT NULL, year INTEGER,
+    license_plate TEXT UNIQUE, vin TEXT UNIQUE, client_id INTEGER REFERENCES clients(client_id)
+);
+CREATE TABLE IF NOT EXISTS orders (
+    order_id INTEGER PRIMARY KEY, creation_date TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    client_id INTEGER REFERENCES clients(client_id), car_id INTEGER REFERENCES cars(car_id),
+    status TEXT DEFAULT 'new', total_cost NUMERIC, status_changed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS works (
+    work_id INTEGER PRIMARY KEY, order_id INTEGER REFERENCES orders(order_id),
+    service_id INTEGER REFERENCES services(service_id),
+    employee_id INTEGER REFERENCES employees(employee_id),
+    start_date TEXT DEFAULT CURRENT_TIMESTAMP, end_date TEXT, status TEXT, notes TEXT
+);
+CREATE TABLE IF NOT EXISTS payments (
+    payment_id INTEGER PRIMARY KEY, order_id INTEGER REFERENCES orders(order_id),
+    amount NUMERIC NOT NULL, date TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    method TEXT NOT NULL, status TEXT DEFAULT 'pending'
+);
+CREATE TABLE IF NOT EXISTS workparts (
+    work_id INTEGER REFERENCES works(work_id), part_id INTEGER REFERENCES parts(part_id),
+    quantity INTEGER NOT NULL DEFAULT 1, price_at_usage NUMERIC,
+    PRIMARY KEY (work_id, part_id)
+);
+CREATE TABLE IF NOT EXISTS daily_order_stats (
+    stat_date TEXT NOT NULL, status TEXT NOT NULL, order_count INTEGER NOT NULL,
+    total_cost NUMERIC NOT NULL DEFAULT 0, PRIMARY KEY (stat_date, status)
+);
+CREATE TABLE IF NOT EXISTS daily_revenue (
+    stat_date TEXT PRIMARY KEY, payment_count INTEGER NOT NULL, paid_amount NUMERIC NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS daily_employee_stats (
+    stat_date TEXT NOT NULL, employee_id INTEGER NOT NULL, work_count INTEGER NOT NULL,
+    income NUMERIC NOT NULL DEFAULT 0, work_hours NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (stat_date, employee_id)
+);
+CREATE INDEX IF NOT EXISTS idx_orders_creation_date_id ON orders (creation_date, order_id);
+CREATE INDEX IF NOT EXISTS idx_orders_client_date ON orders (client_id, creation_date);
+CREATE INDEX IF NOT EXISTS idx_works_order ON works (order_id);
+"""
+
+# Конструкции MySQL, которые используют запросы приложения, и их аналоги в SQLite
+_TRANSLATIONS = [
+    (re.compile(r'%s\s*\+\s*INTERVAL 1 DAY', re.IGNORECASE), "date(?, '+1 day')"),
+    (re.compile(r'%s'), '?'),
+    # Итог по группам без WITH ROLLUP считает вызывающий (см. crud_operations.order_stats_from_rows)
+    (re.compile(r'\s+WITH ROLLUP', re.IGNORECASE), ''),
+]
+
+
+def translate(query):
+    """Запрос в диалекте MySQL -> SQLite (параметры %s, "+ INTERVAL 1 DAY", WITH ROLLUP)"""
+    for pattern, replacement in _TRANSLATIONS:
+        query = pattern.sub(replacement, query)
+    return query
+
+
+class _Cursor:
+    """Курсор SQLite для кода, написанного под курсор mysql.connector (параметры %s)"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        self._cursor.execute(translate(query), tuple(params or ()))
+
+    def executemany(self, query, rows):
+        self._cursor.executemany(translate(query), rows)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class _Connection:
+    """Соединение транзакции: cursor() переводит запросы MySQL, остальное - как у sqlite3"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args, **kwargs):
+        return _Cursor(self._connection.cursor())
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteDatabase:
+    """
+    Замена DatabaseManager на SQLite для локальной проверки HTTP API и бенчмарков без MySQL.
+    Поддерживает запросы CRUD, справочников и дневных агрегатов; WITH ROLLUP отбрасывается
+    (см. translate), прочий специфичный для MySQL синтаксис завершается ошибкой, как и в execute_query.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def transaction(self):
+        with self._lock:
+            try:
+                yield _Connection(self.connection)
+                self.connection.commit()
+            except Exception:
+                self.connection.rollback()
+                raise
+
+    def execute_query(self, query, params=None, fetch=False, name=None, record=None):
+        with self._lock:
+            cursor = self.connection.cursor()
+            if record is None:
+                cursor.row_factory = _dict_row
+            try:
+                cursor.execute(translate(query), tuple(params or ()))
+                if fetch:
+                    rows = cursor.fetchall()
+                    if record is not None:
+                        rows = record.from_rows([column[0] for column in cursor.description], rows)
+                    return rows
+                self.connection.commit()
+                return True
+            except sqlite3.Error as e:
+                print(f"Ошибка выполнения запроса: {e}")
+                self.connection.rollback()
+                return False
+            finally:
+                cursor.close()
+
+    def insert_many(self, query, rows, batch_size=None):
+        """Пакетная вставка с построчным повтором отвергнутого пакета (см. DatabaseManager.insert_many)"""
+        query = translate(query)
+        inserted = 0
+        failed = []
+        for start, batch in iter_batches(rows, batch_size or DEFAULT_BATCH_SIZE):
+            with self._lock:
+                try:
+                    with self.connection:
+                        self.connection.executemany(query, batch)
+                    inserted += len(batch)
+                    continue
+                except sqlite3.Error:
+                    pass
+                for offset, row in enumerate(batch):
+                    try:
+                        with self.connection:
+                            self.connection.execute(query, row)
+                        inserted += 1
+                    except sqlite3.Error as e:
+                        failed.append((start + offset, row, str(e)))
+        return BulkResult(inserted, failed)
+
+    def execute_named(self, name, params=None, fetch=False, stream=False, chunk_size=None, record=None):
+        if stream:
+            return self.iter_query(sql(name), params, chunk_size, name, record)
+        return self.execute_query(sql(name), params, fetch, name=name, record=record)
+
+    def iter_query(self, query, params=None, chunk_size=None, name=None, record=None):
+        """Чтение порциями через fetchmany; соединение занято, пока генератор не исчерпан или закрыт"""
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        with self._lock:
+            cursor = self.connection.cursor()
+            if record is None:
+                cursor.row_factory = _dict_row
+            try:
+                cursor.execute(translate(query), tuple(params or ()))
+                read = record.reader([column[0] for column in cursor.description]) if record is not None else None
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield list(map(read, rows)) if read is not None else rows
+            finally:
+                cursor.close()
+
+    def close(self):
+        self.connection.close()
+
+
+class _AsyncCursor:
+    """Курсор SQLite с интерфейсом курсора aiomysql (строки - кортежи)"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._cursor.close()
+
+    async def execute(self, query, params=()):
+        self._cursor.execute(translate(query), tuple(params or ()))
+
+    async def fetchall(self):
+        return self._cursor.fetchall()
+
+    async def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+
+class _AsyncConnection:
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, *args):
+        return _AsyncCursor(self._connection.cursor())
+
+
+class AsyncSQLiteDatabase:
+    """
+    Замена AsyncDatabaseManager на SQLite: тот же набор корутин.
+    Запросы к локальному файлу выполняются сразу, без пула и потоков.
+    """
+
+    def __init__(self, database):
+        """:param database: SQLiteDatabase (ее же можно передать в ReferenceCache)"""
+        self.database = database
+
+    async def connect(self):
+        print("Используется локальная база SQLite")
+
+    @asynccontextmanager
+    async def transaction(self):
+        with self.database.transaction() as connection:
+            yield _AsyncConnection(connection)
+
+    async def execute_query(self, query, params=None, fetch=False, name=None):
+        return self.database.execute_query(query, params, fetch, name=name)
+
+    async def execute_named(self, name, params=None, fetch=False):
+        return self.database.execute_named(name, params, fetch)
+
+    async def execute_insert(self, query, params=None, name=None):
+        try:
+            with self.database.transaction() as connection:
+                cursor = connection.execute(translate(query), tuple(params or ()))
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            print(f"Ошибка выполнения запроса: {e}")
+            return None
+
+    async def iter_query(self, query, params=None, chunk_size=None, name=None):
+        rows = self.database.execute_query(query, params, fetch=True, name=name) or []
+        chunk_size = chunk_size or DEFAULT_CHUNK_SIZE
+        for start in range(0, len(rows), chunk_size):
+            yield rows[start:start + chunk_size]
+
+    def pool_stats(self):
+        return {'size': 1, 'idle': 1, 'max_size': 1}
+
+    async def close(self):
+        self.database.close()
@@ -0,0 +1,273 @@
+import atexit
+import json
+import os
+import threading
+from datetime import datetime
+from db_connector import DatabaseManager, iter_batches
+from rollups import RollupRefresher
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Включить отложенную запись статусов в OrderCRUD.update_order_status
+STATUS_QUEUE_ENABLED = os.getenv('ORDER_STATUS_QUEUE', '0') == '1'
+
+# Как часто записывать накопленные статусы, секунд
+STATUS_QUEUE_INTERVAL = float(os.getenv('ORDER_STATUS_QUEUE_INTERVAL', 1))
+
+# Сколько заказов в очереди вызывает запись, не дожидаясь таймера
+STATUS_QUEUE_SIZE = int(os.getenv('ORDER_STATUS_QUEUE_SIZE', 200))
+
+# Журнал принятых, но еще не записанных статусов (JSONL); пустое значение - без журнала.
+# Журнал занимает один процесс: второму процессу нужен свой путь
+STATUS_QUEUE_JOURNAL = os.getenv('ORDER_STATUS_QUEUE_JOURNAL', 'order_status_queue.jsonl')
+
+
+class JournalLockedError(RuntimeError):
+    """Журнал очереди статусов уже открыт другим процессом"""
+
+
+def _lock_exclusive(file):
+    """Исключительная блокировка файла без ожидания; OSError, если файл занят"""
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+class OrderStatusQueue:
+    """
+    Отложенная запись статусов заказов (write-behind).
+    Изменения накапливаются по заказу - записывается только последний статус -
+    и записываются одной транзакцией пакетами UPDATE ... CASE; дневные агрегаты
+    затронутых дней пересчитываются после фиксации. Запись - по таймеру (interval),
+    при накоплении max_pending заказов, при flush() и при завершении процесса.
+
+    Каждое изменение несет время, когда оно было принято, и записывается только
+    если в заказе нет более нового изменения (orders.status_changed_at). Поэтому
+    статус из очереди или из журнала после сбоя не перезаписывает статус, записанный
+    позже напрямую - HTTP API или другим процессом (запрос orders.update_status_at).
+
+    Принятое изменение сначала дописывается в журнал с fsync, поэтому после
+    сбоя процесса оно не теряется: при создании очереди журнал перечитывается
+    и неподтвержденные статусы записываются. После каждой успешной записи
+    журнал сжимается до еще не записанных изменений. Журнал блокируется
+    на все время работы очереди: второй процесс с тем же файлом получает
+    JournalLockedError при создании очереди.
+
+    Статус проверяет вызывающий (OrderCRUD.update_order_status). Чтения
+    из базы видят новый статус после записи; pending_status() - до нее.
+    """
+
+    def __init__(self, db=None, interval=None, max_pending=None, journal_path=STATUS_QUEUE_JOURNAL):
+        self.db = db or DatabaseManager()
+        self.rollups = RollupRefresher(self.db)
+        self.interval = interval if interval is not None else STATUS_QUEUE_INTERVAL
+        self.max_pending = max_pending or STATUS_QUEUE_SIZE
+        self.journal_path = journal_path or None
+        self.stats = {'accepted': 0, 'written': 0, 'flushes': 0, 'errors': 0}
+        self._pending = {}  # order_id -> (статус, время изменения)
+        self._inflight = {}  # пакет, который сейчас записывается в базу
+        self._lock = threading.Lock()  # очередь и журнал
+        self._flush_lock = threading.Lock()  # одна запись в базу одновременно
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._journal = None
+        self._journal_lock = None
+        if self.journal_path:
+            self._journal_lock = self._acquire_journal()
+            self._pending = self._read_journal()
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name='order-status-queue', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __len__(self):
+        return len(self._pending)
+
+    def enqueue(self, order_id, status, changed_at=None):
+        """
+        Принять новый статус заказа
+        :param changed_at: Время изменения (по умолчанию - текущее)
+        :return: True - изменение записано в журнал и будет записано в базу
+        """
+        changed_at = changed_at or datetime.now()
+        try:
+            with self._lock:
+                if self._stop.is_set():
+                    raise RuntimeError("очередь статусов закрыта")
+                self._append_journal(order_id, status, changed_at)
+                self._pending[order_id] = (status, changed_at)
+                self.stats['accepted'] += 1
+                full = len(self._pending) >= self.max_pending
+        except Exception as e:
+            print(f"Ошибка очереди статусов заказов: {e}")
+            return False
+        if full:
+            self._wake.set()
+        return True
+
+    def pending_status(self, order_id):
+        """Принятый, но еще не записанный статус заказа или None (в том числе во время записи)"""
+        with self._lock:
+            pending = self._pending.get(order_id) or self._inflight.get(order_id)
+        return pending[0] if pending else None
+
+    def flush(self):
+        """
+        Запись накопленных статусов одной транзакцией.
+        При ошибке изменения возвращаются в очередь (если за это время
+        не пришел более новый статус) и записываются при следующей попытке.
+        :return: Количество записанных заказов
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._inflight = batch
+            if not batch:
+                return 0
+            try:
+                days = self._write(batch)
+            except Exception as e:
+                print(f"Ошибка записи статусов заказов ({len(batch)}): {e}")
+                with self._lock:
+                    self.stats['errors'] += 1
+                    for order_id, change in batch.items():
+                        self._pending.setdefault(order_id, change)
+                    self._inflight = {}
+                return 0
+            with self._lock:
+                self.stats['written'] += len(batch)
+                self.stats['flushes'] += 1
+                try:
+                    self._compact_journal()
+                except OSError as e:
+                    # Записанные изменения останутся в журнале и будут повторены - повтор безопасен
+                    print(f"Ошибка сжатия журнала статусов: {e}")
+                self._inflight = {}
+            self.rollups.refresh_after_commit(days)
+            return len(batch)
+
+    def close(self):
+        """Остановка таймера и запись оставшихся статусов (вызывается и при выходе)"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self._journal_lock is not None:
+                self._journal_lock.close()
+                self._journal_lock = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self.flush()
+
+    def _write(self, batch):
+        """
+        Пакетные UPDATE ... CASE в одной транзакции; заказ, статус которого
+        изменен позже, чем принято изменение из очереди, не обновляется
+        :return: Дни заказов для пересчета агрегатов
+        """
+        with self.db.transaction() as connection:
+            cursor = connection.cursor()
+            try:
+                for _, items in iter_batches(batch.items(), self.max_pending):
+                    cases = " ".join(["WHEN %s THEN %s"] * len(items))
+                    placeholders = ", ".join(["%s"] * len(items))
+                    statuses = [value for order_id, (status, _) in items for value in (order_id, status)]
+                    times = [value for order_id, (_, changed_at) in items for value in (order_id, changed_at)]
+                    order_ids = [order_id for order_id, _ in items]
+                    cursor.execute(
+                        f"UPDATE orders SET status = CASE order_id {cases} END, "
+                        f"status_changed_at = CASE order_id {cases} END "
+                        f"WHERE order_id IN ({placeholders}) AND (status_changed_at IS NULL "
+                        f"OR status_changed_at <= CASE order_id {cases} END)",
+                        tuple(statuses + times + order_ids + times)
+                    )
+                return self.rollups.order_days(list(batch), cursor)
+            finally:
+                cursor.close()
+
+    # Журнал ------------------------------------------------------------------------------------------
+
+    def _acquire_journal(self):
+        """
+        Блокировка журнала на время работы очереди. Блокируется отдельный файл .lock:
+        сам журнал при сжатии заменяется новым файлом
+        :raises JournalLockedError: если журнал занят другим процессом
+        """
+        lock_file = open(self.journal_path + '.lock', 'a+')
+        try:
+            _lock_exclusive(lock_file)
+        except OSError:
+            lock_file.close()
+            raise JournalLockedError(
+                f"Журнал очереди статусов {self.journal_path} занят другим процессом; "
+                f"задайте отдельный путь в ORDER_STATUS_QUEUE_JOURNAL") from None
+        return lock_file
+
+    def _append_journal(self, order_id, status, changed_at):
+        if self._journal is None:
+            return
+        self._journal.write(self._journal_line(order_id, (status, changed_at)))
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+    @staticmethod
+    def _journal_line(order_id, change):
+        status, changed_at = change
+        return json.dumps({'order_id': order_id, 'status': status, 'changed_at': changed_at.isoformat()}) + "\n"
+
+    def _read_journal(self):
+        """Неподтвержденные статусы из журнала; оборванная последняя строка пропускается"""
+        pending = {}
+        if not os.path.exists(self.journal_path):
+            return pending
+        with open(self.journal_path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    entry = json.loads(line)
+                    pending[entry['order_id']] = (entry['status'], datetime.fromisoformat(entry['changed_at']))
+                except (ValueError, KeyError, TypeError):
+                    continue
+        if pending:
+            print(f"Очередь статусов: из журнала восстановлено {len(pending)} изменений")
+        return pending
+
+    def _compact_journal(self):
+        """Замена журнала на еще не записанные изменения (вызывается под self._lock)"""
+        if self._journal is None:
+            return
+        temporary = self.journal_path + '.tmp'
+        with open(temporary, 'w', encoding='utf-8') as journal:
+            journal.writelines(self._journal_line(order_id, change) for order_id, change in self._pending.items())
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._journal.close()
+        os.replace(temporary, self.journal_path)
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_status_queue(db=None):
+    """Общая для процесса очередь статусов (журнал перечитывается при создании)"""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = OrderStatusQueue(db)
+        return _queue
@@ -0,0 +1,29 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlite_standin import SQLiteDatabase
+
+
+@pytest.fixture
+def db():
+    """База SQLite в памяти: два клиента, их автомобили и заказы за 16-17 октября"""
+    database = SQLiteDatabase()
+    with database.transaction() as connection:
+        connection.executescript("""
+        INSERT INTO clients (client_id, name, phone, email) VALUES
+            (1, 'Иванов Иван Иванович', '+79991234567', 'ivanov@example.com'),
+            (2, 'Петрова Анна Сергеевна', '+79215550011', NULL);
+        INSERT INTO cars (car_id, brand, model, year, license_plate, vin, client_id) VALUES
+            (1, 'Lada', 'Vesta', 2020, 'А123ВС77', 'XTA21900000000001', 1),
+            (2, 'Kia', 'Rio', 2018, 'М456ОР99', 'Z94CB41AAJR000002', 2);
+        INSERT INTO orders (order_id, creation_date, client_id, car_id, status, total_cost) VALUES
+            (1, '2026-10-16 09:00:00', 1, 1, 'completed', 1500.50),
+            (2, '2026-10-17 00:00:00', 1, 1, 'new', NULL),
+            (3, '2026-10-17 12:30:00', 2, 2, 'in_progress', 3200),
+            (4, '2026-10-17 23:59:59', 2, 2, 'new', 999.99);
+        """)
+    yield database
+    database.close()
@@ -0,0 +1,22 @@
+from datetime import date
+from analytics import build_employee_stats_query, workdays_between
+
+TODAY = date(2026, 10, 18)
+
+
+def test_past_period_reads_only_rollups():
+    query, params = build_employee_stats_query([1], '2026-09-01', '2026-09-30', today=TODAY)
+    assert 'FROM works' not in query
+    assert params == [1, '2026-09-01', '2026-09-30']
+
+
+def test_current_day_is_counted_from_works():
+    query, params = build_employee_stats_query([1, 2], '2026-10-01', None, today=TODAY)
+    assert 'stat_date <> %s' in query and 'FROM works w' in query
+    assert params == [1, 2, '2026-10-01', TODAY, TODAY, TODAY, 1, 2]
+    assert query.count('%s') == len(params)
+
+
+def test_workdays_between():
+    assert workdays_between(date(2026, 10, 12), date(2026, 10, 18)) == 5
+    assert workdays_between(date(2026, 10, 18), date(2026, 10, 12)) == 0
@@ -0,0 +1,42 @@
+import asyncio
+import pytest
+from async_crud import AsyncOrderCRUD
+from sqlite_standin import AsyncSQLiteDatabase
+
+
+@pytest.fixture
+def orders(db):
+    with db.transaction() as connection:
+        connection.executescript("""
+        INSERT INTO services (service_id, name, price) VALUES (1, 'Замена масла', 1500);
+        INSERT INTO employees (employee_id, name, phone, hire_date) VALUES (1, 'Сидоров', '+79000000001', '2024-01-01');
+        INSERT INTO works (work_id, order_id, service_id, employee_id, start_date, status)
+            VALUES (1, 1, 1, 1, '2026-10-16 10:00:00', 'completed');
+        """)
+    return AsyncOrderCRUD(AsyncSQLiteDatabase(db))
+
+
+def test_aggregate_loads_reference_tables_through_async_manager(orders, monkeypatch):
+    monkeypatch.setattr(orders.reference_cache, 'db', None)
+    aggregate = asyncio.run(orders.load_order_aggregate(1))
+    assert aggregate['works'][0]['service'] == 'Замена масла'
+    assert aggregate['works'][0]['employee'] == 'Сидоров'
+    assert asyncio.run(orders.load_order_aggregate(99)) is None
+
+
+def test_search_by_plate_and_phone(orders):
+    assert [order['order_id'] for order in asyncio.run(orders.search_orders('м456'))] == [4, 3]
+    assert [order['order_id'] for order in asyncio.run(orders.search_orders('5550011'))] == [4, 3]
+
+
+def test_writes_refresh_order_rollups(db, orders):
+    def day_counts():
+        rows = db.execute_query("SELECT status, order_count FROM daily_order_stats WHERE stat_date = '2026-10-17' "
+                                "ORDER BY status", fetch=True)
+        return {row['status']: row['order_count'] for row in rows}
+
+    assert asyncio.run(orders.update_order_status(2, 'completed'))
+    assert day_counts() == {'completed': 1, 'in_progress': 1, 'new': 1}
+    assert asyncio.run(orders.delete_order(4))
+    assert day_counts() == {'completed': 1, 'in_progress': 1}
+    assert not asyncio.run(orders.delete_order(4))
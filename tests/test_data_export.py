@@ -0,0 +1,56 @@
+import csv
+import pytest
+from data_export import DataExporter
+
+
+def exported_ids(db, tmp_path, **period):
+    path = tmp_path / 'orders.csv'
+    DataExporter(db).export('orders', str(path), **period)
+    with open(path, encoding='utf-8', newline='') as file:
+        return [int(row['order_id']) for row in csv.DictReader(file)]
+
+
+def test_end_date_includes_whole_last_day(db, tmp_path):
+    assert exported_ids(db, tmp_path, start_date='2026-10-17', end_date='2026-10-17') == [2, 3, 4]
+
+
+def test_period_bounds(db, tmp_path):
+    assert exported_ids(db, tmp_path, end_date='2026-10-16') == [1]
+    assert exported_ids(db, tmp_path, start_date='2026-10-17') == [2, 3, 4]
+    assert exported_ids(db, tmp_path) == [1, 2, 3, 4]
+
+
+def test_incremental_export_continues_after_last_key(db, tmp_path):
+    exporter = DataExporter(db, state_path=str(tmp_path / 'state.json'))
+    assert exporter.export('orders', str(tmp_path / 'first.jsonl'), incremental=True) == 4
+    with db.transaction() as connection:
+        connection.execute("INSERT INTO orders (order_id, creation_date, client_id, car_id, status) "
+                           "VALUES (5, '2026-10-18 08:00:00', 1, 1, 'new')")
+    assert exporter.export('orders', str(tmp_path / 'second.jsonl'), incremental=True) == 1
+
+
+def test_parquet_schema_is_fixed_across_chunks(db, tmp_path):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    path = tmp_path / 'orders.parquet'
+    # Первая порция - заказ с total_cost NULL, следующие - с копейками
+    with db.transaction() as connection:
+        connection.execute("UPDATE orders SET total_cost = NULL WHERE order_id = 1")
+    assert DataExporter(db).export('orders', str(path), chunk_size=1) == 4
+    table = pyarrow.parquet.read_table(path)
+    assert table.schema.field('total_cost').type == pyarrow.decimal128(10, 2)
+    assert pyarrow.types.is_timestamp(table.schema.field('creation_date').type)
+    assert [str(value) for value in table.column('total_cost').to_pylist()] == ['None', 'None', '3200.00', '999.99']
+
+
+def test_works_without_employee_are_exported(db, tmp_path):
+    with db.transaction() as connection:
+        connection.executescript("""
+        INSERT INTO services (service_id, name, price) VALUES (1, 'Диагностика', 900);
+        INSERT INTO works (work_id, order_id, service_id, employee_id, start_date, status)
+            VALUES (1, 1, 1, NULL, '2026-10-16 10:00:00', 'new');
+        """)
+    path = tmp_path / 'works.csv'
+    assert DataExporter(db).export('works', str(path)) == 1
+    with open(path, encoding='utf-8', newline='') as file:
+        assert [row['employee'] for row in csv.DictReader(file)] == ['']
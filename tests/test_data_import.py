@@ -0,0 +1,45 @@
+import json
+from data_import import DataImporter
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return str(path)
+
+
+def rejects(path):
+    with open(path, encoding='utf-8') as file:
+        return [(entry['line'], entry['error']) for entry in map(json.loads, file)]
+
+
+def test_duplicates_are_rejected_within_batch_and_by_the_database(db, tmp_path):
+    source = write_jsonl(tmp_path / 'clients.jsonl', [
+        {'name': 'Новый', 'phone': '8 (999) 000-00-01'},
+        {'name': 'Повтор в пакете', 'phone': '+79990000001'},
+        {'name': 'Уже в базе', 'phone': '+79991234567'},
+        {'name': 'Повтор из прошлого пакета', 'phone': '+7 999 000 00 01'},
+    ])
+    importer = DataImporter(db, use_load_data=False)
+    stats = importer.import_file('clients', source, batch_size=3, rejects_path=str(tmp_path / 'rejects.jsonl'))
+    assert stats['inserted'] == 1 and stats['rejected'] == 3
+    lines = [line for line, _ in rejects(tmp_path / 'rejects.jsonl')]
+    assert lines == [1, 2, 3]
+
+
+def test_load_data_warnings_are_mapped_to_rows():
+    rows = [
+        {'_line': 10, 'name': 'Первый', 'phone': '+79990000001'},
+        {'_line': 11, 'name': 'Дубликат', 'phone': '+79991234567'},
+        {'_line': 12, 'name': 'Без ключа', 'phone': '+79990000003'},
+        {'_line': 13, 'name': 'Пропущен молча', 'phone': '+79990000004'},
+    ]
+    warnings = [
+        ('Warning', 1265, "Data truncated for column 'name' at row 1"),
+        ('Warning', 1062, "Duplicate entry '+79991234567' for key 'clients.phone'"),
+        ('Warning', 1452, "Cannot add or update a child row: a foreign key constraint fails at row 3"),
+    ]
+    failed = DataImporter._skipped_rows(['name', 'phone'], rows, warnings, skipped=3)
+    assert [line for line, _, _ in failed] == [11, 12, None]
+    assert failed[0][1] is rows[1]
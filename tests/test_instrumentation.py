@@ -0,0 +1,29 @@
+from instrumentation import Instrumentation, QueryMetrics
+
+
+class Caller:
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+    def run(self, seconds, error=None):
+        self.instrumentation.record(None, "SELECT 1", (), seconds, 1, error, 'probe')
+
+
+def make(threshold_ms=500):
+    instrumentation = Instrumentation()
+    metrics = instrumentation.add_hook(QueryMetrics(caller_threshold_ms=threshold_ms))
+    return Caller(instrumentation), metrics
+
+
+def test_fast_queries_are_counted_without_caller():
+    caller, metrics = make()
+    caller.run(0.001)
+    snapshot = metrics.snapshot()
+    assert snapshot['queries'][0]['calls'] == 1 and snapshot['callers'] == []
+
+
+def test_slow_and_failed_queries_are_attributed_to_caller():
+    caller, metrics = make()
+    caller.run(0.6)
+    caller.run(0.001, error="ошибка")
+    assert metrics.snapshot()['callers'] == [{'caller': 'Caller.run', 'calls': 2, 'seconds': 0.601}]
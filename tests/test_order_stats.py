@@ -0,0 +1,29 @@
+import pytest
+from crud_operations import OrderCRUD, order_stats_from_rows
+
+
+def test_totals_without_rollup_row(db):
+    stats = OrderCRUD(db).get_order_stats()
+    assert stats['new'] == {'order_count': 2, 'total_cost': 999.99, 'avg_cost': 999.99}
+    assert stats['total']['order_count'] == 4
+    assert stats['total']['total_cost'] == pytest.approx(5700.49)
+    assert stats['total']['avg_cost'] == pytest.approx(5700.49 / 3)
+
+
+def test_filters(db):
+    stats = OrderCRUD(db).get_order_stats('2026-10-17', '2026-10-17', client_id=2)
+    assert set(stats) == {'in_progress', 'new', 'total'}
+    assert stats['total']['order_count'] == 2
+
+
+def test_rollup_row_is_the_row_without_status():
+    rows = [
+        {'status': 'new', 'order_count': 2, 'total_cost': 10, 'avg_cost': 10, 'cost_count': 1},
+        {'status': None, 'order_count': 2, 'total_cost': 10, 'avg_cost': 10, 'cost_count': 1},
+    ]
+    assert order_stats_from_rows(rows)['total'] == {'order_count': 2, 'total_cost': 10, 'avg_cost': 10}
+
+
+def test_query_error_is_not_reported_as_empty_statistics():
+    assert order_stats_from_rows(False) is None
+    assert order_stats_from_rows([])['total'] == {'order_count': 0, 'total_cost': 0, 'avg_cost': None}
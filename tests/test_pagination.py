@@ -0,0 +1,48 @@
+import pytest
+from pagination import encode_cursor, decode_cursor, build_keyset_query, fetch_keyset_page
+from queries import sql
+from records import Order
+
+ORDER_KEY = ['o.creation_date', 'o.order_id']
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor('next', ('2026-10-17 12:30:00', 3))
+    assert decode_cursor(cursor) == ('next', ['2026-10-17 12:30:00', 3])
+    assert cursor.isascii() and '/' not in cursor and '+' not in cursor
+
+
+@pytest.mark.parametrize('cursor', ['not base64!', encode_cursor('next', [1])[:-4], '',
+                                    'WyJzaWRld2F5cyIsIFsxXV0='])
+def test_corrupted_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_seek_condition_is_expanded():
+    query, params, after, backwards = build_keyset_query(
+        "SELECT * FROM orders o", ORDER_KEY, encode_cursor('next', ['2026-10-17', 3]), limit=2, descending=True)
+    assert "(o.creation_date < %s) OR (o.creation_date = %s AND o.order_id < %s)" in query
+    assert query.endswith("ORDER BY o.creation_date DESC, o.order_id DESC LIMIT %s")
+    assert params == ['2026-10-17', '2026-10-17', 3, 3]
+    assert after == ['2026-10-17', 3] and not backwards
+
+
+def order_page(db, cursor=None):
+    return fetch_keyset_page(db, sql('orders.list'), ORDER_KEY,
+                             lambda order: (order.creation_date, order.order_id),
+                             cursor=cursor, limit=2, descending=True, record=Order)
+
+
+def test_pages_forward_and_back(db):
+    first = order_page(db)
+    assert [order.order_id for order in first.rows] == [4, 3]
+    assert first.prev_cursor is None
+
+    second = order_page(db, first.next_cursor)
+    assert [order.order_id for order in second.rows] == [2, 1]
+    assert second.next_cursor is None
+
+    back = order_page(db, second.prev_cursor)
+    assert [order.order_id for order in back.rows] == [4, 3]
+    assert back.prev_cursor is None and back.next_cursor is not None
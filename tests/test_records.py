@@ -0,0 +1,43 @@
+from datetime import datetime
+import pytest
+from records import Order, Car, format_datetime
+
+
+def test_reader_fills_missing_columns_with_none():
+    read = Order.reader(['order_id', 'status', 'brand', 'model'])
+    order = read((7, 'new', 'Lada', 'Vesta'))
+    assert isinstance(order, Order)
+    assert order.order_id == 7 and order.status == 'new'
+    assert order.creation_date is None and order.client_name is None
+    assert order.car == "Lada Vesta"
+
+
+def test_reader_accepts_columns_in_any_order():
+    read = Car.reader(['vin', 'car_id', 'brand'])
+    assert read(('XTA21900000000001', 1, 'Lada')) == Car(car_id=1, brand='Lada', vin='XTA21900000000001')
+
+
+def test_reader_is_cached_per_column_set():
+    assert Order.reader(['order_id', 'status']) is Order.reader(('order_id', 'status'))
+    assert Order.reader(Order._fields) is Order.reader(list(Order._fields))
+
+
+def test_reader_rejects_unknown_columns():
+    with pytest.raises(ValueError, match='notes'):
+        Order.reader(['order_id', 'notes'])
+
+
+def test_dict_style_access():
+    order = Order.from_rows(['order_id', 'status'], [(1, 'new')])[0]
+    assert order['status'] == 'new' and order[0] == 1
+    assert order.get('status') == 'new' and order.get('missing', 'x') == 'x'
+    assert 'client_id' in order and 'missing' not in order
+    assert dict(order)['order_id'] == 1
+
+
+def test_lazy_formatting():
+    order = Order(order_id=1, creation_date=datetime(2026, 10, 17, 9, 5, 30))
+    assert order.created == '2026-10-17 09:05'
+    assert order.car is None
+    assert format_datetime('2026-10-17 09:05:30') == '2026-10-17 09:05'
+    assert format_datetime(None) is None
@@ -0,0 +1,96 @@
+import pytest
+from search_index import ClientSearchIndex
+
+
+@pytest.fixture
+def index(db):
+    index = ClientSearchIndex(db)
+    index.build()
+    return index
+
+
+def found(index, query):
+    return [client['client_id'] for client in index.search(query)]
+
+
+@pytest.mark.parametrize('query', ['+7 (999) 123-45-67', '89991234567', '+7 999', '8 999', '999 123',
+                                   '4567', '+7 999 123'])
+def test_phone_fragments(index, query):
+    assert found(index, query) == [1]
+
+
+def test_phone_with_country_code_prefix(index):
+    assert found(index, '8 999 123') == [1]
+    assert found(index, '8 921 555') == [2]
+    assert found(index, '+7 921') == [2]
+
+
+@pytest.mark.parametrize('query', ['а123вс', 'A123BC77', 'a 123 bc', '123ВС'])
+def test_plate_lookalikes_and_case(index, query):
+    assert found(index, query) == [1]
+
+
+@pytest.mark.parametrize('query', ['XTA219', 'z94cb41', 'JR000002'])
+def test_vin_fragments(index, query):
+    assert found(index, query) == ([1] if query.upper().startswith('XTA') else [2])
+
+
+def test_name_prefixes_rank_before_fragments(index):
+    assert found(index, 'иван') == [1]
+    assert found(index, 'Петрова ан') == [2]
+    assert found(index, 'kia') == [2]
+    assert found(index, 'сидоров') == []
+
+
+def test_updates_after_build(index):
+    index.add_client(3, 'Сидоров Петр', '+79035550000')
+    index.add_car(3, 3, 'Skoda', 'Octavia', 'Т777ТТ77', None)
+    assert found(index, 'сидор') == [3]
+    assert found(index, 'T777') == [3]
+
+    index.update_client(3, name='Сидоренко Петр')
+    assert found(index, 'сидоров') == []
+    assert found(index, 'сидоренко') == [3]
+
+    index.remove_client(3)
+    assert found(index, 'T777') == []
+
+
+def test_writes_during_build_are_applied(db):
+    index = ClientSearchIndex(db)
+    read_docs = index._read_docs
+
+    def read_with_concurrent_writes():
+        docs = read_docs()
+        # Клиент и автомобиль записаны в БД после чтения, но до замены индекса
+        index.add_client(3, 'Сидоров Петр', '+79035550000')
+        index.add_car(3, 3, 'Skoda', 'Octavia', 'Т777ТТ77', None)
+        index.remove_client(2)
+        return docs
+
+    index._read_docs = read_with_concurrent_writes
+    index.build()
+    assert index.is_built
+    assert found(index, 'T777') == [3]
+    assert found(index, 'петрова') == []
+
+
+def test_invalidate_during_build_forces_rebuild(db):
+    index = ClientSearchIndex(db)
+    read_docs = index._read_docs
+
+    def read_and_invalidate():
+        docs = read_docs()
+        index.invalidate()
+        return docs
+
+    index._read_docs = read_and_invalidate
+    index.build()
+    assert not index.is_built
+
+
+def test_invalidate_notifies_listeners(index):
+    calls = []
+    index.on_invalidate(lambda: calls.append(index.is_built))
+    index.invalidate()
+    assert calls == [False]
@@ -0,0 +1,170 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from crud_operations import OrderCRUD, build_status_update
+from status_queue import OrderStatusQueue, JournalLockedError
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return str(tmp_path / 'status.jsonl')
+
+
+@pytest.fixture
+def make_queue(db, journal):
+    queues = []
+
+    def make(database=db, path=journal):
+        # Таймер не срабатывает сам: записи - только через flush()
+        queue = OrderStatusQueue(database, interval=3600, max_pending=100, journal_path=path)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def statuses(db):
+    return {row['order_id']: row['status'] for row in
+            db.execute_query("SELECT order_id, status FROM orders ORDER BY order_id", fetch=True)}
+
+
+def journal_entries(path):
+    with open(path, encoding='utf-8') as journal:
+        return [json.loads(line) for line in journal]
+
+
+class FailingTransactions:
+    """База, транзакции которой завершаются ошибкой, пока fail=True"""
+
+    def __init__(self, db):
+        self.db = db
+        self.fail = True
+
+    def transaction(self):
+        if self.fail:
+            raise RuntimeError("нет соединения")
+        return self.db.transaction()
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+def test_changes_are_coalesced_per_order(db, make_queue):
+    queue = make_queue()
+    queue.enqueue(2, 'in_progress')
+    queue.enqueue(2, 'completed')
+    queue.enqueue(3, 'cancelled')
+    assert len(queue) == 2
+    assert queue.pending_status(2) == 'completed'
+    assert statuses(db)[2] == 'new'
+
+    assert queue.flush() == 2
+    assert statuses(db) == {1: 'completed', 2: 'completed', 3: 'cancelled', 4: 'new'}
+    assert len(queue) == 0 and queue.pending_status(2) is None
+
+
+def test_flush_refreshes_rollups_of_affected_days(db, make_queue):
+    queue = make_queue()
+    queue.enqueue(4, 'completed')
+    queue.flush()
+    rows = db.execute_query("SELECT status, order_count FROM daily_order_stats WHERE stat_date = '2026-10-17' "
+                            "ORDER BY status", fetch=True)
+    assert [(row['status'], row['order_count']) for row in rows] == [('completed', 1), ('in_progress', 1), ('new', 1)]
+
+
+def test_failed_flush_requeues_without_overwriting_newer_changes(db, make_queue):
+    failing = FailingTransactions(db)
+    queue = make_queue(failing)
+    queue.enqueue(2, 'in_progress')
+    queue.enqueue(3, 'completed')
+    assert queue.flush() == 0
+    assert queue.stats['errors'] == 1 and len(queue) == 2
+
+    # Новый статус, принятый после неудачной записи, не заменяется возвращенным в очередь
+    queue.enqueue(2, 'cancelled')
+    failing.fail = False
+    assert queue.flush() == 2
+    assert statuses(db)[2] == 'cancelled' and statuses(db)[3] == 'completed'
+
+
+def test_journal_is_replayed_after_crash_and_compacted(db, make_queue, journal):
+    failing = FailingTransactions(db)
+    crashed = make_queue(failing)
+    crashed.enqueue(2, 'in_progress')
+    crashed.enqueue(2, 'completed')
+    crashed.enqueue(3, 'cancelled')
+    assert [entry['order_id'] for entry in journal_entries(journal)] == [2, 2, 3]
+    # Процесс "упал": очередь не закрыта, журнал остался
+    crashed._journal_lock.close()
+    crashed._stop.set()
+
+    restored = make_queue()
+    assert len(restored) == 2 and restored.pending_status(2) == 'completed'
+    restored.enqueue(4, 'in_progress')
+    assert restored.flush() == 3
+    assert statuses(db) == {1: 'completed', 2: 'completed', 3: 'cancelled', 4: 'in_progress'}
+    assert journal_entries(journal) == []
+
+
+def test_compaction_keeps_changes_accepted_after_the_flush(db, make_queue, journal):
+    queue = make_queue()
+    queue.enqueue(2, 'completed')
+    queue.flush()
+    queue.enqueue(3, 'completed')
+    assert [(entry['order_id'], entry['status']) for entry in journal_entries(journal)] == [(3, 'completed')]
+
+
+def test_older_queued_change_does_not_overwrite_newer_direct_write(db, make_queue, journal):
+    queue = make_queue()
+    accepted = datetime.now() - timedelta(seconds=1)
+    queue.enqueue(2, 'in_progress', changed_at=accepted)
+    # Тот же заказ позже обновлен напрямую (HTTP API или другой процесс)
+    db.execute_query(*build_status_update(2, 'cancelled'))
+    queue.flush()
+    assert statuses(db)[2] == 'cancelled'
+
+    queue.enqueue(2, 'completed', changed_at=accepted + timedelta(seconds=5))
+    queue.flush()
+    assert statuses(db)[2] == 'completed'
+
+
+def test_journal_is_locked_for_other_queues(make_queue, journal):
+    queue = make_queue()
+    with pytest.raises(JournalLockedError):
+        make_queue()
+    queue.close()
+    make_queue().enqueue(1, 'new')
+
+
+def test_close_flushes_remaining_changes(db, make_queue):
+    queue = make_queue()
+    queue.enqueue(1, 'cancelled')
+    queue.close()
+    assert statuses(db)[1] == 'cancelled'
+    assert not queue.enqueue(2, 'completed')
+
+
+def test_queued_change_older_than_order_creation_is_skipped(db, make_queue):
+    accepted = datetime.now() - timedelta(seconds=1)
+    order_id = OrderCRUD(db).create_order(1, 1, 'new')
+    queue = make_queue()
+    queue.enqueue(order_id, 'cancelled', changed_at=accepted)
+    queue.flush()
+    assert statuses(db)[order_id] == 'new'
+
+
+def test_batch_stays_visible_while_it_is_written(db, make_queue):
+    queue = make_queue()
+    queue.enqueue(2, 'completed')
+    seen = []
+    write = queue._write
+
+    def observed_write(batch):
+        seen.append(queue.pending_status(2))
+        return write(batch)
+
+    queue._write = observed_write
+    queue.flush()
+    assert seen == ['completed'] and queue.pending_status(2) is None
@@ -0,0 +1,185 @@
+import math
+import os
+from analytics import analytical_requests
+from reference_cache import ReferenceCache
+
+# Управленческие отчеты: название -> (заголовок, [(столбец, заголовок столбца), ...])
+REPORTS = {
+    'revenue_by_model': ("Выручка по маркам и моделям", [
+        ('brand', "Марка"), ('model', "Модель"), ('order_count', "Заказов"),
+        ('revenue', "Выручка"), ('avg_cost', "Средний чек"), ('median_cost', "Медиана"),
+    ]),
+    'repair_duration': ("Длительность работ по услугам, ч", [
+        ('service', "Услуга"), ('work_count', "Работ"), ('avg_hours', "Среднее"),
+        ('median_hours', "Медиана"), ('p90_hours', "90-й перцентиль"),
+    ]),
+    'parts_cost': ("Стоимость запчастей", [
+        ('part', "Запчасть"), ('quantity', "Количество"), ('cost', "Стоимость"),
+        ('avg_price', "Средняя цена"),
+    ]),
+    'payment_methods': ("Способы оплаты", [
+        ('method', "Способ"), ('payment_count', "Платежей"), ('amount', "Сумма"),
+        ('share', "Доля суммы, %"),
+    ]),
+}
+
+# Столбцы снимка: запрос по заказам периода, столбцы, числовые столбцы, столбцы дат
+SNAPSHOT_QUERIES = {
+    'orders': ("""
+        SELECT o.order_id, o.status, o.total_cost, car.brand, car.model
+        FROM orders o
+        JOIN cars car ON o.car_id = car.car_id
+        WHERE o.creation_date >= %s AND o.creation_date < %s + INTERVAL 1 DAY
+        """, ['order_id', 'status', 'total_cost', 'brand', 'model'], ['total_cost'], []),
+    'works': ("""
+        SELECT w.work_id, w.order_id, s.name as service, w.start_date, w.end_date
+        FROM orders o
+        JOIN works w ON w.order_id = o.order_id
+        JOIN services s ON w.service_id = s.service_id
+        WHERE o.creation_date >= %s AND o.creation_date < %s + INTERVAL 1 DAY
+        """, ['work_id', 'order_id', 'service', 'start_date', 'end_date'], [], ['start_date', 'end_date']),
+    'parts': ("""
+        SELECT wp.work_id, p.name as part, wp.quantity, wp.price_at_usage
+        FROM orders o
+        JOIN works w ON w.order_id = o.order_id
+        JOIN workparts wp ON wp.work_id = w.work_id
+        JOIN parts p ON wp.part_id = p.part_id
+        WHERE o.creation_date >= %s AND o.creation_date < %s + INTERVAL 1 DAY
+        """, ['work_id', 'part', 'quantity', 'price_at_usage'], ['quantity', 'price_at_usage'], []),
+    'payments': ("""
+        SELECT p.payment_id, p.order_id, p.amount, p.method, p.status
+        FROM orders o
+        JOIN payments p ON p.order_id = o.order_id
+        WHERE o.creation_date >= %s AND o.creation_date < %s + INTERVAL 1 DAY
+        """, ['payment_id', 'order_id', 'amount', 'method', 'status'], ['amount'], []),
+}
+
+
+def _number(value):
+    """DECIMAL/None из БД -> float/NaN для числовых массивов"""
+    return math.nan if value is None else float(value)
+
+
+class VectorizedAnalytics(analytical_requests):
+    """
+    Управленческие отчеты за период поверх NumPy/pandas (нужны numpy и pandas).
+    Данные заказов периода читаются потоково одним проходом на таблицу в столбцы,
+    а группировки и перцентили считаются векторно. Снимок периода кэшируется,
+    поэтому повторные отчеты по тому же периоду не обращаются к БД.
+    """
+
+    def __init__(self, db=None, ttl=None, max_snapshots=None):
+        """
+        :param ttl: Время жизни снимка периода в секундах
+        :param max_snapshots: Сколько периодов держать в памяти
+        """
+        try:
+            import pandas
+        except ImportError as e:
+            raise ImportError("Для управленческих отчетов установите numpy и pandas") from e
+        self.pd = pandas
+        super().__init__(db)
+        self.snapshots = ReferenceCache(
+            self.db,
+            ttl if ttl is not None else float(os.getenv('ANALYTICS_SNAPSHOT_TTL', 300)),
+            max_snapshots or int(os.getenv('ANALYTICS_SNAPSHOTS', 4))
+        )
+
+    def get_snapshot(self, start_date, end_date):
+        """
+        Столбцовый снимок заказов периода
+        :return: Словарь {'orders'|'works'|'parts'|'payments': DataFrame}
+        """
+        return self.snapshots.get_or_load(
+            (str(start_date), str(end_date)),
+            lambda: {name: self._load_frame(spec, start_date, end_date)
+                     for name, spec in SNAPSHOT_QUERIES.items()}
+        )
+
+    def _load_frame(self, spec, start_date, end_date):
+        """Потоковое чтение запроса сразу в столбцы DataFrame"""
+        query, columns, numeric, dates = spec
+        data = {column: [] for column in columns}
+        for rows in self.db.iter_query(query, (start_date, end_date)):
+            for column in columns:
+                if column in numeric:
+                    data[column].extend(_number(row[column]) for row in rows)
+                else:
+                    data[column].extend(row[column] for row in rows)
+        frame = self.pd.DataFrame(data, columns=columns)
+        for column in numeric:
+            frame[column] = frame[column].astype(float)
+        for column in dates:
+            frame[column] = self.pd.to_datetime(frame[column])
+        return frame
+
+    def invalidate(self):
+        """Сброс снимков (например, после загрузки данных)"""
+        self.snapshots.invalidate()
+
+    def get_report(self, name, start_date, end_date):
+        """Отчет из REPORTS по имени"""
+        if name not in REPORTS:
+            raise ValueError(f"Неизвестный отчет: {name}")
+        return getattr(self, f"get_{name}")(start_date, end_date)
+
+    def get_revenue_by_model(self, start_date, end_date):
+        """Количество заказов, выручка, средний и медианный чек по маркам и моделям"""
+        orders = self.get_snapshot(start_date, end_date)['orders']
+        if orders.empty:
+            return []
+        report = orders.groupby(['brand', 'model'], as_index=False).agg(
+            order_count=('order_id', 'size'),
+            revenue=('total_cost', 'sum'),
+            avg_cost=('total_cost', 'mean'),
+            median_cost=('total_cost', 'median'),
+        )
+        return self._records(report.sort_values('revenue', ascending=False))
+
+    def get_repair_duration(self, start_date, end_date):
+        """Длительность завершенных работ (end_date - start_date) по услугам: среднее, медиана, p90"""
+        works = self.get_snapshot(start_date, end_date)['works']
+        works = works[works['start_date'].notna() & works['end_date'].notna()]
+        if works.empty:
+            return []
+        hours = (works['end_date'] - works['start_date']).dt.total_seconds() / 3600
+        grouped = hours.groupby(works['service'])
+        report = self.pd.DataFrame({
+            'work_count': grouped.size(),
+            'avg_hours': grouped.mean(),
+            'median_hours': grouped.median(),
+            'p90_hours': grouped.quantile(0.9),
+        }).reset_index()
+        return self._records(report.sort_values('avg_hours', ascending=False))
+
+    def get_parts_cost(self, start_date, end_date):
+        """Количество и стоимость использованных запчастей по цене на момент использования"""
+        parts = self.get_snapshot(start_date, end_date)['parts']
+        if parts.empty:
+            return []
+        parts = parts.assign(cost=parts['quantity'] * parts['price_at_usage'])
+        report = parts.groupby('part', as_index=False).agg(
+            quantity=('quantity', 'sum'),
+            cost=('cost', 'sum'),
+        )
+        report['avg_price'] = report['cost'] / report['quantity'].where(report['quantity'] > 0)
+        return self._records(report.sort_values('cost', ascending=False))
+
+    def get_payment_methods(self, start_date, end_date):
+        """Структура оплат (без отмененных): количество, сумма и доля по способам оплаты"""
+        payments = self.get_snapshot(start_date, end_date)['payments']
+        payments = payments[payments['status'] != 'cancelled']
+        if payments.empty:
+            return []
+        report = payments.groupby('method', as_index=False).agg(
+            payment_count=('payment_id', 'size'),
+            amount=('amount', 'sum'),
+        )
+        total = report['amount'].sum()
+        report['share'] = report['amount'] / total * 100 if total else 0.0
+        return self._records(report.sort_values('amount', ascending=False))
+
+    def _records(self, frame):
+        """DataFrame -> список словарей с округленными числами и None вместо NaN"""
+        frame = frame.round(2)
+        return frame.astype(object).where(frame.notna(), None).to_dict('records')
@@ -40,7 +40,7 @@ CREATE TABLE parts (
     price DECIMAL(10,2) NOT NULL,
     warehouse_id INT,
     quantity INT NOT NULL DEFAULT 0,
-    FOREIGN KEY (warehouse_id) REFERENCES Warehouse(warehouse_id)
+    FOREIGN KEY (warehouse_id) REFERENCES warehouses(warehouse_id)
 );
 
 CREATE TABLE employees (
@@ -60,7 +60,7 @@ CREATE TABLE cars (
     license_plate VARCHAR(15) UNIQUE,
     vin VARCHAR(17) UNIQUE,
     client_id INT,
-    FOREIGN KEY (client_id) REFERENCES Client(client_id)
+    FOREIGN KEY (client_id) REFERENCES clients(client_id)
 );
 
 CREATE TABLE `orders` (
@@ -70,8 +70,8 @@ CREATE TABLE `orders` (
     car_id INT,
     status ENUM('new','in_progress','completed','cancelled') DEFAULT 'new',
     total_cost DECIMAL(10,2),
-    FOREIGN KEY (client_id) REFERENCES Client(client_id),
-    FOREIGN KEY (car_id) REFERENCES Car(car_id)
+    FOREIGN KEY (client_id) REFERENCES clients(client_id),
+    FOREIGN KEY (car_id) REFERENCES cars(car_id)
 );
 
 CREATE TABLE works (
@@ -83,9 +83,9 @@ CREATE TABLE works (
     end_date DATETIME,
     status ENUM('planned','in_progress','completed','cancelled'),
     notes TEXT,
-    FOREIGN KEY (order_id) REFERENCES `Order`(order_id),
-    FOREIGN KEY (service_id) REFERENCES Service(service_id),
-    FOREIGN KEY (employee_id) REFERENCES Employee(employee_id)
+    FOREIGN KEY (order_id) REFERENCES `orders`(order_id),
+    FOREIGN KEY (service_id) REFERENCES services(service_id),
+    FOREIGN KEY (employee_id) REFERENCES employees(employee_id)
 );
 
 CREATE TABLE payments (
@@ -95,7 +95,7 @@ CREATE TABLE payments (
     date DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     method ENUM('cash','card','transfer') NOT NULL,
     status ENUM('pending','paid','cancelled') DEFAULT 'pending',
-    FOREIGN KEY (order_id) REFERENCES `Order`(order_id)
+    FOREIGN KEY (order_id) REFERENCES `orders`(order_id)
 );
 
 CREATE TABLE workparts (
@@ -104,8 +104,8 @@ CREATE TABLE workparts (
     quantity INT NOT NULL DEFAULT 1,
     price_at_usage DECIMAL(10,2),
     PRIMARY KEY (work_id, part_id),
-    FOREIGN KEY (work_id) REFERENCES Work(work_id),
-    FOREIGN KEY (part_id) REFERENCES Part(part_id)
+    FOREIGN KEY (work_id) REFERENCES works(work_id),
+    FOREIGN KEY (part_id) REFERENCES parts(part_id)
 );
 
 